@@ -0,0 +1,162 @@
+"""
+Консольный запуск анализа без графического интерфейса
+
+Не импортирует PyQt5, поэтому работает на серверах без дисплея:
+
+    cd scr
+    python -m app.cli analyze data/*.xlsx --format json --workers 4
+    python -m app.cli export big.xlsx big.parquet --sheet Data
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from typing import List, Optional, TextIO
+
+from .core.constants import CONFIG
+from .core.exceptions import BaseError
+from .core.instrumentation import INSTRUMENTATION, format_breakdown
+from .modules.batch_analyzer import ALL_SHEETS, BatchAnalyzer
+from .modules.report import STATISTICS_FIELDS, item_to_dict, statistics_rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=CONFIG.name)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="Анализ файлов")
+    analyze.add_argument("files", nargs="+", help="Пути к файлам")
+    analyze.add_argument("--format", choices=["json", "csv"], default="json",
+                         help="json - объект на строку (JSON Lines), csv - строка на столбец")
+    analyze.add_argument("--output", "-o", help="Файл отчета (по умолчанию stdout)")
+    analyze.add_argument("--sheet", action="append", dest="sheets",
+                         help=f"Имя листа, можно несколько раз; '{ALL_SHEETS}' - все листы")
+    headers = analyze.add_mutually_exclusive_group()
+    headers.add_argument("--headers", dest="has_headers", action="store_true",
+                         default=CONFIG.has_headers, help="Первая строка - заголовки")
+    headers.add_argument("--no-headers", dest="has_headers", action="store_false",
+                         help="Первая строка - данные")
+    analyze.add_argument("--workers", type=int, default=None,
+                         help="Число процессов (по умолчанию из настроек)")
+    analyze.add_argument("--summary", action="store_true",
+                         help="Вывести в stderr итог и скорость обработки")
+    analyze.add_argument("--trace", metavar="FILE",
+                         help="Сохранить замеры этапов (JSON, формат Trace Event)")
+    analyze.add_argument("--profile", metavar="FILE",
+                         help="Сохранить профиль cProfile (pstats)")
+
+    export = commands.add_parser("export", help="Преобразование листа в CSV, xlsx или Parquet")
+    export.add_argument("file", help="Путь к файлу Excel")
+    export.add_argument("output", help="Файл результата: .csv, .xlsx или .parquet")
+    export.add_argument("--sheet", help="Имя листа (по умолчанию активный)")
+    export_headers = export.add_mutually_exclusive_group()
+    export_headers.add_argument("--headers", dest="has_headers", action="store_true",
+                                default=CONFIG.has_headers, help="Первая строка - заголовки")
+    export_headers.add_argument("--no-headers", dest="has_headers", action="store_false",
+                                help="Первая строка - данные")
+    export.add_argument("--summary", action="store_true",
+                        help="Вывести в stderr итог и скорость обработки")
+    return parser
+
+
+def run_analyze(args: argparse.Namespace, output: TextIO) -> int:
+    """
+    Анализирует файлы и пишет отчет по мере готовности листов
+
+    Args:
+        args: Аргументы командной строки
+        output: Поток для отчета
+
+    Returns:
+        int: Код возврата (1 - были ошибки)
+    """
+    writer = None
+    if args.format == "csv":
+        writer = csv.DictWriter(output, fieldnames=STATISTICS_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+
+    started = time.perf_counter()
+    sheets = rows = errors = 0
+    analyzer = BatchAnalyzer(args.workers)
+
+    for item in analyzer.analyze_files(args.files, args.sheets, args.has_headers):
+        if item.ok:
+            sheets += 1
+            rows += item.result.data_rows_count
+        else:
+            errors += 1
+            print(f"{item.file_path}: {item.error}", file=sys.stderr)
+
+        if writer is None:
+            output.write(json.dumps(item_to_dict(item), ensure_ascii=False) + "\n")
+        elif item.ok:
+            writer.writerows(statistics_rows(item.result))
+        output.flush()
+
+    if args.summary:
+        elapsed = time.perf_counter() - started
+        print(f"Листов: {sheets}, ошибок: {errors}, строк: {rows}, "
+              f"время: {elapsed:.2f} с, строк/с: {rows / elapsed if elapsed else 0:.0f}",
+              file=sys.stderr)
+
+    return 1 if errors else 0
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """
+    Переписывает лист в другой формат потоком пачек строк, не загружая его целиком
+
+    Args:
+        args: Аргументы командной строки
+
+    Returns:
+        int: Код возврата (1 - ошибка)
+    """
+    from .modules.excel_loader import ExcelLoader
+    from .modules.exporter import export_rows
+
+    started = time.perf_counter()
+    try:
+        sheet_info, batches = ExcelLoader().stream_sheet(args.file, args.has_headers,
+                                                         sheet_name=args.sheet)
+        headers = [str(header) for header in sheet_info.headers] if args.has_headers else None
+        rows = export_rows(args.output, headers, batches)
+    except (BaseError, OSError) as e:
+        print(f"{args.file}: {e}", file=sys.stderr)
+        return 1
+
+    if args.summary:
+        elapsed = time.perf_counter() - started
+        print(f"Строк: {rows}, время: {elapsed:.2f} с, "
+              f"строк/с: {rows / elapsed if elapsed else 0:.0f}", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "export":
+        return run_export(args)
+
+    if args.trace or args.profile:
+        INSTRUMENTATION.enabled = bool(args.trace)
+        # Замеры и профиль снимаются в текущем процессе
+        if args.workers is None:
+            args.workers = 1
+
+    with INSTRUMENTATION.profile(args.profile):
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as output:
+                code = run_analyze(args, output)
+        else:
+            code = run_analyze(args, sys.stdout)
+
+    if args.trace:
+        INSTRUMENTATION.dump_trace(args.trace)
+        if args.summary:
+            print(format_breakdown(INSTRUMENTATION.records(), nested=True), file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,13 +25,66 @@ def load_config(config_path: str = None) -> AppConfig:
             table_min_size=config_data["ui"]["table_min_size"],
             analysis_panel_width=config_data["ui"]["analysis_panel_width"],
             excel_ext=config_data["file_format"]["excel_ext"],
+            batch_size=config_data["loader"]["batch_size"],
+            xlsx_engine=config_data["loader"]["xlsx_engine"],
+            max_empty_rows=config_data["loader"]["max_empty_rows"],
+            compact_storage=config_data["loader"]["compact_storage"],
+            csv_fallback_encoding=config_data["loader"]["csv_fallback_encoding"],
+            progressive=config_data["loader"]["progressive"],
+            first_rows=config_data["loader"]["first_rows"],
+            cache_enabled=config_data["cache"]["enabled"],
+            cache_dir=config_data["cache"]["directory"],
+            cache_max_size_mb=config_data["cache"]["max_size_mb"],
+            batch_workers=config_data["batch"]["workers"],
+            watch_enabled=config_data["watch"]["enabled"],
+            watch_debounce_ms=config_data["watch"]["debounce_ms"],
+            instrumentation_enabled=config_data["debug"]["instrumentation"],
+            trace_file=config_data["debug"]["trace_file"],
+            profile_file=config_data["debug"]["profile_file"],
             has_headers=config_data["analysis"]["has_headers"],
-            size_type_detect=config_data["analysis"]["size_type_detect"],
+            columnar_backend=config_data["analysis"]["columnar_backend"],
+            provisional_rows=config_data["analysis"]["provisional_rows"],
+            sketches_enabled=config_data["analysis"]["sketches"]["enabled"],
+            sketch_exact_limit=config_data["analysis"]["sketches"]["exact_limit"],
+            sketch_top_k=config_data["analysis"]["sketches"]["top_k"],
+            sketch_hll_precision=config_data["analysis"]["sketches"]["hll_precision"],
+            sketch_kll_k=config_data["analysis"]["sketches"]["kll_k"],
             date_formats=config_data["analysis"]["date_formats"]
         )
     except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
         raise FileLoadError(f"Ошибка загрузки конфигурации: {str(e)}")
 
 
+class LazyConfig:
+    """
+    Конфигурация, которая читается из файла при первом обращении к полю
+
+    Импорт модулей не трогает диск; поля можно менять (например, в бенчмарках),
+    изменения видны всем модулям.
+    """
+
+    __slots__ = ("_path", "_config")
+
+    def __init__(self, config_path: str = None):
+        object.__setattr__(self, "_path", config_path)
+        object.__setattr__(self, "_config", None)
+
+    @property
+    def loaded(self) -> bool:
+        return self._config is not None
+
+    def get(self) -> AppConfig:
+        """Загруженная конфигурация"""
+        if self._config is None:
+            object.__setattr__(self, "_config", load_config(self._path))
+        return self._config
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self.get(), name, value)
+
+
 # Константы для удобства доступа
-CONFIG = load_config()
\ No newline at end of file
+CONFIG = LazyConfig()
\ No newline at end of file
@@ -1,7 +1,13 @@
-from dataclasses import dataclass, field
-from typing import Any, List, Optional, Dict, Union
+import sys
+from dataclasses import dataclass, field, replace
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Dict, Sequence, Set, Tuple, Union
 from enum import Enum
 
+# Объекты, которых много (статистика по столбцам, прочитанные листы), без
+# __dict__; dataclass(slots=True) есть с Python 3.10
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class ColumnType(Enum):
     """Типы данных столбцов"""
@@ -15,7 +21,7 @@ class ColumnType(Enum):
     UNKNOWN = "Неизвестный"
 
 
-@dataclass
+@dataclass(**SLOTS)
 class ColumnStatistics:
     """Статистика по столбцу"""
     name: str
@@ -25,6 +31,15 @@ class ColumnStatistics:
     max_value: Optional[Union[int, float]] = None
     mean_value: Optional[float] = None
     count_row: int = 0
+    # Расширенная статистика (см. modules/sketches.py); при exact=False -
+    # оценки с ограниченной ошибкой
+    distinct_count: Optional[int] = None
+    std_value: Optional[float] = None
+    median_value: Optional[Union[int, float]] = None
+    p90_value: Optional[Union[int, float]] = None
+    p99_value: Optional[Union[int, float]] = None
+    top_values: List[Tuple[Any, int]] = field(default_factory=list)
+    exact: bool = True
 
 
 @dataclass
@@ -37,6 +52,11 @@ class AnalysisResult:
     has_headers: bool
     column_name: List[str] = field(default_factory=list)
     statistic: List[ColumnStatistics] = field(default_factory=list)
+    sheet_names: List[str] = field(default_factory=list)
+    # Накопители для пересчета без повторного прохода (см. DataAnalyzer)
+    state: Optional[Any] = field(default=None, repr=False, compare=False)
+    # Статистика по первым строкам, пока лист еще загружается
+    provisional: bool = False
 
     @property
     def data_rows_count(self) -> int:
@@ -46,16 +66,268 @@ class AnalysisResult:
         return self.total_rows
 
 
+class ColumnKind(Enum):
+    """Физическое представление столбца в колоночном хранилище"""
+    INTEGER = "int64"
+    FLOAT = "float64"
+    CATEGORY = "category"
+    OBJECT = "object"
+
+
+@dataclass
+class ColumnData:
+    """Столбец в колоночном виде (массивы NumPy)"""
+    kind: ColumnKind
+    values: Any
+    valid: Any
+    categories: Optional[List[str]] = None
+    # Маска целых значений в столбце FLOAT, где встречаются и int, и float
+    integer: Any = None
+    # Коды различных значений столбца OBJECT из словаря хранилища (-1 - пустая
+    # ячейка; равные 1, 1.0 и True - один код) и значения по кодам
+    dictionary: Optional[Tuple[Any, List[Any]]] = None
+
+    @property
+    def empty_count(self) -> int:
+        return int(len(self.valid) - self.valid.sum())
+
+
 @dataclass
+class ColumnarTable:
+    """Колоночное представление данных листа"""
+    row_count: int
+    columns: List[ColumnData] = field(default_factory=list)
+    # Индекс строки raw_rows, соответствующей первому элементу столбцов
+    offset: int = 0
+
+
+class RowsView(Sequence):
+    """Строки листа начиная с offset, без копирования списка строк"""
+
+    __slots__ = ("_rows", "_offset")
+
+    def __init__(self, rows: List[List[Any]], offset: int = 0):
+        self._rows = rows
+        self._offset = offset
+
+    def __len__(self) -> int:
+        return max(0, len(self._rows) - self._offset)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._rows[start + self._offset:stop + self._offset]
+            return [self._rows[i + self._offset] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("индекс строки вне диапазона")
+        return self._rows[index + self._offset]
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        return islice(self._rows, self._offset, None)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def cell(self, row: int, column: int) -> Any:
+        """Значение ячейки; хранилище по столбцам не собирает строку целиком"""
+        cell = getattr(self._rows, "cell", None)
+        if cell is not None:
+            return cell(row + self._offset, column)
+        values = self._rows[row + self._offset]
+        return values[column] if column < len(values) else ""
+
+    def column_values(self, index: int, start: int = 0) -> List[Any]:
+        """Значения столбца index начиная со строки start"""
+        column_values = getattr(self._rows, "column_values", None)
+        if column_values is not None:
+            return column_values(index, start + self._offset)
+        return [row[index] if index < len(row) else ""
+                for row in islice(self._rows, start + self._offset, None)]
+
+    def column_codes(self, index: int, start: int = 0):
+        """Коды и словарь столбца хранилища по столбцам (см. CompactRows.column_codes)"""
+        column_codes = getattr(self._rows, "column_codes", None)
+        if column_codes is None:
+            return None
+        return column_codes(index, start + self._offset)
+
+
+@dataclass(**SLOTS)
 class ExcelFileInfo:
-    """Информация о загруженном файле"""
+    """
+    Информация о загруженном файле
+
+    raw_rows хранит все строки листа, включая первую; data - представление
+    поверх них без строки заголовков, поэтому смена режима заголовков
+    не копирует данные (см. with_headers). Загрузчик хранит строки
+    по столбцам (CompactRows), если это включено в настройках.
+    """
     file_path: str
     file_name: str
     sheet_name: str
     headers: List[str]
-    data: List[List[Any]]
+    data: Sequence[List[Any]]
     count_row: int
     count_column: int
+    has_headers: bool = True
+    raw_rows: Optional[Sequence[List[Any]]] = field(default=None, repr=False, compare=False)
+    sheet_names: List[str] = field(default_factory=list)
+    # Колоночное представление raw_rows, строится анализатором по требованию
+    columns: Optional[ColumnarTable] = field(default=None, repr=False, compare=False)
+    # Хэши блоков raw_rows для сравнения с новой версией файла (sheet_diff)
+    block_hashes: Optional[List[bytes]] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.raw_rows is None:
+            first_row = [list(self.headers)] if self.has_headers else []
+            self.raw_rows = first_row + list(self.data)
+            self.data = RowsView(self.raw_rows, self.data_offset)
+
+    @property
+    def data_offset(self) -> int:
+        """Индекс первой строки данных в raw_rows"""
+        return 1 if self.has_headers else 0
+
+    def with_headers(self, has_headers: bool) -> "ExcelFileInfo":
+        """
+        Переосмысливает первую строку без повторного чтения файла
+
+        Args:
+            has_headers: Первая строка - заголовки
+
+        Returns:
+            ExcelFileInfo: Информация о файле над теми же строками
+        """
+        if has_headers == self.has_headers:
+            return self
+        headers = self.raw_rows[0] if has_headers and self.raw_rows else []
+        return replace(
+            self,
+            headers=headers,
+            data=RowsView(self.raw_rows, 1 if has_headers else 0),
+            has_headers=has_headers
+        )
+
+
+@dataclass
+class SheetChanges:
+    """
+    Отличия нового чтения листа от предыдущего
+
+    Индексы строк - в raw_rows (строка 0 - первая строка листа).
+    """
+    old_count: int
+    new_count: int
+    # Строка -> столбцы, в которых изменились значения
+    changed_cells: Dict[int, List[int]] = field(default_factory=dict)
+    # Изменилась ширина листа или сам лист: нужен полный пересчет
+    structural: bool = False
+
+    @property
+    def appended(self) -> int:
+        return max(0, self.new_count - self.old_count)
+
+    @property
+    def removed(self) -> int:
+        return max(0, self.old_count - self.new_count)
+
+    @property
+    def changed_rows(self) -> List[int]:
+        return sorted(self.changed_cells)
+
+    @property
+    def unchanged(self) -> bool:
+        return not (self.structural or self.changed_cells or self.appended or self.removed)
+
+    def changed_columns(self, first_row: int = 0) -> Set[int]:
+        """Столбцы с измененными значениями в строках начиная с first_row"""
+        return {column for row, columns in self.changed_cells.items()
+                if row >= first_row for column in columns}
+
+
+@dataclass
+class RowFilter:
+    """Условие фильтра строк: «столбец оператор значение»"""
+    column: int
+    column_name: str
+    operator: str
+    value: str
+
+
+@dataclass
+class PivotKey:
+    """Столбец группировки сводной таблицы; даты можно укрупнить до периода"""
+    column: int
+    column_name: str
+    # None, "day", "month", "quarter" или "year" (см. modules/pivot.py)
+    period: Optional[str] = None
+
+
+@dataclass
+class PivotAggregate:
+    """Агрегат сводной таблицы: функция над столбцом (column=None - число строк)"""
+    function: str
+    column: Optional[int] = None
+    column_name: str = ""
+
+
+@dataclass
+class PivotResult:
+    """
+    Сводная таблица: строка на группу, сначала ключи, затем агрегаты
+
+    Группы упорядочены по ключам; пустой ключ - None, группа без
+    значений для агрегата - None в его столбце.
+    """
+    headers: List[str]
+    rows: List[List[Any]]
+    key_count: int
+    # Строк листа, попавших в группировку (после фильтра)
+    source_rows: int = 0
+
+
+@dataclass
+class SheetInfo:
+    """
+    Метаданные листа без чтения строк данных
+
+    count_row берется из метаданных файла и может быть завышен;
+    count_column - ширина первой строки.
+    """
+    file_path: str
+    file_name: str
+    sheet_name: str
+    headers: List[str]
+    count_row: int
+    count_column: int
+    sheet_names: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchItem:
+    """Результат пакетного анализа одного листа"""
+    file_path: str
+    sheet_name: Optional[str]
+    result: Optional[AnalysisResult] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class CacheStats:
+    """Счетчики кэша разобранных листов"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size_bytes: int = 0
 
 
 @dataclass
@@ -69,6 +341,28 @@ class AppConfig:
     table_min_size: List[int]
     analysis_panel_width: int
     excel_ext: List[str]
+    batch_size: int
+    xlsx_engine: str
+    max_empty_rows: int
+    compact_storage: bool
+    csv_fallback_encoding: str
+    progressive: bool
+    first_rows: int
+    cache_enabled: bool
+    cache_dir: str
+    cache_max_size_mb: int
+    batch_workers: int
+    watch_enabled: bool
+    watch_debounce_ms: int
+    instrumentation_enabled: bool
+    trace_file: str
+    profile_file: str
     has_headers: bool
-    size_type_detect: int
+    columnar_backend: bool
+    provisional_rows: int
+    sketches_enabled: bool
+    sketch_exact_limit: int
+    sketch_top_k: int
+    sketch_hll_precision: int
+    sketch_kll_k: int
     date_formats: List[str]
@@ -25,4 +25,24 @@ class EmptyFileError(FileLoadError):
 
 class AnalysisError(BaseError):
     """Ошибка при анализе данных"""
-    pass
\ No newline at end of file
+    pass
+
+
+class LoadCancelledError(BaseError):
+    """Загрузка прервана пользователем"""
+    pass
+
+
+class FilterError(BaseError):
+    """Некорректное условие фильтра строк"""
+    pass
+
+
+class ExportError(BaseError):
+    """Ошибка экспорта данных или статистики"""
+    pass
+
+
+class PivotError(BaseError):
+    """Сводную таблицу нельзя построить с заданными параметрами"""
+    pass
@@ -0,0 +1,262 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .constants import CONFIG
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 0
+
+# Изменения памяти меньше этого в сводке не показываются
+MIN_REPORTED_BYTES = 100 * 1024
+
+
+class Span:
+    """Замер одного этапа: длительность, счетчики и изменение памяти"""
+
+    __slots__ = ("name", "depth", "thread", "started", "duration",
+                 "counters", "rss_delta", "traced_delta")
+
+    def __init__(self, name: str, depth: int, counters: Dict[str, int]):
+        self.name = name
+        self.depth = depth
+        self.thread = threading.current_thread().name
+        self.started = 0.0
+        self.duration = 0.0
+        self.counters = counters
+        self.rss_delta: Optional[int] = None
+        self.traced_delta: Optional[int] = None
+
+    def count(self, **counters: int):
+        """Добавляет к счетчикам этапа (строки, ячейки и т.п.)"""
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "thread": self.thread,
+            "started": self.started,
+            "seconds": self.duration,
+            "counters": dict(self.counters),
+            "rss_delta_bytes": self.rss_delta,
+            "traced_delta_bytes": self.traced_delta,
+        }
+
+
+class _NullSpan:
+    """Замер, который ничего не делает: инструментирование выключено"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def count(self, **counters: int):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("_owner", "_span", "_rss", "_traced")
+
+    def __init__(self, owner: "Instrumentation", name: str, counters: Dict[str, int]):
+        self._owner = owner
+        self._span = Span(name, owner._enter(), counters)
+
+    def __enter__(self) -> Span:
+        self._rss = _current_rss()
+        self._traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._span.started = time.perf_counter()
+        return self._span
+
+    def __exit__(self, *exc_info) -> bool:
+        span = self._span
+        span.duration = time.perf_counter() - span.started
+        rss = _current_rss()
+        if rss is not None and self._rss is not None:
+            span.rss_delta = rss - self._rss
+        if self._traced is not None and tracemalloc.is_tracing():
+            span.traced_delta = tracemalloc.get_traced_memory()[0] - self._traced
+        self._owner._exit(span)
+        return False
+
+
+class Instrumentation:
+    """
+    Замеры этапов загрузки, анализа и отображения
+
+    Этап оборачивается в span(name): время, счетчики строк/ячеек и
+    изменение RSS (и памяти tracemalloc, если он запущен). Когда
+    инструментирование выключено, span возвращает общий пустой объект,
+    поэтому накладные расходы - одна проверка флага на этап.
+    """
+
+    # Сколько последних замеров хранить
+    MAX_SPANS = 10000
+
+    def __init__(self, enabled: Optional[bool] = None):
+        # None - взять из настройки debug.instrumentation при первом замере
+        self._enabled = enabled
+        self._spans: Deque[Tuple[int, Span]] = deque(maxlen=self.MAX_SPANS)
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = CONFIG.instrumentation_enabled
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        self._enabled = enabled
+
+    def span(self, name: str, **counters: int):
+        """
+        Замер этапа для использования в with
+
+        Args:
+            name: Имя этапа, например "load.parse"
+            **counters: Начальные значения счетчиков
+
+        Returns:
+            Контекстный менеджер, отдающий Span (или пустой замер)
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _ActiveSpan(self, name, counters)
+
+    def mark(self) -> int:
+        """Метка для records(since=...): замеры после этого момента"""
+        with self._lock:
+            return self._sequence
+
+    def records(self, since: int = 0) -> List[Span]:
+        """
+        Завершенные замеры в порядке завершения
+
+        Args:
+            since: Метка из mark()
+
+        Returns:
+            List[Span]: Замеры
+        """
+        with self._lock:
+            return [span for sequence, span in self._spans if sequence >= since]
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+
+    def dump_trace(self, path: str, since: int = 0):
+        """
+        Сохраняет замеры в формате Trace Event (chrome://tracing, Perfetto)
+
+        Args:
+            path: Путь к JSON-файлу
+            since: Метка из mark()
+        """
+        pid = os.getpid()
+        events = [{
+            "name": span.name,
+            "ph": "X",
+            "ts": span.started * 1e6,
+            "dur": span.duration * 1e6,
+            "pid": pid,
+            "tid": span.thread,
+            "args": span.to_dict(),
+        } for span in self.records(since)]
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f,
+                      ensure_ascii=False, indent=1)
+
+    @contextmanager
+    def profile(self, path: Optional[str]) -> Iterator[None]:
+        """
+        Профилирует блок cProfile в текущем потоке, если задан путь
+
+        Args:
+            path: Куда сохранить статистику (pstats); пусто - без профиля
+        """
+        if not path:
+            yield
+            return
+
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+
+    def _enter(self) -> int:
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        return depth
+
+    def _exit(self, span: Span):
+        self._local.depth = span.depth
+        with self._lock:
+            self._spans.append((self._sequence, span))
+            self._sequence += 1
+
+
+def format_breakdown(spans: List[Span], nested: bool = False) -> str:
+    """
+    Краткая сводка по этапам для строки состояния
+
+    Args:
+        spans: Замеры
+        nested: Включать вложенные этапы (по строке на этап)
+
+    Returns:
+        str: Сводка
+    """
+    parts = []
+    for span in sorted(spans, key=lambda item: item.started):
+        if span.depth and not nested:
+            continue
+        text = f"{span.name} {span.duration:.3f} с"
+        details = [f"{key}: {value}" for key, value in span.counters.items()]
+        if span.rss_delta and abs(span.rss_delta) >= MIN_REPORTED_BYTES:
+            details.append(f"RSS {span.rss_delta / 2 ** 20:+.1f} МБ")
+        if span.traced_delta and abs(span.traced_delta) >= MIN_REPORTED_BYTES:
+            details.append(f"alloc {span.traced_delta / 2 ** 20:+.1f} МБ")
+        if details:
+            text += f" ({', '.join(details)})"
+        parts.append("  " * span.depth + text if nested else text)
+    return "\n".join(parts) if nested else " · ".join(parts)
+
+
+def _current_rss() -> Optional[int]:
+    """Текущий RSS процесса (Linux), иначе None"""
+    if not PAGE_SIZE:
+        return None
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Общий экземпляр; включается настройкой debug.instrumentation
+INSTRUMENTATION = Instrumentation()
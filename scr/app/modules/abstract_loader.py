@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
-from ..core.dataclasses import ExcelFileInfo
+from typing import List, Any, Iterator
+from ..core.dataclasses import ExcelFileInfo, SheetInfo
 
 
 class AbstractExcelLoader(ABC):
@@ -23,6 +23,42 @@ class AbstractExcelLoader(ABC):
         """
         pass
 
+    @abstractmethod
+    def iter_rows(self, file_path: str, has_headers: bool = True,
+                  batch_size: int = 5000) -> Iterator[List[List[Any]]]:
+        """
+        Потоково читает строки данных пачками, не держа лист в памяти
+
+        Args:
+            file_path: Путь к файлу
+            has_headers: заголовки в первой строке (строка пропускается)
+            batch_size: Количество строк в пачке
+
+        Yields:
+            List[List[Any]]: Очередная пачка строк
+
+        Raises:
+            FileLoadError: Если файл не прочитан
+        """
+        pass
+
+    @abstractmethod
+    def probe_file(self, file_path: str, has_headers: bool = True) -> SheetInfo:
+        """
+        Читает заголовки и размеры листа без загрузки данных
+
+        Args:
+            file_path: Путь к файлу
+            has_headers: заголовки в первой строке
+
+        Returns:
+            SheetInfo: Метаданные листа
+
+        Raises:
+            FileLoadError: Если файл не прочитан
+        """
+        pass
+
     @staticmethod
     def validate_file_ext(file_path: str, allow_ext: List[str]) -> bool:
         """
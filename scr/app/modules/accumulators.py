@@ -0,0 +1,260 @@
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from .sketches import ColumnSketch
+from .types import TypeDetector
+from ..core.constants import CONFIG
+from ..core.dataclasses import ColumnStatistics, ColumnType
+
+# Квантили для ColumnStatistics: медиана, p90, p99
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class ColumnAccumulator:
+    """
+    Накопитель статистики столбца за один проход
+
+    Хранит только счетчики, поэтому память не зависит от числа строк.
+    Тип определяется по гистограмме типов всех значений столбца.
+    Среднее и дисперсия считаются онлайн (алгоритм Уэлфорда), для целых -
+    точной суммой. Число различных, квантили и частые значения собирает
+    ColumnSketch, память которого ограничена настройками analysis.sketches.
+    """
+
+    def __init__(self, type_detector: TypeDetector):
+        self._type_detector = type_detector
+        self._track_numeric = True
+        self.count = 0
+        self.empty_count = 0
+        self._type_counts: Dict[ColumnType, int] = {}
+        # Серия подряд идущих ячеек одного типа: столбцы обычно однородны,
+        # и счетчик серии дешевле поиска в словаре на каждую ячейку
+        self._run_type: Optional[ColumnType] = None
+        self._run_count = 0
+
+        self.float_count = 0
+        self.float_min: Optional[float] = None
+        self.float_max: Optional[float] = None
+        self.float_mean = 0.0
+        # Сумма квадратов отклонений от среднего
+        self.float_m2 = 0.0
+
+        self.int_count = 0
+        self.int_min: Optional[int] = None
+        self.int_max: Optional[int] = None
+        self.int_sum = 0
+
+        self.sketch: Optional[ColumnSketch] = new_sketch()
+
+    @property
+    def numeric_complete(self) -> bool:
+        """Числовые счетчики учитывают все значения столбца"""
+        return self._track_numeric
+
+    def set_numeric_incomplete(self):
+        """Отмечает, что числовые счетчики собраны не по всем значениям"""
+        self._track_numeric = False
+
+    def add(self, value: Any):
+        """
+        Учитывает очередное значение столбца
+
+        Args:
+            value: Значение ячейки
+        """
+        self.count += 1
+        column_type, number = self._type_detector.classify(value)
+        if column_type is self._run_type:
+            self._run_count += 1
+        else:
+            self._flush_run()
+            self._run_type = column_type
+            self._run_count = 1
+
+        if column_type is ColumnType.EMPTY:
+            self.empty_count += 1
+            return
+        if self.sketch is not None:
+            self.sketch.add(value if number is None else number, number)
+        if number is None:
+            # Столбец с нечисловым значением уже не может быть числовым
+            self._track_numeric = False
+        elif self._track_numeric:
+            self.add_number(number)
+
+    def add_type(self, column_type: ColumnType, count: int = 1):
+        """Учитывает count ячеек типа column_type в гистограмме типов"""
+        self._type_counts[column_type] = self._type_counts.get(column_type, 0) + count
+
+    @property
+    def type_counts(self) -> Dict[ColumnType, int]:
+        """Гистограмма типов: число ячеек каждого типа"""
+        self._flush_run()
+        return self._type_counts
+
+    def _flush_run(self):
+        if self._run_count:
+            self.add_type(self._run_type, self._run_count)
+        self._run_type = None
+        self._run_count = 0
+
+    def add_number(self, number: Union[int, float], count: int = 1):
+        """
+        Учитывает count одинаковых чисел в числовых счетчиках
+
+        Args:
+            number: Число
+            count: Сколько раз оно встречается
+        """
+        try:
+            value = float(number)
+        except (ValueError, TypeError, OverflowError):
+            return
+
+        self.float_count += count
+        if self.float_min is None or value < self.float_min:
+            self.float_min = value
+        if self.float_max is None or value > self.float_max:
+            self.float_max = value
+        delta = value - self.float_mean
+        self.float_mean += delta * count / self.float_count
+        self.float_m2 += delta * (value - self.float_mean) * count
+
+        try:
+            integer = number if isinstance(number, int) else int(value)
+        except (ValueError, OverflowError):
+            return
+
+        self.int_count += count
+        if self.int_min is None or integer < self.int_min:
+            self.int_min = integer
+        if self.int_max is None or integer > self.int_max:
+            self.int_max = integer
+        self.int_sum += integer * count
+
+    def merge(self, other: "ColumnAccumulator") -> "ColumnAccumulator":
+        """
+        Объединяет накопитель со следующим за ним фрагментом столбца
+
+        Args:
+            other: Накопитель для строк после текущих
+
+        Returns:
+            ColumnAccumulator: Новый накопитель для обоих фрагментов
+        """
+        merged = ColumnAccumulator(self._type_detector)
+        merged.count = self.count + other.count
+        merged.empty_count = self.empty_count + other.empty_count
+        merged._type_counts = dict(self.type_counts)
+        for column_type, count in other.type_counts.items():
+            merged.add_type(column_type, count)
+        merged._track_numeric = self._track_numeric and other._track_numeric
+
+        merged.float_count = self.float_count + other.float_count
+        merged.float_min = _merge_bound(min, self.float_min, other.float_min)
+        merged.float_max = _merge_bound(max, self.float_max, other.float_max)
+        if merged.float_count:
+            delta = other.float_mean - self.float_mean
+            merged.float_mean = (self.float_mean
+                                 + delta * other.float_count / merged.float_count)
+            merged.float_m2 = (self.float_m2 + other.float_m2
+                               + delta * delta * self.float_count * other.float_count
+                               / merged.float_count)
+
+        merged.int_count = self.int_count + other.int_count
+        merged.int_min = _merge_bound(min, self.int_min, other.int_min)
+        merged.int_max = _merge_bound(max, self.int_max, other.int_max)
+        merged.int_sum = self.int_sum + other.int_sum
+
+        if self.sketch is not None and other.sketch is not None:
+            merged.sketch = self.sketch.merge(other.sketch)
+        else:
+            merged.sketch = None
+        return merged
+
+    def column_type(self) -> ColumnType:
+        """Тип столбца по гистограмме типов"""
+        return self._type_detector.resolve_column_type(self.type_counts)
+
+    def to_statistics(self, name: str) -> ColumnStatistics:
+        """
+        Формирует статистику столбца
+
+        Args:
+            name: Имя столбца
+
+        Returns:
+            ColumnStatistics: Статистика по столбцу
+        """
+        column_type = self.column_type()
+        stats = ColumnStatistics(
+            name=name,
+            column_type=column_type,
+            empty_count=self.empty_count,
+            count_row=self.count - self.empty_count
+        )
+
+        if column_type == ColumnType.INTEGER and self.int_count:
+            stats.min_value = self.int_min
+            stats.max_value = self.int_max
+            stats.mean_value = self.int_sum / self.int_count
+        elif column_type == ColumnType.FLOAT and self.float_count:
+            stats.min_value = self.float_min
+            stats.max_value = self.float_max
+            stats.mean_value = self.float_mean
+
+        if stats.mean_value is not None and self.float_count > 1:
+            stats.std_value = math.sqrt(max(self.float_m2, 0.0) / (self.float_count - 1))
+
+        if self.sketch is not None and stats.count_row:
+            stats.exact = self.sketch.exact
+            stats.distinct_count = self.sketch.distinct_count()
+            stats.top_values = self.sketch.top()
+            if stats.mean_value is not None:
+                stats.median_value, stats.p90_value, stats.p99_value = \
+                    self.sketch.quantiles(QUANTILES)
+
+        return stats
+
+
+@dataclass
+class AnalysisState:
+    """
+    Накопители первой строки листа и остальных строк отдельно
+
+    Позволяет переключать режим заголовков слиянием одной строки
+    со статистикой остальных за O(число столбцов).
+    """
+    first_row: List[ColumnAccumulator]
+    rest_rows: List[ColumnAccumulator]
+
+    def accumulators(self, has_headers: bool) -> List[ColumnAccumulator]:
+        """
+        Накопители строк данных для выбранного режима заголовков
+
+        Args:
+            has_headers: Первая строка - заголовки
+
+        Returns:
+            List[ColumnAccumulator]: Накопители по столбцам
+        """
+        if has_headers:
+            return self.rest_rows
+        return [first.merge(rest) for first, rest in zip(self.first_row, self.rest_rows)]
+
+
+def new_sketch() -> Optional[ColumnSketch]:
+    """Пустая расширенная статистика столбца по настройкам или None, если выключена"""
+    if not CONFIG.sketches_enabled:
+        return None
+    return ColumnSketch(CONFIG.sketch_exact_limit, CONFIG.sketch_top_k,
+                        CONFIG.sketch_hll_precision, CONFIG.sketch_kll_k)
+
+
+def _merge_bound(func, left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return func(left, right)
@@ -0,0 +1,151 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .data_analyzer import DataAnalyzer
+from .excel_loader import ExcelLoader
+from ..core.constants import CONFIG
+from ..core.dataclasses import BatchItem
+from ..core.exceptions import BaseError, FileLoadError
+
+# Все листы книги
+ALL_SHEETS = "*"
+
+
+class BatchAnalyzer:
+    """
+    Пакетный анализ файлов и листов в пуле процессов
+
+    Разбор xlsx упирается в GIL, поэтому листы анализируются в отдельных
+    процессах. В родительский процесс возвращаются только компактные
+    AnalysisResult, строки листов остаются в рабочих процессах.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or CONFIG.batch_workers or os.cpu_count() or 1
+
+    def analyze_files(self, file_paths: Sequence[str],
+                      sheet_names: Optional[Sequence[str]] = None,
+                      has_headers: Optional[bool] = None) -> Iterator[BatchItem]:
+        """
+        Анализирует файлы параллельно, отдавая результаты по мере готовности
+
+        Args:
+            file_paths: Пути к файлам
+            sheet_names: Имена листов; None - активный лист,
+                [ALL_SHEETS] - все листы каждой книги
+            has_headers: Заголовки в первой строке; None - из настроек
+
+        Yields:
+            BatchItem: Результат или ошибка по одному листу
+        """
+        if has_headers is None:
+            has_headers = CONFIG.has_headers
+        all_sheets = sheet_names is not None and ALL_SHEETS in sheet_names
+        sheets: List[Optional[str]] = list(sheet_names) if sheet_names else [None]
+
+        if self.max_workers == 1:
+            yield from self._analyze_inline(file_paths, sheets, all_sheets, has_headers)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: Dict[Future, tuple] = {}
+
+            for file_path in file_paths:
+                if all_sheets:
+                    future = executor.submit(list_sheets_job, file_path)
+                    pending[future] = (file_path, ALL_SHEETS)
+                else:
+                    for sheet_name in sheets:
+                        future = executor.submit(analyze_sheet_job, file_path,
+                                                 sheet_name, has_headers)
+                        pending[future] = (file_path, sheet_name)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, sheet_name = pending.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        yield BatchItem(file_path, sheet_name,
+                                        error=FileLoadError(f"Сбой процесса анализа: {str(e)}"))
+                        continue
+
+                    if isinstance(outcome, BatchItem):
+                        yield outcome
+                        continue
+
+                    for name in outcome:
+                        future = executor.submit(analyze_sheet_job, file_path,
+                                                 name, has_headers)
+                        pending[future] = (file_path, name)
+
+    def _analyze_inline(self, file_paths: Sequence[str], sheets: List[Optional[str]],
+                        all_sheets: bool, has_headers: bool) -> Iterator[BatchItem]:
+        """Последовательный анализ в текущем процессе, без накладных расходов пула"""
+        for file_path in file_paths:
+            if all_sheets:
+                outcome = list_sheets_job(file_path)
+                if isinstance(outcome, BatchItem):
+                    yield outcome
+                    continue
+                file_sheets = outcome
+            else:
+                file_sheets = sheets
+
+            for sheet_name in file_sheets:
+                yield analyze_sheet_job(file_path, sheet_name, has_headers)
+
+    def run(self, file_paths: Sequence[str],
+            sheet_names: Optional[Sequence[str]] = None,
+            has_headers: Optional[bool] = None) -> List[BatchItem]:
+        """
+        Анализирует файлы и возвращает результаты в порядке входных путей
+
+        Args:
+            file_paths: Пути к файлам
+            sheet_names: Имена листов (см. analyze_files)
+            has_headers: Заголовки в первой строке; None - из настроек
+
+        Returns:
+            List[BatchItem]: Результаты по листам
+        """
+        order = {path: i for i, path in enumerate(file_paths)}
+        items = list(self.analyze_files(file_paths, sheet_names, has_headers))
+        return sorted(items, key=lambda item: order.get(item.file_path, len(order)))
+
+
+def list_sheets_job(file_path: str):
+    """Задача пула: имена листов книги или BatchItem с ошибкой"""
+    try:
+        return ExcelLoader().list_sheets(file_path)
+    except BaseError as e:
+        return BatchItem(file_path, ALL_SHEETS, error=e)
+    except Exception as e:
+        return BatchItem(file_path, ALL_SHEETS, error=FileLoadError(str(e)))
+
+
+def analyze_sheet_job(file_path: str, sheet_name: Optional[str],
+                      has_headers: bool) -> BatchItem:
+    """
+    Задача пула: потоковый анализ одного листа
+
+    Args:
+        file_path: Путь к файлу
+        sheet_name: Имя листа (None - активный лист)
+        has_headers: Заголовки в первой строке
+
+    Returns:
+        BatchItem: Результат анализа или ошибка
+    """
+    try:
+        loader = ExcelLoader()
+        sheet_info, batches = loader.stream_sheet(file_path, has_headers,
+                                                  sheet_name=sheet_name)
+        result = DataAnalyzer().analyze_stream(sheet_info, batches, has_headers)
+        return BatchItem(file_path, sheet_info.sheet_name, result=result)
+    except BaseError as e:
+        return BatchItem(file_path, sheet_name, error=e)
+    except Exception as e:
+        return BatchItem(file_path, sheet_name, error=FileLoadError(str(e)))
@@ -0,0 +1,366 @@
+import math
+from itertools import islice
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .accumulators import ColumnAccumulator
+from .sketches import ColumnSketch, HyperLogLog, KllSketch
+from .types import TypeDetector
+from ..core.constants import CONFIG
+from ..core.dataclasses import ColumnData, ColumnKind, ColumnarTable, ColumnType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def is_columnar_enabled() -> bool:
+    """Колоночный режим включен в настройках и NumPy установлен"""
+    return HAS_NUMPY and CONFIG.columnar_backend
+
+
+def build_columnar(rows: Sequence[Sequence[Any]], num_column: int,
+                   offset: int = 0) -> ColumnarTable:
+    """
+    Строит колоночное представление строк
+
+    Числовые столбцы хранятся типизированными массивами, строковые -
+    кодами словаря, остальное - массивом объектов. Пустые ячейки
+    отмечаются в маске valid.
+
+    Args:
+        rows: Строки листа (ExcelFileInfo.raw_rows)
+        num_column: Количество столбцов
+        offset: Первая строка rows, попадающая в столбцы; строка
+            заголовков, оставленная за пределами, не портит их тип
+
+    Returns:
+        ColumnarTable: Данные по столбцам
+    """
+    columns = [build_column(rows, i, offset) for i in range(num_column)]
+    return ColumnarTable(row_count=len(rows) - offset, columns=columns, offset=offset)
+
+
+def build_column(rows: Sequence[Sequence[Any]], index: int, offset: int = 0) -> ColumnData:
+    """
+    Строит колоночное представление одного столбца
+
+    Args:
+        rows: Строки листа
+        index: Номер столбца
+        offset: Первая строка rows, попадающая в столбец
+
+    Returns:
+        ColumnData: Данные столбца
+    """
+    encoded = _dictionary_codes(rows, index, offset)
+    if encoded is not None and all(value.__class__ is str for value in encoded[1]):
+        return _category_column(*encoded)
+
+    objects = np.empty(len(rows) - offset, dtype=object)
+    # Хранилище по столбцам (CompactRows, RowsView) отдает столбец без сборки строк
+    column_values = getattr(rows, "column_values", None)
+    if column_values is not None:
+        objects[:] = column_values(index, offset)
+    else:
+        objects[:] = [row[index] if index < len(row) else ""
+                      for row in islice(rows, offset, None)]
+    column = _build_column(objects)
+    if encoded is not None and column.kind == ColumnKind.OBJECT:
+        column.dictionary = _object_dictionary(*encoded)
+    return column
+
+
+def _dictionary_codes(rows: Sequence[Sequence[Any]], index: int,
+                      offset: int) -> Optional[Tuple["np.ndarray", List[Any]]]:
+    """
+    Коды словаря хранилища по столбцам (CompactRows) без раскодирования значений
+
+    Returns:
+        Optional[Tuple]: Коды int32 (-1 - пустая ячейка) и непустые значения
+            словаря; None, если столбец хранится без словаря
+    """
+    column_codes = getattr(rows, "column_codes", None)
+    encoded = column_codes(index, offset) if column_codes is not None else None
+    if encoded is None:
+        return None
+    codes, dictionary = encoded
+    codes = np.frombuffer(codes, dtype=np.dtype(codes.typecode)) if len(codes) else \
+        np.zeros(0, dtype=np.int32)
+    # Пустые значения словаря (не больше двух: "" и None) получают код -1
+    empty = [i for i, value in enumerate(dictionary) if value == "" or value is None]
+    if not empty:
+        return codes.astype(np.int32), dictionary
+    table = np.full(len(dictionary) + 1, -1, dtype=np.int32)
+    kept = [i for i in range(len(dictionary)) if i not in empty]
+    table[kept] = np.arange(len(kept), dtype=np.int32)
+    return table[codes], [dictionary[i] for i in kept]
+
+
+def _category_column(codes: "np.ndarray", dictionary: List[str]) -> ColumnData:
+    """
+    Столбец CATEGORY из кодов словаря хранилища
+
+    Категории - в порядке первого появления в столбце, как у _build_column;
+    значения, встречающиеся только выше offset (заголовок), отбрасываются.
+    """
+    valid = codes >= 0
+    if not valid.any():
+        return ColumnData(ColumnKind.FLOAT, np.zeros(len(codes), dtype=np.float64), valid)
+    codes, categories = _in_appearance_order(codes, dictionary)
+    return ColumnData(ColumnKind.CATEGORY, codes, valid, categories=categories)
+
+
+def _object_dictionary(codes: "np.ndarray",
+                       dictionary: List[Any]) -> Tuple["np.ndarray", List[Any]]:
+    """
+    Коды словаря хранилища для столбца OBJECT, пронумерованные как при хешировании
+
+    Хранилище различает 1, 1.0 и True; здесь равные значения склеиваются
+    в одно - первое встретившееся в столбце, как у словаря Python.
+    """
+    codes, values = _in_appearance_order(codes, dictionary)
+    index_of = {}
+    remap = np.array([index_of.setdefault(value, len(index_of)) for value in values] + [-1],
+                     dtype=np.int32)
+    return remap[codes], list(index_of)
+
+
+def _in_appearance_order(codes: "np.ndarray",
+                         dictionary: List[Any]) -> Tuple["np.ndarray", List[Any]]:
+    """Перенумерация кодов по первому появлению в столбце без неиспользуемых значений"""
+    # Первая строка каждого кода; у неиспользуемых остается len(codes)
+    first = np.full(len(dictionary), len(codes), dtype=np.int64)
+    rows = np.flatnonzero(codes >= 0)
+    np.minimum.at(first, codes[rows], rows)
+    order = np.argsort(first, kind="stable")[:int((first < len(codes)).sum())]
+    table = np.full(len(dictionary) + 1, -1, dtype=np.int32)
+    table[order] = np.arange(len(order), dtype=np.int32)
+    return table[codes], [dictionary[i] for i in order.tolist()]
+
+
+def _build_column(objects: "np.ndarray") -> ColumnData:
+    valid = (objects != "") & (objects != None)  # noqa: E711 - поэлементное сравнение
+    present = objects[valid]
+    value_types = set(map(type, present))
+
+    if not value_types:
+        values = np.zeros(len(objects), dtype=np.float64)
+        return ColumnData(ColumnKind.FLOAT, values, valid)
+    elif value_types == {int}:
+        try:
+            values = np.zeros(len(objects), dtype=np.int64)
+            values[valid] = present.astype(np.int64)
+            return ColumnData(ColumnKind.INTEGER, values, valid)
+        except OverflowError:
+            pass
+    elif value_types <= {int, float}:
+        values = np.zeros(len(objects), dtype=np.float64)
+        values[valid] = present.astype(np.float64)
+        integer = None
+        if int in value_types:
+            integer = np.zeros(len(objects), dtype=bool)
+            integer[valid] = np.fromiter((type(value) is int for value in present),
+                                         dtype=bool, count=len(present))
+        return ColumnData(ColumnKind.FLOAT, values, valid, integer=integer)
+    elif value_types == {str}:
+        index = {}
+        codes = np.full(len(objects), -1, dtype=np.int32)
+        codes[valid] = np.fromiter(
+            (index.setdefault(value, len(index)) for value in present),
+            dtype=np.int32, count=len(present)
+        )
+        return ColumnData(ColumnKind.CATEGORY, codes, valid, categories=list(index))
+
+    return ColumnData(ColumnKind.OBJECT, objects, valid)
+
+
+def column_accumulator(column: ColumnData, start: int,
+                       type_detector: TypeDetector) -> ColumnAccumulator:
+    """
+    Заполняет накопитель столбца векторно, начиная со строки start
+
+    Args:
+        column: Данные столбца
+        start: Первая учитываемая строка (0 или 1 - без заголовка)
+        type_detector: Детектор типов
+
+    Returns:
+        ColumnAccumulator: Накопитель, как после поэлементного прохода
+    """
+    accumulator = ColumnAccumulator(type_detector)
+
+    if column.kind == ColumnKind.OBJECT:
+        for value in column.values[start:].tolist():
+            accumulator.add(value)
+        return accumulator
+
+    valid = column.valid[start:]
+    accumulator.count = len(valid)
+    accumulator.empty_count = int(len(valid) - valid.sum())
+    if accumulator.empty_count:
+        accumulator.add_type(ColumnType.EMPTY, accumulator.empty_count)
+
+    if column.kind == ColumnKind.CATEGORY:
+        _add_categories(accumulator, column.values[start:][valid],
+                        column.categories, type_detector)
+        return accumulator
+
+    values = column.values[start:][valid]
+    if not len(values):
+        return accumulator
+
+    if column.kind == ColumnKind.INTEGER:
+        accumulator.add_type(ColumnType.INTEGER, len(values))
+    else:
+        int_count = int(column.integer[start:][valid].sum()) if column.integer is not None else 0
+        if int_count:
+            accumulator.add_type(ColumnType.INTEGER, int_count)
+        if len(values) - int_count:
+            accumulator.add_type(ColumnType.FLOAT, len(values) - int_count)
+
+    accumulator.float_count = len(values)
+    accumulator.float_min = float(values.min())
+    accumulator.float_max = float(values.max())
+    accumulator.float_mean = float(values.mean(dtype=np.float64))
+    deviations = values.astype(np.float64) - accumulator.float_mean
+    accumulator.float_m2 = float(np.dot(deviations, deviations))
+    if accumulator.sketch is not None:
+        _fill_sketch(accumulator.sketch, values)
+
+    if column.kind == ColumnKind.INTEGER:
+        integers = values.tolist()
+    else:
+        integers = [int(value) for value in values[np.isfinite(values)].tolist()]
+    if integers:
+        accumulator.int_count = len(integers)
+        accumulator.int_min = min(integers)
+        accumulator.int_max = max(integers)
+        accumulator.int_sum = sum(integers)
+
+    return accumulator
+
+
+def _add_categories(accumulator: ColumnAccumulator, codes: "np.ndarray",
+                    categories: List[str], type_detector: TypeDetector):
+    """
+    Учитывает строковый столбец: каждая уникальная строка разбирается один раз
+
+    Args:
+        accumulator: Накопитель столбца
+        codes: Коды непустых ячеек
+        categories: Словарь строк
+        type_detector: Детектор типов
+    """
+    counts = np.bincount(codes, minlength=len(categories))
+    numbers = []
+    sketch = accumulator.sketch
+
+    for category, count in zip(categories, counts.tolist()):
+        if not count:
+            continue
+        column_type, number = type_detector.classify(category)
+        accumulator.add_type(column_type, count)
+        if sketch is not None:
+            sketch.add(category if number is None else number, number, count)
+        if number is None:
+            accumulator.set_numeric_incomplete()
+        else:
+            numbers.append((number, count))
+
+    if accumulator.numeric_complete:
+        for number, count in numbers:
+            accumulator.add_number(number, count)
+
+
+def _fill_sketch(sketch: ColumnSketch, values: "np.ndarray"):
+    """
+    Заполняет расширенную статистику числового столбца векторно
+
+    Частоты берутся из np.unique. Если различных значений больше
+    exact_limit, оценки строятся сразу из частот, как если бы значения
+    добавлялись по одному (см. fill_hyperloglog и _fill_quantiles).
+
+    Args:
+        sketch: Пустая статистика
+        values: Непустые значения столбца
+    """
+    unique, counts = np.unique(values, return_counts=True)
+    if len(unique) <= sketch.exact_limit:
+        for value, count in zip(unique.tolist(), counts.tolist()):
+            sketch.add(value, value, count)
+        return
+
+    sketch.start_sketch()
+    fill_hyperloglog(sketch.distinct, unique)
+    _fill_quantiles(sketch.quantile_sketch, unique, counts)
+
+    # Частые значения известны точно: в сводку попадают capacity самых
+    # частых за вычетом следующего по частоте, как после вытеснения
+    frequent = sketch.frequent
+    order = np.argsort(-counts, kind="stable")[:frequent.capacity + 1]
+    top = list(zip(unique[order].tolist(), counts[order].tolist()))
+    threshold = top[-1][1] if len(top) > frequent.capacity else 0
+    frequent.counters = {value: count - threshold
+                         for value, count in top[:frequent.capacity] if count > threshold}
+    frequent.decrement = threshold
+
+
+def fill_hyperloglog(sketch: HyperLogLog, values: "np.ndarray"):
+    """
+    Добавляет числа в HyperLogLog векторно
+
+    Хэш совпадает с sketches.value_hash: SplitMix64 от битов float64.
+
+    Args:
+        sketch: Оценка числа различных
+        values: Числа (int64 или float64)
+    """
+    with np.errstate(over="ignore"):
+        x = (values.astype(np.float64) + 0.0).view(np.uint64)
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+
+    width = 64 - sketch.precision
+    index = (x >> np.uint64(width)).astype(np.intp)
+    rest = x & np.uint64((1 << width) - 1)
+    # Остаток меньше 2**53, поэтому показатель frexp равен его bit_length()
+    bit_length = np.frexp(rest.astype(np.float64))[1]
+    rank = (width + 1 - bit_length).astype(np.uint8)
+
+    registers = np.frombuffer(bytes(sketch.registers), dtype=np.uint8).copy()
+    np.maximum.at(registers, index, rank)
+    sketch.registers = bytearray(registers.tobytes())
+
+
+def _fill_quantiles(sketch: KllSketch, unique: "np.ndarray", counts: "np.ndarray"):
+    """
+    Заполняет KLL по отсортированным значениям и их частотам
+
+    Значения делятся на блоки по 2**level рангов (level - наименьший, при
+    котором блоков не больше k); от блока в сводку идет его средний
+    элемент с весом блока. Ошибка ранга - не больше половины блока,
+    то есть меньше 1 / k, что не хуже оценки KLL.
+    """
+    cumulative = np.cumsum(counts)
+    total = int(cumulative[-1])
+    level = max(0, math.ceil(math.log2(total / sketch.k)))
+    block = 1 << level
+
+    full_blocks = total // block
+    ranks = np.arange(full_blocks, dtype=np.int64) * block + block // 2
+    picked = unique[np.searchsorted(cumulative, ranks, side="right")]
+    sketch.add_level(level, picked.tolist())
+
+    # Остаток раскладывается на блоки меньших уровней
+    start = full_blocks * block
+    for level in reversed(range(level)):
+        block = 1 << level
+        if start + block <= total:
+            index = int(np.searchsorted(cumulative, start + block // 2, side="right"))
+            sketch.add(unique[index].item(), block)
+            start += block
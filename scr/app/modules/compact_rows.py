@@ -0,0 +1,224 @@
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Столбец: (значения, словарь, исключения). Со словарем значения - коды
+# в array, без словаря - array чисел или список объектов. Исключения -
+# ячейки числового столбца другого типа (заголовок, пустые): строка -> значение
+Column = Tuple[Sequence[Any], Optional[List[Any]], Optional[Dict[int, Any]]]
+
+# Словарь не строится, если различных значений больше этой доли строк
+MAX_DICTIONARY_RATIO = 0.5
+# Числовой столбец хранится массивом, если ячеек другого типа не больше этой доли
+MAX_EXCEPTION_RATIO = 0.05
+
+
+class ValueInterner:
+    """
+    Общий для всех столбцов листа пул значений
+
+    Равные значения разных столбцов (например, «Да» или одна и та же дата)
+    хранятся одним объектом. 1, 1.0 и True не смешиваются.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values: Dict[Any, Any] = {}
+
+    def __call__(self, value: Any) -> Any:
+        key = value if value.__class__ is str else (value.__class__, value)
+        return self._values.setdefault(key, value)
+
+
+class CompactRows(Sequence):
+    """
+    Строки листа, хранящиеся по столбцам
+
+    Столбцы с повторяющимися значениями хранятся кодами словаря
+    (array 'B', 'H' или 'I'), числовые - array('d') или array('q')
+    (редкие ячейки другого типа, например заголовок, - отдельно),
+    остальные - списком значений. Строка собирается списком
+    при обращении, поэтому CompactRows можно передавать везде, где
+    ожидаются строки листа; изменять полученные строки бессмысленно.
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, columns: List[Column], length: int):
+        self._columns = columns
+        self._length = length
+
+    @property
+    def width(self) -> int:
+        return len(self._columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return list(map(list, zip(*(self._decode(column, start, stop)
+                                        for column in self._columns))))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("индекс строки вне диапазона")
+        return [self._cell(column, index) for column in self._columns]
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        return map(list, zip(*(self._decode(column, 0, self._length)
+                               for column in self._columns)))
+
+    def cell(self, row: int, column: int) -> Any:
+        """Значение ячейки без сборки строки; за шириной листа - пустая строка"""
+        if column >= len(self._columns):
+            return ""
+        return self._cell(self._columns[column], row)
+
+    @staticmethod
+    def _cell(column: Column, row: int) -> Any:
+        values, dictionary, exceptions = column
+        if dictionary is not None:
+            return dictionary[values[row]]
+        if exceptions and row in exceptions:
+            return exceptions[row]
+        return values[row]
+
+    def column_values(self, index: int, start: int = 0) -> List[Any]:
+        """
+        Значения одного столбца без сборки строк
+
+        Args:
+            index: Номер столбца
+            start: Первая строка
+
+        Returns:
+            List[Any]: Значения столбца начиная со строки start
+        """
+        if index >= len(self._columns):
+            return [""] * max(0, self._length - start)
+        return list(self._decode(self._columns[index], start, self._length))
+
+    def column_codes(self, index: int, start: int = 0) -> Optional[Tuple[array, List[Any]]]:
+        """
+        Коды и словарь столбца, хранящегося словарем, без раскодирования
+
+        Args:
+            index: Номер столбца
+            start: Первая строка
+
+        Returns:
+            Optional[Tuple[array, List[Any]]]: Коды строк начиная со start
+                и словарь; None, если столбец хранится без словаря
+        """
+        if index >= len(self._columns):
+            return None
+        values, dictionary, _ = self._columns[index]
+        if dictionary is None:
+            return None
+        return values[start:], dictionary
+
+    @staticmethod
+    def _decode(column: Column, start: int, stop: int) -> Iterator[Any]:
+        values, dictionary, exceptions = column
+        if dictionary is not None:
+            return map(dictionary.__getitem__, values[start:stop])
+        if not exceptions:
+            return iter(values[start:stop])
+        decoded = values[start:stop].tolist()
+        # Ключи исключений вставлены по возрастанию строк
+        rows = list(exceptions)
+        for row in rows[bisect_left(rows, start):bisect_left(rows, stop)]:
+            decoded[row - start] = exceptions[row]
+        return iter(decoded)
+
+    @property
+    def nbytes(self) -> int:
+        """Размер кодов и массивов столбцов (без самих объектов значений)"""
+        size = 0
+        for values, dictionary, exceptions in self._columns:
+            if exceptions:
+                size += 100 * len(exceptions)
+            if isinstance(values, array):
+                size += values.itemsize * len(values)
+            else:
+                size += 8 * len(values)
+            if dictionary is not None:
+                size += 8 * len(dictionary)
+        return size
+
+
+def compact_rows(rows: List[List[Any]], width: int) -> CompactRows:
+    """
+    Переупаковывает строки одинаковой ширины по столбцам
+
+    Args:
+        rows: Строки листа (дополненные до ширины width)
+        width: Количество столбцов
+
+    Returns:
+        CompactRows: Те же строки в компактном виде
+    """
+    interner = ValueInterner()
+    columns = [encode_column([row[i] for row in rows], interner) for i in range(width)]
+    return CompactRows(columns, len(rows))
+
+
+def encode_column(values: List[Any], interner: ValueInterner) -> Column:
+    """
+    Выбирает представление столбца
+
+    Args:
+        values: Значения столбца
+        interner: Общий пул значений листа
+
+    Returns:
+        Column: Значения (коды), словарь и исключения
+    """
+    numeric = _encode_numeric(values)
+    if numeric is not None:
+        return numeric
+
+    limit = max(1, int(len(values) * MAX_DICTIONARY_RATIO))
+    lookup: Dict[Any, int] = {}
+    dictionary: List[Any] = []
+    codes = array("I")
+    append = codes.append
+    for value in values:
+        key = value if value.__class__ is str else (value.__class__, value)
+        code = lookup.get(key)
+        if code is None:
+            if len(dictionary) >= limit:
+                # Почти все значения различны: словарь не окупится
+                return values, None, None
+            code = lookup[key] = len(dictionary)
+            dictionary.append(interner(value))
+        append(code)
+
+    if len(dictionary) <= 1 << 8:
+        codes = array("B", codes)
+    elif len(dictionary) <= 1 << 16:
+        codes = array("H", codes)
+    return codes, dictionary, None
+
+
+def _encode_numeric(values: List[Any]) -> Optional[Column]:
+    """Массив чисел одного типа и исключения; None, если столбец не числовой"""
+    counts: Dict[type, int] = {}
+    for kind in map(type, values):
+        counts[kind] = counts.get(kind, 0) + 1
+    kind = float if counts.get(float, 0) >= counts.get(int, 0) else int
+    if len(values) - counts.get(kind, 0) > len(values) * MAX_EXCEPTION_RATIO:
+        return None
+
+    exceptions = {row: value for row, value in enumerate(values) if value.__class__ is not kind}
+    if exceptions:
+        values = [0 if value.__class__ is not kind else value for value in values]
+    try:
+        return array("d" if kind is float else "q", values), None, exceptions or None
+    except OverflowError:
+        return None
@@ -0,0 +1,260 @@
+import codecs
+import csv
+import io
+import mmap
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+
+from .abstract_loader import AbstractExcelLoader
+from .loader_registry import LOADERS, OpenedSheet
+from ..core.constants import CONFIG
+from ..core.exceptions import FileError
+
+# Сколько байт начала файла разбирать для определения кодировки и разделителя
+SAMPLE_BYTES = 1 << 16
+# Сколько байт декодировать за раз при чтении строк
+CHUNK_BYTES = 1 << 22
+DELIMITERS = ",;\t|"
+
+# Метки порядка байтов: кодировка однозначна
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+_NUMERIC_START = frozenset("-0123456789")
+# Числа без ведущих нулей: «007» и коды вроде «0012» остаются текстом
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+_NUMBER_COMMA = re.compile(r"-?(?:0|[1-9][0-9]*)(?:,[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+_NUMBER_ANY = re.compile(r"-?(?:0|[1-9][0-9]*)(?:[.,][0-9]+)?(?:[eE][-+]?[0-9]+)?")
+# Десятичный разделитель -> разбор чисел; ".," - в образце дробных нет
+_NUMBERS = {".": _NUMBER, ",": _NUMBER_COMMA, ".,": _NUMBER_ANY}
+# Дата и время в ISO-виде, как их пишут выгрузки из баз и Excel
+_ISO_DATE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[ T][0-9]{2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]+)?)?)?")
+# Сколько разобранных значений помнить (повторы в столбцах часты)
+_CACHE_SIZE = 65536
+
+
+def open_csv(file_path: str, sheet_name: Optional[str] = None) -> OpenedSheet:
+    """
+    Открывает CSV/TSV как книгу из одного листа
+
+    Файл отображается в память (mmap) и декодируется блоками по
+    CHUNK_BYTES; строки разбирает модуль csv. Кодировка и разделитель
+    определяются по началу файла, десятичный разделитель - по дробным
+    числам в нем же. Числа без ведущих нулей переводятся в int и float,
+    даты в ISO-виде - в datetime, как в ячейках Excel;
+    остальное остается текстом (другие форматы дат распознает анализатор).
+
+    Args:
+        file_path: Путь к файлу
+        sheet_name: Не используется: лист у файла один
+
+    Returns:
+        OpenedSheet: Метаданные и генератор строк
+    """
+    title = Path(file_path).stem
+    try:
+        file = open(file_path, "rb")
+    except OSError as e:
+        raise FileError(f"Ошибка CSV файла: {str(e)}")
+
+    try:
+        # Пустой файл отобразить нельзя: у него просто нет строк
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if file.seek(0, 2) else b""
+        sample = data[:SAMPLE_BYTES]
+        encoding = detect_encoding(sample)
+        delimiter = detect_delimiter(sample, encoding,
+                                     "\t" if file_path.lower().endswith(".tsv") else ",")
+        decimal = detect_decimal(sample, encoding, delimiter)
+    except Exception as e:
+        file.close()
+        raise FileError(f"Ошибка CSV файла: {str(e)}")
+
+    def rows() -> Iterator[List[Any]]:
+        convert_row = _row_converter(decimal)
+        try:
+            reader = csv.reader(_lines(data, encoding), delimiter=delimiter)
+            yield from map(convert_row, reader)
+        except csv.Error as e:
+            raise FileError(f"Ошибка CSV файла: {str(e)}")
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            file.close()
+
+    return OpenedSheet(title, [title], None, None, rows())
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Кодировка по началу файла
+
+    Метка порядка байтов определяет кодировку однозначно; без нее
+    проверяется UTF-8, иначе берется loader.csv_fallback_encoding.
+
+    Args:
+        sample: Начало файла
+
+    Returns:
+        str: Имя кодировки
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # Последний символ образца может быть обрезан: final=False
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return CONFIG.csv_fallback_encoding
+    return "utf-8"
+
+
+def detect_delimiter(sample: bytes, encoding: str, default: str = ",") -> str:
+    """
+    Разделитель полей по первым строкам
+
+    Args:
+        sample: Начало файла
+        encoding: Кодировка
+        default: Разделитель, если определить не удалось
+
+    Returns:
+        str: Разделитель
+    """
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample)
+    # Последняя строка образца может быть обрезана
+    lines = text.splitlines()[:-1] or text.splitlines()
+    try:
+        return csv.Sniffer().sniff("\n".join(lines[:50]), DELIMITERS).delimiter
+    except csv.Error:
+        pass
+
+    # Sniffer не справился (например, одна колонка в части строк):
+    # разделитель, который чаще всех встречается в первой строке
+    counts = {delimiter: lines[0].count(delimiter) for delimiter in DELIMITERS} if lines else {}
+    best = max(counts, key=counts.get, default=default)
+    return best if counts.get(best) else default
+
+
+def detect_decimal(sample: bytes, encoding: str, delimiter: str) -> str:
+    """
+    Десятичный разделитель по дробным числам в первых строках
+
+    При разделителе полей «,» запятая в числе (в кавычках) скорее
+    разделяет разряды, поэтому дробная часть - только после точки.
+
+    Args:
+        sample: Начало файла
+        encoding: Кодировка
+        delimiter: Разделитель полей
+
+    Returns:
+        str: "." или ","; ".," - в образце нет дробных чисел, подходят оба
+    """
+    if delimiter == ",":
+        return "."
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample)
+    # Последняя строка образца может быть обрезана
+    lines = text.splitlines()[:-1] or text.splitlines()
+    dots = commas = 0
+    try:
+        for row in csv.reader(lines, delimiter=delimiter):
+            for field in row:
+                if "." in field and _NUMBER.fullmatch(field):
+                    dots += 1
+                elif "," in field and _NUMBER_COMMA.fullmatch(field):
+                    commas += 1
+    except csv.Error:
+        pass
+    if dots == commas:
+        return ".," if not dots else "."
+    return "." if dots > commas else ","
+
+
+def looks_like_csv(head: bytes) -> bool:
+    """Начало файла похоже на текст с разделителями (для незнакомых расширений)"""
+    if not head:
+        return False
+    text = codecs.getincrementaldecoder(detect_encoding(head))(errors="replace").decode(head)
+    if "\ufffd" in text or "\0" in text:
+        return False
+    lines = text.splitlines()
+    return bool(lines) and any(delimiter in lines[0] for delimiter in DELIMITERS)
+
+
+def _lines(data, encoding: str) -> Iterator[str]:
+    """
+    Строки файла с окончаниями, декодированные блоками
+
+    Незавершенная строка в конце блока (в том числе «\\r» без «\\n»)
+    переносится в следующий блок, поэтому строки и кавычки с переводами
+    строк внутри не разрываются на границах блоков.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    tail = ""
+    for start in range(0, len(data), CHUNK_BYTES):
+        lines = io.StringIO(tail + decoder.decode(data[start:start + CHUNK_BYTES]),
+                            newline="").readlines()
+        tail = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield from lines
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _row_converter(decimal: str) -> Callable[[List[str]], List[Any]]:
+    """
+    Перевод полей строки в значения ячеек
+
+    Значения запоминаются: повторяющиеся поля (справочники, даты)
+    переводятся поиском в словаре без вызова функции на каждую ячейку.
+
+    Args:
+        decimal: Десятичный разделитель (см. detect_decimal)
+
+    Returns:
+        Callable[[List[str]], List[Any]]: Пустое поле - "", число - int
+            или float, дата - datetime, иначе текст
+    """
+    number = _NUMBERS[decimal]
+    extract_value = AbstractExcelLoader.extract_value
+    cache = {}
+    lookup = cache.get
+
+    def convert(text: str) -> Any:
+        value = text
+        if text and text[0] in _NUMERIC_START:
+            if number.fullmatch(text):
+                value = int(text) if text.lstrip("-").isdigit() else float(text.replace(",", "."))
+            elif _ISO_DATE.fullmatch(text):
+                try:
+                    value = datetime.fromisoformat(text)
+                except ValueError:
+                    pass
+        else:
+            value = extract_value(text)
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+        cache[text] = value
+        return value
+
+    def convert_row(row: List[str]) -> List[Any]:
+        # В словаре нет None: None - еще не переведенное поле
+        values = list(map(lookup, row))
+        if None in values:
+            for i, value in enumerate(values):
+                if value is None:
+                    values[i] = convert(row[i])
+        return values
+
+    return convert_row
+
+
+LOADERS.register([".csv", ".tsv"], open_csv, sniff=looks_like_csv)
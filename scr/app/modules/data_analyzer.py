@@ -1,8 +1,11 @@
-import statistics
-from typing import List, Any
+from typing import Any, Iterable, List, Optional
 
+from .accumulators import AnalysisState, ColumnAccumulator
 from .types import TypeDetector
-from ..core.dataclasses import AnalysisResult, ColumnStatistics, ColumnType, ExcelFileInfo
+from ..core.dataclasses import (
+    AnalysisResult, ColumnStatistics, ExcelFileInfo, RowsView, SheetChanges, SheetInfo
+)
+from ..core.instrumentation import INSTRUMENTATION
 from ..core.exceptions import AnalysisError
 
 
@@ -38,15 +41,16 @@ class DataAnalyzer:
                     total_rows=0,
                     count_column=0,
                     has_headers=has_headers,
-                    column_name=headers
+                    column_name=headers,
+                    sheet_names=file_info.sheet_names
                 )
 
-            trans_data = self._transpose_data(data_row, file_info.count_column)
-
-            statistic_list = []
-            for i, (header, column_values) in enumerate(zip(headers, trans_data)):
-                column_stats = self._analyze_column(header, column_values)
-                statistic_list.append(column_stats)
+            with INSTRUMENTATION.span("analysis", rows=len(file_info.raw_rows),
+                                      columns=file_info.count_column):
+                state = self._build_state(file_info)
+                accumulators = self._data_accumulators(file_info, state)
+                with INSTRUMENTATION.span("analysis.statistics"):
+                    statistic = self._build_statistics(headers, accumulators)
 
             return AnalysisResult(
                 file_name=file_info.file_name,
@@ -55,97 +59,342 @@ class DataAnalyzer:
                 count_column=file_info.count_column,
                 has_headers=has_headers,
                 column_name=headers,
-                statistic=statistic_list
+                statistic=statistic,
+                sheet_names=file_info.sheet_names,
+                state=state
             )
 
         except Exception as e:
             raise AnalysisError(f"Ошибка при анализе данных: {str(e)}")
 
-    def _transpose_data(self, data: List[List[Any]], num_column: int) -> List[List[Any]]:
+    def reanalyze_headers(self, file_info: ExcelFileInfo,
+                          previous: AnalysisResult) -> AnalysisResult:
         """
-        Транспонирует данные для анализа по столбцам
+        Пересчитывает анализ после переключения режима заголовков
+
+        Первая строка добавляется к накопителям остальных строк или
+        исключается из них, повторного прохода по данным нет.
 
         Args:
-            data: Список строк
-            num_column: Количество столбцов
+            file_info: Файл с новым режимом (ExcelFileInfo.with_headers)
+            previous: Предыдущий результат анализа этого файла
 
         Returns:
-            List[List[Any]]: Данные по столбцам
+            AnalysisResult: Результаты анализа
         """
-        column = [[] for _ in range(num_column)]
+        if previous is None or previous.state is None or not file_info.data:
+            return self.analyze(file_info, file_info.has_headers)
 
-        for row in data:
-            for i in range(num_column):
-                if i < len(row):
-                    column[i].append(row[i])
-                else:
-                    column[i].append("")
+        try:
+            if file_info.has_headers:
+                headers = file_info.headers
+            else:
+                headers = [f"Column_{i+1}" for i in range(file_info.count_column)]
+
+            with INSTRUMENTATION.span("analysis.headers", columns=file_info.count_column):
+                accumulators = self._data_accumulators(file_info, previous.state)
+                statistic = self._build_statistics(headers, accumulators)
+
+            return AnalysisResult(
+                file_name=file_info.file_name,
+                sheet_name=file_info.sheet_name,
+                total_rows=file_info.count_row,
+                count_column=file_info.count_column,
+                has_headers=file_info.has_headers,
+                column_name=headers,
+                statistic=statistic,
+                sheet_names=file_info.sheet_names,
+                state=previous.state
+            )
+
+        except Exception as e:
+            raise AnalysisError(f"Ошибка при анализе данных: {str(e)}")
+
+    def update_analysis(self, file_info: ExcelFileInfo, previous: AnalysisResult,
+                        changes: SheetChanges) -> AnalysisResult:
+        """
+        Пересчитывает анализ после изменения файла на диске
+
+        Столбцы с измененными значениями пересчитываются целиком, к
+        накопителям остальных добавляются только дописанные строки.
+        Статистика незатронутых столбцов берется из previous без изменений
+        (те же объекты ColumnStatistics). Если строки удалены или лист
+        изменился структурно, выполняется полный анализ.
+
+        Args:
+            file_info: Новое чтение листа
+            previous: Анализ предыдущего чтения в том же режиме заголовков
+            changes: Отличия (sheet_diff.diff_sheets)
+
+        Returns:
+            AnalysisResult: Результаты анализа
+        """
+        if (previous is None or previous.state is None or changes.structural
+                or changes.removed or previous.has_headers != file_info.has_headers
+                or not file_info.data):
+            return self.analyze(file_info, file_info.has_headers)
+
+        try:
+            if file_info.has_headers:
+                headers = file_info.headers
+            else:
+                headers = [f"Column_{i+1}" for i in range(file_info.count_column)]
+
+            with INSTRUMENTATION.span("analysis.update", rows=changes.appended,
+                                      columns=len(changes.changed_columns(1))):
+                state = self._update_state(file_info, previous.state, changes)
+                accumulators = self._data_accumulators(file_info, state)
+
+                touched = changes.changed_columns(file_info.data_offset)
+                if changes.appended:
+                    touched = set(range(len(accumulators)))
+                statistic = [
+                    previous.statistic[i]
+                    if i not in touched and header == previous.column_name[i]
+                    else accumulator.to_statistics(header)
+                    for i, (header, accumulator) in enumerate(zip(headers, accumulators))
+                ]
+
+            return AnalysisResult(
+                file_name=file_info.file_name,
+                sheet_name=file_info.sheet_name,
+                total_rows=file_info.count_row,
+                count_column=file_info.count_column,
+                has_headers=file_info.has_headers,
+                column_name=headers,
+                statistic=statistic,
+                sheet_names=file_info.sheet_names,
+                state=state
+            )
+
+        except Exception as e:
+            raise AnalysisError(f"Ошибка при анализе данных: {str(e)}")
+
+    def analyze_stream(self, sheet_info: SheetInfo, batches: Iterable[List[List[Any]]],
+                       has_headers: bool = True) -> AnalysisResult:
+        """
+        Анализирует лист за один проход по пачкам строк, не загружая его целиком
+
+        Args:
+            sheet_info: Метаданные листа
+            batches: Пачки строк данных (например, ExcelLoader.iter_rows)
+            has_headers: Первая строка - заголовки
+
+        Returns:
+            AnalysisResult: Результаты анализа
+        """
+        try:
+            with INSTRUMENTATION.span("analysis.stream") as span:
+                accumulators = self.accumulate(batches, sheet_info.count_column)
+                data_rows = accumulators[0].count if accumulators else 0
+                span.count(rows=data_rows)
+            return self.stream_result(sheet_info, accumulators, has_headers)
 
-        return column
+        except Exception as e:
+            raise AnalysisError(f"Ошибка при анализе данных: {str(e)}")
 
-    def _analyze_column(self, column_name: str, column_data: List[Any]) -> ColumnStatistics:
+    def stream_result(self, sheet_info: SheetInfo, accumulators: List[ColumnAccumulator],
+                      has_headers: bool = True) -> AnalysisResult:
         """
-        Анализирует столбец
+        Результат анализа по накопителям потокового прохода
 
         Args:
-            column_name: Имя столбца
-            column_data: Данные столбца
+            sheet_info: Метаданные листа
+            accumulators: Накопители столбцов (см. accumulate)
+            has_headers: Первая строка - заголовки
 
         Returns:
-            ColumnStatistics: Статистика по столбцу
+            AnalysisResult: Результаты анализа
         """
-        column_type = self.type_detector.detect_column_type(column_data)
-        empty_count = sum(1 for value in column_data
-                          if value is None or value == "")
+        data_rows = accumulators[0].count if accumulators else 0
+        # Ширина листа известна только после прохода по строкам
+        count_column = max(len(accumulators), len(sheet_info.headers))
+
+        if has_headers:
+            headers = list(sheet_info.headers)
+            headers += [""] * (count_column - len(headers))
+        else:
+            headers = [f"Column_{i+1}" for i in range(count_column)]
 
-        stats = ColumnStatistics(
-            name=column_name,
-            column_type=column_type,
-            empty_count=empty_count,
-            count_row=len(column_data) - empty_count
+        if not data_rows:
+            return AnalysisResult(
+                file_name=sheet_info.file_name,
+                sheet_name=sheet_info.sheet_name,
+                total_rows=0,
+                count_column=0,
+                has_headers=has_headers,
+                column_name=headers,
+                sheet_names=sheet_info.sheet_names
+            )
+
+        return AnalysisResult(
+            file_name=sheet_info.file_name,
+            sheet_name=sheet_info.sheet_name,
+            total_rows=data_rows + (1 if has_headers else 0),
+            count_column=count_column,
+            has_headers=has_headers,
+            column_name=headers,
+            statistic=self._build_statistics(headers, accumulators),
+            sheet_names=sheet_info.sheet_names
         )
 
-        if self.type_detector.is_numeric_type(column_type):
-            numeric_values = self._extract_numeric_values(column_data, column_type)
-            if numeric_values:
-                try:
-                    stats.min_value = min(numeric_values)
-                    stats.max_value = max(numeric_values)
-                    stats.mean_value = statistics.mean(numeric_values)
-                except (ValueError, TypeError):
-                    pass
+    def accumulate(self, batches: Iterable[List[List[Any]]], num_column: int,
+                   accumulators: Optional[List[ColumnAccumulator]] = None
+                   ) -> List[ColumnAccumulator]:
+        """
+        Проходит по строкам один раз, обновляя накопители столбцов
+
+        Если строка длиннее num_column, добавляются накопители для новых
+        столбцов: в предыдущих строках эти ячейки считаются пустыми.
+
+        Args:
+            batches: Пачки строк
+            num_column: Количество столбцов
+            accumulators: Накопители предыдущих пачек, чтобы продолжить
+                подсчет; None - начать заново
+
+        Returns:
+            List[ColumnAccumulator]: Накопители по столбцам
+        """
+        accumulators = list(accumulators or [])
+        rows_seen = accumulators[0].count if accumulators else 0
+        accumulators.extend(self._new_accumulator(rows_seen)
+                            for _ in range(num_column - len(accumulators)))
+
+        for batch in batches:
+            for row in batch:
+                if len(row) > len(accumulators):
+                    accumulators.extend(self._new_accumulator(rows_seen)
+                                        for _ in range(len(row) - len(accumulators)))
+                for accumulator, value in zip(accumulators, row):
+                    accumulator.add(value)
+                for accumulator in accumulators[len(row):]:
+                    accumulator.add("")
+                rows_seen += 1
+
+        return accumulators
+
+    def _new_accumulator(self, empty_rows: int) -> ColumnAccumulator:
+        accumulator = ColumnAccumulator(self.type_detector)
+        for _ in range(empty_rows):
+            accumulator.add("")
+        return accumulator
+
+    def _build_state(self, file_info: ExcelFileInfo) -> AnalysisState:
+        """
+        Собирает накопители первой строки и остальных строк листа
+
+        Остальные строки считаются векторно по колоночному представлению,
+        если доступен NumPy; оно сохраняется в file_info.columns
+        (без первой строки).
 
-        return stats
+        Args:
+            file_info: Информация о файле
 
-    def _extract_numeric_values(self, column_data: List[Any], column_type: ColumnType) -> List[float]:
+        Returns:
+            AnalysisState: Накопители по столбцам
         """
-        Извлекает числа из столбца
+        # NumPy импортируется при первом анализе, а не при запуске приложения
+        from .columnar import build_columnar, column_accumulator, is_columnar_enabled
+
+        rows = file_info.raw_rows
+        num_column = file_info.count_column
+        first_row = self.accumulate([rows[:1]], num_column)
+
+        if is_columnar_enabled():
+            if file_info.columns is None:
+                with INSTRUMENTATION.span("analysis.columnar"):
+                    file_info.columns = build_columnar(rows, num_column, offset=1)
+            with INSTRUMENTATION.span("analysis.accumulate"):
+                rest_rows = [column_accumulator(column, 0, self.type_detector)
+                             for column in file_info.columns.columns]
+        else:
+            with INSTRUMENTATION.span("analysis.accumulate"):
+                rest_rows = self.accumulate([RowsView(rows, 1)], num_column)
+
+        return AnalysisState(first_row=first_row, rest_rows=rest_rows)
+
+    def _update_state(self, file_info: ExcelFileInfo, previous: AnalysisState,
+                      changes: SheetChanges) -> AnalysisState:
+        """
+        Накопители нового чтения листа на основе предыдущих
 
         Args:
-            column_data: Данные столбца
-            column_type: Тип столбца
+            file_info: Новое чтение листа
+            previous: Накопители предыдущего чтения
+            changes: Отличия, без удаленных строк
+
+        Returns:
+            AnalysisState: Накопители по столбцам
+        """
+        from .columnar import build_column, column_accumulator, is_columnar_enabled
+
+        rows = file_info.raw_rows
+        num_column = file_info.count_column
+        first_row = self.accumulate([rows[:1]], num_column)
+        changed = changes.changed_columns(1)
+
+        appended = []
+        if changes.appended:
+            appended = self._rows_accumulators(rows[changes.old_count:], num_column)
+
+        rest_rows = []
+        for i, accumulator in enumerate(previous.rest_rows):
+            if i in changed:
+                if is_columnar_enabled():
+                    accumulator = column_accumulator(build_column(rows, i, offset=1), 0,
+                                                     self.type_detector)
+                else:
+                    accumulator = self._accumulate_column(RowsView(rows, 1), i)
+            elif appended:
+                accumulator = accumulator.merge(appended[i])
+            rest_rows.append(accumulator)
+
+        return AnalysisState(first_row=first_row, rest_rows=rest_rows)
+
+    def _rows_accumulators(self, rows: List[List[Any]], num_column: int) -> List[ColumnAccumulator]:
+        """Накопители для отдельного набора строк (векторно, если доступен NumPy)"""
+        from .columnar import build_columnar, column_accumulator, is_columnar_enabled
+
+        if not is_columnar_enabled():
+            return self.accumulate([rows], num_column)
+        return [column_accumulator(column, 0, self.type_detector)
+                for column in build_columnar(rows, num_column).columns]
+
+    def _data_accumulators(self, file_info: ExcelFileInfo,
+                           state: AnalysisState) -> List[ColumnAccumulator]:
+        """
+        Накопители строк данных файла с учетом режима заголовков
+
+        Столбцы, ставшие числовыми только после слияния с первой строкой,
+        для которых числа не собирались, пересчитываются отдельно.
+
+        Args:
+            file_info: Информация о файле
+            state: Накопители первой и остальных строк
 
         Returns:
-            List[float]: Список числовых значений
+            List[ColumnAccumulator]: Накопители по столбцам
         """
-        numeric_values = []
+        accumulators = list(state.accumulators(file_info.has_headers))
 
-        if not self.type_detector.is_numeric_type(column_type):
-            return numeric_values
+        for i, accumulator in enumerate(accumulators):
+            if (not accumulator.numeric_complete
+                    and self.type_detector.is_numeric_type(accumulator.column_type())):
+                accumulators[i] = self._accumulate_column(file_info.data, i)
 
-        for value in column_data:
-            if value is None or value == "":
-                continue
+        return accumulators
 
-            try:
-                if column_type == ColumnType.INTEGER:
-                    numeric_values.append(int(float(value)))
-                elif column_type == ColumnType.FLOAT:
-                    numeric_values.append(float(value))
-            except (ValueError, TypeError):
-                continue
+    def _accumulate_column(self, rows: Iterable[List[Any]], index: int) -> ColumnAccumulator:
+        accumulator = ColumnAccumulator(self.type_detector)
+        for row in rows:
+            accumulator.add(row[index] if index < len(row) else "")
+        return accumulator
 
-        return numeric_values
+    def _build_statistics(self, headers: List[str],
+                          accumulators: List[ColumnAccumulator]) -> List[ColumnStatistics]:
+        return [accumulator.to_statistics(header)
+                for header, accumulator in zip(headers, accumulators)]
 
     def get_analyze(self, analysis_result: AnalysisResult) -> str:
         """
@@ -1,123 +1,452 @@
 import os
+from contextlib import closing
 from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 
+from . import csv_loader  # noqa: F401 - регистрирует CSV/TSV в LOADERS
 from .abstract_loader import AbstractExcelLoader
+from .compact_rows import compact_rows
+from .loader_registry import LOADERS, OpenedSheet
+from .parse_cache import ParseCache
 from ..core.constants import CONFIG
-from ..core.dataclasses import ExcelFileInfo
+from ..core.instrumentation import INSTRUMENTATION
+from ..core.dataclasses import ExcelFileInfo, RowsView, SheetInfo
 from ..core.exceptions import (
     FileLoadError, FileFormatError,
-    FileError, EmptyFileError
+    FileError, EmptyFileError, LoadCancelledError
 )
 
+ProgressCallback = Optional[Callable[[int], None]]
+# Получает метаданные листа и очередные строки данных во время чтения
+RowsCallback = Optional[Callable[[SheetInfo, List[List[Any]]], None]]
+
+# Движок чтения .xlsx: openpyxl (по умолчанию) или собственный разбор XML
+XLSX_ENGINE_OPENPYXL = "openpyxl"
+XLSX_ENGINE_NATIVE = "native"
+
+
+# Сигнатуры начала файла: zip-архив (.xlsx) и составной документ OLE2 (.xls)
+ZIP_SIGNATURE = b"PK\x03\x04"
+OLE2_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
 
 class ExcelLoader(AbstractExcelLoader):
-    """Загрузчик .xlsx и .xls"""
+    """
+    Загрузчик листов: .xlsx, .xls и форматы из реестра LOADERS
 
-    def load_file(self, file_path: str, has_headers: bool = CONFIG.has_headers) -> ExcelFileInfo:
+    Формат файла выбирает реестр (loader_registry); кэш, обрезка пустых
+    строк и компактное хранение одинаковы для всех форматов.
+    """
+
+    # Как часто (в строках) сообщать о прогрессе чтения
+    PROGRESS_STEP = 1000
+
+    def __init__(self, cache: Optional[ParseCache] = None):
+        self.cache = cache if cache is not None else ParseCache.from_config()
+
+    def load_file(self, file_path: str, has_headers: Optional[bool] = None,
+                  progress_callback: ProgressCallback = None,
+                  sheet_name: Optional[str] = None,
+                  rows_callback: RowsCallback = None) -> ExcelFileInfo:
         """
-        Загружает данные
+        Загружает данные одного листа
 
         Args:
             file_path: Путь к файлу
-            has_headers: Заголовки в первой строке
+            has_headers: Заголовки в первой строке; None - из настроек
+            progress_callback: Получает число прочитанных строк,
+                может прервать загрузку исключением LoadCancelledError
+            sheet_name: Имя листа (None - активный лист)
+            rows_callback: Получает прочитанные строки данных по мере
+                чтения: первые loader.first_rows строк, затем пачками по
+                loader.batch_size (для показа листа до конца загрузки);
+                при чтении из кэша не вызывается
 
         Returns:
             ExcelFileInfo: Информация о файле
         """
+        if has_headers is None:
+            has_headers = CONFIG.has_headers
         try:
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Файл не найден: {file_path}")
+            cache_key = sheet_name or ""
+            with INSTRUMENTATION.span("load.cache_get") as span:
+                cached = self.cache.get(file_path, cache_key) if self.cache else None
+                span.count(hits=int(cached is not None))
 
-            if not self.validate_file_ext(file_path, CONFIG.excel_ext):
-                raise FileFormatError(
-                    f"Неподдерживаемый формат файла. "
-                )
+            if cached is not None:
+                title, sheet_names, count_row, count_column, raw_rows = cached
+            else:
+                with INSTRUMENTATION.span("load.open"):
+                    sheet = self._open_sheet(file_path, sheet_name)
+                title, sheet_names, count_row, count_column, rows = sheet
+                raw_rows = []
+                # Строк прочитано к следующей передаче в rows_callback и уже передано
+                next_rows = CONFIG.first_rows if rows_callback else 0
+                sent = 1 if has_headers else 0
+                sheet_info = None
+                with INSTRUMENTATION.span("load.parse") as span, closing(rows):
+                    for i, row in enumerate(rows):
+                        raw_rows.append(row)
+                        if progress_callback and i % self.PROGRESS_STEP == 0:
+                            progress_callback(i)
+                        if i + 1 == next_rows:
+                            if sheet_info is None:
+                                sheet_info = self._sheet_info(file_path, sheet, raw_rows[0],
+                                                              has_headers)
+                            rows_callback(sheet_info, raw_rows[sent:])
+                            sent = len(raw_rows)
+                            next_rows = sent + CONFIG.batch_size
+                    span.count(rows=len(raw_rows))
 
-            file_ext = Path(file_path).suffix.lower()
+            if not raw_rows:
+                raise EmptyFileError("Файл пуст")
 
-            if file_ext == '.xlsx':
-                return self._load_xlsx(file_path, has_headers)
-            elif file_ext == '.xls':
-                return self._load_xls(file_path, has_headers)
-            else:
-                raise FileFormatError(f"Расширение файла: {file_ext}")
+            if cached is None:
+                with INSTRUMENTATION.span("load.used_range") as span:
+                    count_row, count_column = self._used_size(raw_rows)
+                    span.count(cells=count_row * count_column)
+                if CONFIG.compact_storage and count_column:
+                    with INSTRUMENTATION.span("load.compact", cells=count_row * count_column):
+                        raw_rows = compact_rows(raw_rows, count_column)
+                if self.cache:
+                    with INSTRUMENTATION.span("load.cache_put"):
+                        self.cache.put(file_path,
+                                       (title, sheet_names, count_row, count_column, raw_rows),
+                                       cache_key)
+
+            return ExcelFileInfo(
+                file_path=file_path,
+                file_name=Path(file_path).name,
+                sheet_name=title,
+                headers=raw_rows[0] if has_headers else [],
+                data=RowsView(raw_rows, 1 if has_headers else 0),
+                count_row=count_row,
+                count_column=count_column,
+                has_headers=has_headers,
+                raw_rows=raw_rows,
+                sheet_names=sheet_names
+            )
 
-        except (FileNotFoundError, FileFormatError, FileError, EmptyFileError):
+        except (FileNotFoundError, FileFormatError, FileError, EmptyFileError,
+                LoadCancelledError):
             raise
         except Exception as e:
             raise FileError(f"Ошибка при чтении файла: {str(e)}")
 
-    def _load_xlsx(self, file_path: str, has_headers: bool) -> ExcelFileInfo:
-        """Загружает .xlsx"""
-        try:
-            from openpyxl import load_workbook
+    def iter_rows(self, file_path: str, has_headers: Optional[bool] = None,
+                  batch_size: Optional[int] = None,
+                  sheet_name: Optional[str] = None) -> Iterator[List[List[Any]]]:
+        """
+        Потоково читает строки данных пачками
 
-            file = load_workbook(filename=file_path, data_only=True, read_only=True)
-            sheet = file.active
+        Для .xlsx память не зависит от размера листа; .xls в формате BIFF
+        xlrd читает целиком, но только выбранный лист.
 
-            data = []
-            headers = []
+        Args:
+            file_path: Путь к файлу
+            has_headers: Заголовки в первой строке (строка пропускается);
+                None - из настроек
+            batch_size: Количество строк в пачке; None - из настроек
+            sheet_name: Имя листа (None - активный лист)
 
-            for i, row in enumerate(sheet.iter_rows(values_only=True)):
-                if i == 0 and has_headers:
-                    headers = [self.extract_value(cell) for cell in row]
-                else:
-                    data.append([self.extract_value(cell) for cell in row])
+        Yields:
+            List[List[Any]]: Очередная пачка строк
+        """
+        if has_headers is None:
+            has_headers = CONFIG.has_headers
+        rows = self._open_sheet(file_path, sheet_name).rows
+        if has_headers:
+            next(rows, None)
 
-            if not data and not headers:
-                raise EmptyFileError("Файл пуст")
+        yield from self._batches(rows, [], batch_size or CONFIG.batch_size)
 
-            file.close()
+    def probe_file(self, file_path: str, has_headers: Optional[bool] = None,
+                   sheet_name: Optional[str] = None) -> SheetInfo:
+        """
+        Читает первую строку и размеры листа из метаданных файла
 
-            return ExcelFileInfo(
-                file_path=file_path,
-                file_name=Path(file_path).name,
-                sheet_name=sheet.title,
-                headers=headers,
-                data=data,
-                count_row=sheet.max_row,
-                count_column=sheet.max_column
-            )
+        Args:
+            file_path: Путь к файлу
+            has_headers: Заголовки в первой строке; None - из настроек
+            sheet_name: Имя листа (None - активный лист)
+
+        Returns:
+            SheetInfo: Метаданные листа
+        """
+        if has_headers is None:
+            has_headers = CONFIG.has_headers
+        sheet = self._open_sheet(file_path, sheet_name)
+
+        with closing(sheet.rows):
+            first_row = next(sheet.rows, None)
+
+        return self._sheet_info(file_path, sheet, first_row, has_headers)
+
+    def stream_sheet(self, file_path: str, has_headers: Optional[bool] = None,
+                     batch_size: Optional[int] = None,
+                     sheet_name: Optional[str] = None
+                     ) -> Tuple[SheetInfo, Iterator[List[List[Any]]]]:
+        """
+        Открывает лист один раз: метаданные сразу, строки данных - пачками
+
+        Args:
+            file_path: Путь к файлу
+            has_headers: Заголовки в первой строке; None - из настроек
+            batch_size: Количество строк в пачке; None - из настроек
+            sheet_name: Имя листа (None - активный лист)
+
+        Returns:
+            Tuple[SheetInfo, Iterator[List[List[Any]]]]: Метаданные листа
+                и генератор пачек строк данных
+        """
+        if has_headers is None:
+            has_headers = CONFIG.has_headers
+        with INSTRUMENTATION.span("load.open"):
+            sheet = self._open_sheet(file_path, sheet_name)
+            first_row = next(sheet.rows, None)
+        if first_row is None:
+            sheet.rows.close()
+
+        sheet_info = self._sheet_info(file_path, sheet, first_row, has_headers)
+        pending = [] if has_headers else [first_row]
+        return sheet_info, self._batches(sheet.rows, pending, batch_size or CONFIG.batch_size)
+
+    @staticmethod
+    def _used_size(raw_rows: List[List[Any]]) -> Tuple[int, int]:
+        """
+        Размеры занятого диапазона; короткие строки дополняются до ширины
+
+        Args:
+            raw_rows: Строки листа после _used_range
+
+        Returns:
+            Tuple[int, int]: Число строк и столбцов
+        """
+        count_column = max(len(row) for row in raw_rows)
+        for row in raw_rows:
+            if len(row) < count_column:
+                row.extend([""] * (count_column - len(row)))
+        return len(raw_rows), count_column
+
+    @staticmethod
+    def _used_range(rows: Iterator[List[Any]],
+                    max_empty_rows: int) -> Iterator[List[Any]]:
+        """
+        Обрезает пустые ячейки в конце строк и пустые строки в конце листа
+
+        Размерам из метаданных файла не доверяет: чтение прекращается после
+        max_empty_rows полностью пустых строк подряд (0 - без ограничения).
+        Пустые строки между данными сохраняются.
+
+        Args:
+            rows: Строки листа
+            max_empty_rows: Сколько пустых строк подряд считать концом данных
+
+        Yields:
+            List[Any]: Строки без пустого хвоста
+        """
+        empty_run = 0
+        with closing(rows):
+            for row in rows:
+                while row and row[-1] == "":
+                    row.pop()
+                if not row:
+                    empty_run += 1
+                    if max_empty_rows and empty_run >= max_empty_rows:
+                        break
+                    continue
+
+                for _ in range(empty_run):
+                    yield []
+                empty_run = 0
+                yield row
+
+    def _batches(self, rows: Iterator[List[Any]], batch: List[List[Any]],
+                 batch_size: int) -> Iterator[List[List[Any]]]:
+        with closing(rows):
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def _sheet_info(self, file_path: str, sheet: OpenedSheet,
+                    first_row: Optional[List[Any]], has_headers: bool) -> SheetInfo:
+        if first_row is None:
+            raise EmptyFileError("Файл пуст")
+
+        return SheetInfo(
+            file_path=file_path,
+            file_name=Path(file_path).name,
+            sheet_name=sheet.sheet_name,
+            headers=first_row if has_headers else [],
+            count_row=sheet.count_row or 0,
+            count_column=len(first_row),
+            sheet_names=sheet.sheet_names
+        )
+
+    def list_sheets(self, file_path: str) -> List[str]:
+        """
+        Возвращает имена листов книги, не читая их содержимое
+
+        Args:
+            file_path: Путь к файлу
+
+        Returns:
+            List[str]: Имена листов
+        """
+        sheet = self._open_sheet(file_path)
+        with closing(sheet.rows):
+            next(sheet.rows, None)
+        return sheet.sheet_names
+
+    def _open_sheet(self, file_path: str, sheet_name: Optional[str] = None) -> OpenedSheet:
+        """
+        Открывает лист загрузчиком, который реестр выбрал для файла
+
+        Args:
+            file_path: Путь к файлу
+            sheet_name: Имя листа (None - активный лист)
+
+        Returns:
+            OpenedSheet: Метаданные листа и генератор строк
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
+
+        sheet = LOADERS.opener_for(file_path)(file_path, sheet_name)
+        return sheet._replace(rows=self._used_range(sheet.rows, CONFIG.max_empty_rows))
+
+    @classmethod
+    def open_xlsx(cls, file_path: str, sheet_name: Optional[str] = None) -> OpenedSheet:
+        """Открывает лист .xlsx движком из настроек loader.xlsx_engine"""
+        if CONFIG.xlsx_engine == XLSX_ENGINE_NATIVE:
+            return cls._open_xlsx_native(file_path, sheet_name)
+        return cls._open_xlsx(file_path, sheet_name)
+
+    @classmethod
+    def _open_xlsx(cls, file_path: str, sheet_name: Optional[str]) -> OpenedSheet:
+        """Открывает лист .xlsx; остальные листы книги не разбираются"""
+        # openpyxl проверяет расширение в имени файла, а реестр мог опознать
+        # книгу по содержимому: книга открывается из файлового объекта
+        source = open(file_path, "rb")
+        try:
+            from openpyxl import load_workbook
+
+            file = load_workbook(filename=source, data_only=True, read_only=True)
+            sheet = file[sheet_name] if sheet_name else file.active
+            # Тег <dimension> бывает завышен (A1:XFD1048576): строки
+            # читаются без дополнения до заявленных размеров
+            count_row, count_column = sheet.max_row, sheet.max_column
+            sheet.reset_dimensions()
 
         except ImportError:
+            source.close()
             raise FileLoadError("Ошибка openpyxl")
         except Exception as e:
+            source.close()
             raise FileError(f"Ошибка .xlsx файла: {str(e)}")
 
-    def _load_xls(self, file_path: str, has_headers: bool) -> ExcelFileInfo:
-        """Загружает .xls"""
-        try:
-            import xlrd
+        def rows() -> Iterator[List[Any]]:
+            try:
+                for row in sheet.iter_rows(values_only=True):
+                    yield [cls.extract_value(cell) for cell in row]
+            except Exception as e:
+                raise FileError(f"Ошибка .xlsx файла: {str(e)}")
+            finally:
+                file.close()
+                source.close()
 
-            file = xlrd.open_workbook(file_path, on_demand=True)
-            sheet = file.sheet_by_index(0)
+        return OpenedSheet(sheet.title, file.sheetnames,
+                           count_row, count_column, rows())
 
-            data = []
-            headers = []
+    @staticmethod
+    def _open_xlsx_native(file_path: str, sheet_name: Optional[str]) -> OpenedSheet:
+        """Открывает лист .xlsx собственным потоковым разбором XML"""
+        from .xlsx_reader import FastXlsxReader
 
-            for i in range(sheet.nrows):
-                row = sheet.row_values(i)
-                if i == 0 and has_headers:
-                    headers = [self.extract_value(cell) for cell in row]
-                else:
-                    data.append([self.extract_value(cell) for cell in row])
+        try:
+            file = FastXlsxReader(file_path)
+        except Exception as e:
+            raise FileError(f"Ошибка .xlsx файла: {str(e)}")
 
-            if not data and not headers:
-                raise EmptyFileError("Файл пуст")
+        try:
+            title = sheet_name or file.active_sheet
+            if title not in file.sheet_names:
+                raise KeyError(f"Worksheet {title} does not exist.")
+            max_row, max_column = file.dimension(title)
+        except Exception as e:
+            file.close()
+            raise FileError(f"Ошибка .xlsx файла: {str(e)}")
 
-            file.release_resources()
+        def rows() -> Iterator[List[Any]]:
+            try:
+                yield from file.iter_rows(title)
+            except Exception as e:
+                raise FileError(f"Ошибка .xlsx файла: {str(e)}")
+            finally:
+                file.close()
 
-            return ExcelFileInfo(
-                file_path=file_path,
-                file_name=Path(file_path).name,
-                sheet_name=sheet.name,
-                headers=headers,
-                data=data,
-                count_row=sheet.nrows,
-                count_column=sheet.ncols
-            )
+        return OpenedSheet(title, file.sheet_names, max_row, max_column, rows())
+
+    @classmethod
+    def open_xls(cls, file_path: str, sheet_name: Optional[str] = None) -> OpenedSheet:
+        """Открывает лист .xls; с on_demand xlrd читает только его"""
+        try:
+            import xlrd
+
+            file = xlrd.open_workbook(file_path, on_demand=True)
+            if sheet_name:
+                sheet = file.sheet_by_name(sheet_name)
+            else:
+                sheet = file.sheet_by_index(0)
 
         except ImportError:
             raise FileLoadError("Ошибка xlrd")
         except Exception as e:
-            raise FileError(f"Ошибка .xls: {str(e)}")
\ No newline at end of file
+            raise FileError(f"Ошибка .xls: {str(e)}")
+
+        def rows() -> Iterator[List[Any]]:
+            try:
+                for i in range(sheet.nrows):
+                    values = sheet.row_values(i)
+                    cell_types = sheet.row_types(i)
+                    if xlrd.XL_CELL_DATE in cell_types:
+                        values = [cls._xls_date(value, file.datemode)
+                                  if cell_type == xlrd.XL_CELL_DATE else value
+                                  for value, cell_type in zip(values, cell_types)]
+                    yield [cls.extract_value(cell) for cell in values]
+            except Exception as e:
+                raise FileError(f"Ошибка .xls: {str(e)}")
+            finally:
+                file.release_resources()
+
+        return OpenedSheet(sheet.name, file.sheet_names(),
+                           sheet.nrows, sheet.ncols, rows())
+
+    @staticmethod
+    def _xls_date(value: float, datemode: int) -> Any:
+        """
+        Переводит дату .xls из числа дней в datetime
+
+        Args:
+            value: Число дней от начала эпохи книги
+            datemode: Эпоха книги (0 - 1900, 1 - 1904)
+
+        Returns:
+            Any: datetime или исходное число, если дата некорректна
+        """
+        import xlrd
+
+        try:
+            return xlrd.xldate.xldate_as_datetime(value, datemode)
+        except (xlrd.xldate.XLDateError, ValueError, OverflowError):
+            return value
+
+
+LOADERS.register([".xlsx"], ExcelLoader.open_xlsx,
+                 sniff=lambda head: head.startswith(ZIP_SIGNATURE))
+LOADERS.register([".xls"], ExcelLoader.open_xls,
+                 sniff=lambda head: head.startswith(OLE2_SIGNATURE))
@@ -0,0 +1,373 @@
+import csv
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from .report import STATISTICS_FIELDS, statistics_rows
+from ..core.constants import CONFIG
+from ..core.dataclasses import AnalysisResult
+from ..core.exceptions import ExportError
+from ..core.instrumentation import INSTRUMENTATION
+
+# Расширение файла -> название формата (для диалога сохранения)
+EXPORT_FORMATS = {
+    ".csv": "CSV",
+    ".xlsx": "Excel",
+    ".parquet": "Parquet",
+}
+
+# Строк на листе .xlsx, включая строку заголовков
+XLSX_MAX_ROWS = 1048576
+
+
+def export_rows(path: str, headers: Optional[List[str]], batches: Iterable[List[List[Any]]],
+                column_kinds: Optional[List[str]] = None,
+                progress_callback: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Пишет строки в файл пачками; формат - по расширению пути
+
+    Файл пишется во временный рядом и заменяет целевой только после
+    успешной записи, поэтому отмена или ошибка не оставляют половину файла.
+
+    Args:
+        path: Путь к файлу (.csv, .xlsx или .parquet)
+        headers: Заголовки столбцов; None - без строки заголовков
+        batches: Пачки строк
+        column_kinds: Виды столбцов для Parquet (см. column_kind);
+            None - по первой пачке
+        progress_callback: Получает число записанных строк,
+            может прервать запись исключением
+
+    Returns:
+        int: Число записанных строк (без заголовков)
+    """
+    target = Path(path)
+    writer_class = _WRITERS.get(target.suffix.lower())
+    if writer_class is None:
+        raise ExportError(f"Неподдерживаемый формат: {target.suffix or target.name}")
+
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    written = 0
+    try:
+        with INSTRUMENTATION.span("export." + target.suffix.lower().lstrip(".")) as span:
+            writer = writer_class(str(tmp_path), headers, column_kinds)
+            try:
+                for batch in batches:
+                    writer.write(batch)
+                    written += len(batch)
+                    if progress_callback:
+                        progress_callback(written)
+            finally:
+                writer.close()
+            span.count(rows=written)
+        os.replace(tmp_path, target)
+    except OSError as e:
+        raise ExportError(f"Не удалось записать файл: {str(e)}")
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return written
+
+
+def export_statistics(path: str, result: AnalysisResult) -> int:
+    """
+    Пишет статистику столбцов (строка на столбец, поля как в CSV-отчете CLI)
+
+    Args:
+        path: Путь к файлу (.csv, .xlsx или .parquet)
+        result: Результат анализа
+
+    Returns:
+        int: Число записанных строк
+    """
+    rows = [[row[name] for name in STATISTICS_FIELDS] for row in statistics_rows(result)]
+    return export_rows(path, list(STATISTICS_FIELDS), [rows])
+
+
+def iter_batches(rows: Sequence[List[Any]], order: Optional[Sequence[int]] = None,
+                 batch_size: Optional[int] = None) -> Iterator[List[List[Any]]]:
+    """
+    Пачки строк загруженного листа; в памяти одновременно одна пачка
+
+    Args:
+        rows: Строки данных (ExcelFileInfo.data)
+        order: Номера строк в порядке записи (сортировка, фильтр); None - все по порядку
+        batch_size: Строк в пачке; None - из настроек
+
+    Yields:
+        List[List[Any]]: Очередная пачка строк
+    """
+    batch_size = batch_size or CONFIG.batch_size
+    if order is None:
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
+    else:
+        for start in range(0, len(order), batch_size):
+            yield [rows[int(i)] for i in order[start:start + batch_size]]
+
+
+def column_kind(values: Iterable[Any]) -> str:
+    """
+    Вид столбца для схемы Parquet по значениям
+
+    Целые вместе с дробными дают float, разные виды вперемешку - string;
+    пустые ячейки не учитываются.
+
+    Args:
+        values: Значения столбца
+
+    Returns:
+        str: "bool", "int", "float", "datetime" или "string"
+    """
+    kinds = {_value_kind(value) for value in values}
+    kinds.discard(None)
+    if kinds == {"int", "float"}:
+        return "float"
+    if len(kinds) == 1:
+        return kinds.pop()
+    return "string"
+
+
+def sheet_column_kinds(rows: Sequence[List[Any]], column_count: int) -> List[str]:
+    """
+    Виды столбцов загруженного листа по всем строкам (для схемы Parquet)
+
+    Args:
+        rows: Строки данных (ExcelFileInfo.data)
+        column_count: Количество столбцов
+
+    Returns:
+        List[str]: Вид каждого столбца
+    """
+    column_values = getattr(rows, "column_values", None)
+    if column_values is not None:
+        # Хранилище по столбцам отдает столбец без сборки строк
+        return [column_kind(column_values(i)) for i in range(column_count)]
+    return [column_kind(row[i] for row in rows if i < len(row)) for i in range(column_count)]
+
+
+def _value_kind(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, (datetime, date)):
+        return "datetime"
+    return "string"
+
+
+# Виды значений, которые без потерь помещаются в столбец Parquet данного
+# вида; в столбец string помещается любое значение
+_COMPATIBLE_KINDS = {
+    "bool": {"bool"},
+    "int": {"int", "bool"},
+    "float": {"int", "float"},
+    "datetime": {"datetime"},
+}
+_VALUE_TYPES = {
+    "bool": {bool},
+    "int": {int, bool},
+    "float": {int, float},
+    "datetime": {datetime, date},
+}
+
+
+def _foreign_value(values: List[Any], kind: str) -> Optional[int]:
+    """
+    Первое значение, которое не помещается в столбец вида kind
+
+    Args:
+        values: Значения столбца в пачке
+        kind: Вид столбца в схеме
+
+    Returns:
+        Optional[int]: Номер значения или None, если подходят все
+    """
+    allowed = _COMPATIBLE_KINDS.get(kind)
+    if allowed is None:
+        return None
+    types = set(map(type, values))
+    types.discard(type(None))
+    if types <= _VALUE_TYPES[kind]:
+        return None
+    for i, value in enumerate(values):
+        value_kind = _value_kind(value)
+        if value_kind is not None and value_kind not in allowed:
+            return i
+    return None
+
+
+class _CsvWriter:
+    """CSV в UTF-8, как отчеты консольного режима"""
+
+    def __init__(self, path: str, headers: Optional[List[str]], _column_kinds=None):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        if headers is not None:
+            self._writer.writerow(headers)
+
+    def write(self, rows: List[List[Any]]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _XlsxWriter:
+    """Книга openpyxl в режиме write_only: строки не накапливаются в памяти"""
+
+    def __init__(self, path: str, headers: Optional[List[str]], _column_kinds=None):
+        from openpyxl import Workbook
+        from openpyxl.utils.exceptions import IllegalCharacterError
+
+        self._illegal_character = IllegalCharacterError
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Data")
+        self._rows = 0
+        if headers is not None:
+            self._append(headers)
+
+    def write(self, rows: List[List[Any]]):
+        if self._rows + len(rows) > XLSX_MAX_ROWS:
+            raise ExportError(f"На листе .xlsx не больше {XLSX_MAX_ROWS} строк; "
+                              f"выберите CSV или Parquet")
+        try:
+            for row in rows:
+                self._append(row)
+        except self._illegal_character:
+            raise ExportError(f"Строка {self._rows + 1}: управляющие символы недопустимы в .xlsx")
+
+    def _append(self, row: List[Any]):
+        # Пустой текст пишется пустой ячейкой
+        self._sheet.append([None if value == "" else value for value in row])
+        self._rows += 1
+
+    def close(self):
+        self._workbook.save(self._path)
+
+
+class _ParquetWriter:
+    """
+    Parquet через pyarrow (необязательная зависимость)
+
+    Схема - по column_kinds или по первой пачке; каждая пачка пишется
+    отдельной группой строк. Схему записанных групп не изменить, поэтому
+    значение, которое не помещается в тип столбца (например, дробное в
+    целочисленном), прерывает экспорт ExportError, а не обрезается.
+    """
+
+    def __init__(self, path: str, headers: Optional[List[str]],
+                 column_kinds: Optional[List[str]] = None):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ExportError("Для экспорта в Parquet нужен пакет pyarrow (pip install pyarrow)")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._path = path
+        self._headers = headers
+        self._kinds = column_kinds
+        self._writer = None
+        self._rows = 0
+
+    def write(self, rows: List[List[Any]]):
+        if not rows:
+            return
+        if self._writer is None:
+            self._open(rows)
+        if any(len(row) > len(self._schema) for row in rows):
+            raise ExportError("Строка шире заголовков: в Parquet число столбцов постоянно")
+
+        columns = []
+        for i, (field, kind) in enumerate(zip(self._schema, self._kinds)):
+            values = [row[i] if i < len(row) else None for row in rows]
+            foreign = _foreign_value(values, kind)
+            if foreign is not None:
+                raise ExportError(
+                    f"Столбец «{field.name}», строка {self._rows + foreign + 1}: значение "
+                    f"{values[foreign]!r} не подходит к типу {kind}, определенному по "
+                    f"первым строкам; в Parquet у столбца один тип"
+                )
+            try:
+                columns.append(self._pa.array(_arrow_values(values, kind), type=field.type))
+            except (TypeError, ValueError, self._pa.ArrowException) as e:
+                raise ExportError(f"Столбец «{field.name}» (строки {self._rows + 1}-"
+                                  f"{self._rows + len(rows)}): значения разных типов, "
+                                  f"в Parquet у столбца один тип ({str(e)})")
+        self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+        self._rows += len(rows)
+
+    def _open(self, rows: List[List[Any]]):
+        width = max(len(self._headers or ()), max(len(row) for row in rows))
+        names = list(self._headers or ())
+        names.extend(f"Col {i + 1}" for i in range(len(names), width))
+        names = _unique_names(names)
+        if self._kinds is None:
+            self._kinds = [column_kind(row[i] for row in rows if i < len(row))
+                           for i in range(width)]
+        self._kinds = (list(self._kinds) + ["string"] * width)[:width]
+        types = {
+            "bool": self._pa.bool_(),
+            "int": self._pa.int64(),
+            "float": self._pa.float64(),
+            "datetime": self._pa.timestamp("us"),
+            "string": self._pa.string(),
+        }
+        self._schema = self._pa.schema([(name, types[kind])
+                                        for name, kind in zip(names, self._kinds)])
+        self._writer = self._pq.ParquetWriter(self._path, self._schema)
+
+    def close(self):
+        if self._writer is None:
+            # Пустой лист: файл с одной схемой без строк
+            self._open([[]])
+        self._writer.close()
+
+
+def _arrow_values(values: List[Any], kind: str) -> List[Any]:
+    """Значения столбца для pyarrow: пустые - None, текст - str"""
+    if kind == "string":
+        return [None if value is None or value == "" else str(value) for value in values]
+    if kind == "float":
+        return [None if value is None or value == "" else
+                float(value) if isinstance(value, int) and not isinstance(value, bool) else value
+                for value in values]
+    if kind == "int":
+        return [None if value is None or value == "" else
+                int(value) if value.__class__ is bool else value
+                for value in values]
+    if kind == "datetime":
+        return [None if value is None or value == "" else
+                datetime(value.year, value.month, value.day)
+                if value.__class__ is date else value
+                for value in values]
+    return [None if value is None or value == "" else value for value in values]
+
+
+def _unique_names(names: List[Any]) -> List[str]:
+    """Имена столбцов Parquet: строки без повторов"""
+    seen = set()
+    unique = []
+    for i, name in enumerate(names):
+        name = str(name) if name not in (None, "") else f"Col {i + 1}"
+        base, n = name, 2
+        while name in seen:
+            name = f"{base}_{n}"
+            n += 1
+        seen.add(name)
+        unique.append(name)
+    return unique
+
+
+_WRITERS = {
+    ".csv": _CsvWriter,
+    ".xlsx": _XlsxWriter,
+    ".parquet": _ParquetWriter,
+}
@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..core.exceptions import FileFormatError
+
+# Сколько байт начала файла читать для определения формата по содержимому
+SNIFF_BYTES = 8192
+
+
+class OpenedSheet(NamedTuple):
+    """
+    Открытый лист: метаданные и генератор строк
+
+    count_row и count_column берутся из метаданных файла и могут быть
+    завышены; строки уже обрезаны до реально занятого диапазона.
+    """
+    sheet_name: str
+    sheet_names: List[str]
+    count_row: Optional[int]
+    count_column: Optional[int]
+    rows: Iterator[List[Any]]
+
+
+# Открывает лист файла: путь и имя листа (None - активный лист)
+SheetOpener = Callable[[str, Optional[str]], OpenedSheet]
+# Проверяет начало файла: подходит ли формат
+Sniffer = Callable[[bytes], bool]
+
+
+class LoaderRegistry:
+    """
+    Форматы файлов, которые умеет читать ExcelLoader
+
+    Формат выбирается по расширению; для незнакомого расширения - по
+    содержимому: начало файла проверяется функциями sniff в порядке
+    регистрации. Все форматы отдают строки одинаково (OpenedSheet),
+    поэтому кэш, обрезка пустых строк и анализ от формата не зависят.
+    """
+
+    def __init__(self):
+        self._openers: Dict[str, SheetOpener] = {}
+        self._sniffers: List[Tuple[Sniffer, SheetOpener]] = []
+
+    def register(self, extensions: Sequence[str], opener: SheetOpener,
+                 sniff: Optional[Sniffer] = None):
+        """
+        Регистрирует формат
+
+        Args:
+            extensions: Расширения с точкой, например [".csv", ".tsv"]
+            opener: Открывает лист файла
+            sniff: Узнает формат по началу файла (для незнакомых расширений)
+        """
+        for extension in extensions:
+            self._openers[extension.lower()] = opener
+        if sniff is not None:
+            self._sniffers.append((sniff, opener))
+
+    @property
+    def extensions(self) -> List[str]:
+        return list(self._openers)
+
+    def opener_for(self, file_path: str) -> SheetOpener:
+        """
+        Загрузчик файла по расширению или содержимому
+
+        Args:
+            file_path: Путь к существующему файлу
+
+        Returns:
+            SheetOpener: Функция открытия листа
+
+        Raises:
+            FileFormatError: Формат не поддерживается
+        """
+        extension = Path(file_path).suffix.lower()
+        opener = self._openers.get(extension)
+        if opener is not None:
+            return opener
+
+        with open(file_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+        for sniff, opener in self._sniffers:
+            if sniff(head):
+                return opener
+        raise FileFormatError(f"Неподдерживаемый формат файла: {extension or Path(file_path).name}")
+
+
+LOADERS = LoaderRegistry()
@@ -0,0 +1,193 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .compact_rows import CompactRows, compact_rows
+from ..core.constants import CONFIG
+from ..core.dataclasses import CacheStats
+
+# Имя листа, имена всех листов книги, число строк, число столбцов,
+# строки листа (включая первую)
+CachedSheet = Tuple[str, List[str], int, int, Sequence[List[Any]]]
+
+
+class ParseCache:
+    """
+    Дисковый кэш разобранных листов
+
+    Ключ - абсолютный путь, время изменения, размер файла, имя листа и
+    настройки разбора (движок .xlsx, предел пустых строк, запасная
+    кодировка CSV), поэтому измененный файл или другие настройки никогда
+    не читаются из кэша.
+    Лист хранится в компактном виде CompactRows (массивы столбцов и
+    словари) в одном бинарном файле (pickle) и читается без сборки строк.
+    При превышении лимита удаляются давно не использованные записи
+    (LRU по времени доступа).
+    """
+
+    MAGIC = b"PXC6"
+    SUFFIX = ".sheet"
+    TMP_SUFFIX = ".tmp"
+    # Временный файл старше этого возраста остался от прерванной записи
+    STALE_TMP_SECONDS = 3600
+
+    def __init__(self, directory: str, max_size_bytes: int):
+        self.directory = Path(directory).expanduser()
+        self.max_size_bytes = max_size_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> Optional["ParseCache"]:
+        """Создает кэш по настройкам или None, если кэш выключен"""
+        if not CONFIG.cache_enabled:
+            return None
+        return cls(CONFIG.cache_dir, CONFIG.cache_max_size_mb * 1024 * 1024)
+
+    def get(self, file_path: str, sheet_name: str = "") -> Optional[CachedSheet]:
+        """
+        Читает лист из кэша
+
+        Args:
+            file_path: Путь к исходному файлу
+            sheet_name: Имя листа ("" - лист по умолчанию)
+
+        Returns:
+            Optional[CachedSheet]: Данные листа или None при промахе
+        """
+        entry = self._entry_path(file_path, sheet_name)
+        if entry is None or not entry.exists():
+            self._count(misses=1)
+            return None
+
+        try:
+            with open(entry, "rb") as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    raise ValueError("неизвестный формат записи")
+                payload = pickle.load(f)
+            os.utime(entry)
+        except Exception:
+            self._discard(entry)
+            self._count(misses=1)
+            return None
+
+        self._count(hits=1)
+        rows = payload["rows"]
+        if not CONFIG.compact_storage:
+            rows = list(rows)
+        return (payload["sheet_name"], payload["sheet_names"],
+                payload["count_row"], payload["count_column"], rows)
+
+    def put(self, file_path: str, sheet: CachedSheet, sheet_name: str = ""):
+        """
+        Сохраняет лист в кэш
+
+        Args:
+            file_path: Путь к исходному файлу
+            sheet: Данные листа
+            sheet_name: Имя листа ("" - лист по умолчанию)
+        """
+        entry = self._entry_path(file_path, sheet_name)
+        if entry is None:
+            return
+
+        title, sheet_names, count_row, count_column, rows = sheet
+        if not isinstance(rows, CompactRows):
+            rows = compact_rows(rows, max((len(row) for row in rows), default=0))
+        payload = {
+            "sheet_name": title,
+            "sheet_names": sheet_names,
+            "count_row": count_row,
+            "count_column": count_column,
+            "rows": rows,
+        }
+
+        tmp_path = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}{self.TMP_SUFFIX}")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(self.MAGIC)
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry)
+        except (OSError, pickle.PicklingError):
+            # Недописанный файл (например, кончилось место) не должен остаться
+            self._discard(tmp_path)
+            return
+
+        self._evict()
+
+    def clear(self):
+        """Удаляет все записи кэша"""
+        for entry in self._entries() + self._tmp_files():
+            self._discard(entry)
+        self.stats.size_bytes = 0
+
+    def _entry_path(self, file_path: str, sheet_name: str) -> Optional[Path]:
+        try:
+            source = os.stat(file_path)
+        except OSError:
+            return None
+        key = "|".join((os.path.abspath(file_path), str(source.st_mtime_ns),
+                        str(source.st_size), sheet_name,
+                        CONFIG.xlsx_engine, str(CONFIG.max_empty_rows),
+                        CONFIG.csv_fallback_encoding))
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.SUFFIX}"
+
+    def _entries(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob(f"*{self.SUFFIX}"))
+
+    def _tmp_files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob(f"*{self.TMP_SUFFIX}"))
+
+    def _evict(self):
+        # Файлы прерванных записей (процесс завершился посреди put) в _entries
+        # не попадают: давние удаляются здесь, свежие может дописывать другой поток
+        stale = time.time() - self.STALE_TMP_SECONDS
+        for tmp_path in self._tmp_files():
+            try:
+                if tmp_path.stat().st_mtime < stale:
+                    self._discard(tmp_path)
+            except OSError:
+                continue
+
+        entries = []
+        for entry in self._entries():
+            try:
+                info = entry.stat()
+            except OSError:
+                continue
+            entries.append((max(info.st_atime, info.st_mtime), info.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_size_bytes:
+                break
+            self._discard(entry)
+            total -= size
+            evicted += 1
+
+        self._count(evictions=evicted)
+        self.stats.size_bytes = total
+
+    def _count(self, hits: int = 0, misses: int = 0, evictions: int = 0):
+        with self._lock:
+            self.stats.hits += hits
+            self.stats.misses += misses
+            self.stats.evictions += evictions
+
+    @staticmethod
+    def _discard(entry: Path):
+        try:
+            entry.unlink()
+        except OSError:
+            pass
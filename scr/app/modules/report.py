@@ -0,0 +1,107 @@
+from datetime import date, datetime, time
+from typing import Any, Dict, List
+
+from ..core.dataclasses import AnalysisResult, BatchItem, ColumnStatistics
+
+# Поля строки CSV-отчета: одна строка на столбец листа
+STATISTICS_FIELDS = [
+    "file", "sheet", "column", "type", "count", "empty", "min", "max", "mean",
+    "std", "median", "p90", "p99", "distinct", "top", "exact"
+]
+
+
+def statistics_to_dict(stats: ColumnStatistics) -> Dict[str, Any]:
+    """
+    Статистика столбца в виде, пригодном для JSON
+
+    Args:
+        stats: Статистика по столбцу
+
+    Returns:
+        Dict[str, Any]: Поля статистики
+    """
+    return {
+        "column": str(stats.name),
+        "type": stats.column_type.name,
+        "count": stats.count_row,
+        "empty": stats.empty_count,
+        "min": to_plain(stats.min_value),
+        "max": to_plain(stats.max_value),
+        "mean": to_plain(stats.mean_value),
+        "std": stats.std_value,
+        "median": to_plain(stats.median_value),
+        "p90": to_plain(stats.p90_value),
+        "p99": to_plain(stats.p99_value),
+        "distinct": stats.distinct_count,
+        "top": [[to_plain(value), count] for value, count in stats.top_values],
+        "exact": stats.exact,
+    }
+
+
+def result_to_dict(result: AnalysisResult) -> Dict[str, Any]:
+    """
+    Результат анализа в виде, пригодном для JSON
+
+    Args:
+        result: Результат анализа
+
+    Returns:
+        Dict[str, Any]: Поля результата
+    """
+    return {
+        "file": result.file_name,
+        "sheet": result.sheet_name,
+        "rows": result.data_rows_count,
+        "columns": result.count_column,
+        "has_headers": result.has_headers,
+        "statistics": [statistics_to_dict(stats) for stats in result.statistic],
+    }
+
+
+def item_to_dict(item: BatchItem) -> Dict[str, Any]:
+    """
+    Результат пакетного анализа листа для JSON-отчета
+
+    Args:
+        item: Результат или ошибка по листу
+
+    Returns:
+        Dict[str, Any]: Поля отчета
+    """
+    if item.ok:
+        report = result_to_dict(item.result)
+        report["path"] = item.file_path
+        return report
+    return {
+        "path": item.file_path,
+        "sheet": item.sheet_name,
+        "error": str(item.error),
+        "error_type": type(item.error).__name__,
+    }
+
+
+def statistics_rows(result: AnalysisResult) -> List[Dict[str, Any]]:
+    """
+    Строки CSV-отчета по столбцам листа
+
+    Args:
+        result: Результат анализа
+
+    Returns:
+        List[Dict[str, Any]]: Строки с полями STATISTICS_FIELDS
+    """
+    rows = []
+    for stats in result.statistic:
+        row = statistics_to_dict(stats)
+        row["top"] = "; ".join(f"{value} ({count})" for value, count in row["top"])
+        row["file"] = result.file_name
+        row["sheet"] = result.sheet_name
+        rows.append(row)
+    return rows
+
+
+def to_plain(value: Any) -> Any:
+    """Приводит значение ячейки к типу, который понимает json"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
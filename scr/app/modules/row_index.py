@@ -0,0 +1,276 @@
+import operator
+import re
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .columnar import build_column
+from ..core.dataclasses import ColumnData, ColumnKind, ExcelFileInfo, RowFilter, SheetChanges
+from ..core.exceptions import FilterError
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    # Подстрока без учета регистра
+    "~": lambda text, needle: needle in text,
+}
+
+# «столбец оператор значение»; двухсимвольные операторы проверяются первыми
+_CONDITION = re.compile(r"^\s*(.+?)\s*(==|!=|>=|<=|=|>|<|~)\s*(.*?)\s*$")
+
+
+def parse_filters(text: str, headers: Sequence[str]) -> List[RowFilter]:
+    """
+    Разбирает строку фильтра вида «сумма > 1000; регион == Москва»
+
+    Условия разделяются «;» и объединяются по И. Столбец задается
+    заголовком (можно в кавычках, регистр не важен), значение - числом
+    или текстом; пустое значение с == и != отбирает пустые и непустые ячейки.
+
+    Args:
+        text: Строка фильтра
+        headers: Заголовки столбцов таблицы
+
+    Returns:
+        List[RowFilter]: Условия (пустой список, если фильтра нет)
+    """
+    filters = []
+    for condition in text.split(";"):
+        if not condition.strip():
+            continue
+        match = _CONDITION.match(condition)
+        if match is None:
+            raise FilterError(f"Ожидалось «столбец оператор значение»: {condition.strip()}")
+        name, op, value = (_unquote(part) for part in match.groups())
+        if value == "" and op not in ("==", "=", "!="):
+            raise FilterError(f"Не указано значение: {condition.strip()}")
+        column = _find_column(name, headers)
+        filters.append(RowFilter(column, headers[column], op, value))
+    return filters
+
+
+def _unquote(text: str) -> str:
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
+
+
+def _find_column(name: str, headers: Sequence[str]) -> int:
+    for i, header in enumerate(headers):
+        if header == name:
+            return i
+    folded = name.casefold()
+    for i, header in enumerate(headers):
+        if header.casefold() == folded:
+            return i
+    raise FilterError(f"Нет столбца «{name}»")
+
+
+def _parse_number(text: str) -> Optional[float]:
+    try:
+        return float(text.replace(",", "."))
+    except ValueError:
+        return None
+
+
+class RowIndex:
+    """
+    Сортировка и фильтрация строк листа по колоночным данным
+
+    Перестановка сортировки строится для столбца при первом обращении и
+    кэшируется; фильтры вычисляются векторными масками по типизированным
+    массивам столбцов. Номера строк - индексы в file_info.data.
+    """
+
+    def __init__(self, file_info: ExcelFileInfo):
+        self._rows = file_info.raw_rows
+        self._offset = file_info.data_offset
+        self.row_count = len(file_info.data)
+        self._columns: Dict[int, ColumnData] = {}
+        # Столбец -> непустые строки по возрастанию, затем пустые
+        self._orders: Dict[int, np.ndarray] = {}
+
+        # Столбцы, построенные анализатором, подходят, если смещение то же
+        table = file_info.columns
+        if table is not None and table.offset == self._offset and table.row_count == self.row_count:
+            self._columns = dict(enumerate(table.columns))
+
+    def updated(self, file_info: ExcelFileInfo, changes: SheetChanges) -> "RowIndex":
+        """
+        Индекс нового чтения того же листа
+
+        Если строки не добавлялись, столбцы без изменений и их
+        перестановки переносятся из текущего индекса.
+
+        Args:
+            file_info: Новое чтение листа
+            changes: Отличия от текущего чтения
+
+        Returns:
+            RowIndex: Новый индекс
+        """
+        index = RowIndex(file_info)
+        if changes.appended or changes.removed or changes.structural:
+            return index
+        changed = changes.changed_columns(self._offset)
+        for column, data in self._columns.items():
+            if column not in changed:
+                index._columns.setdefault(column, data)
+        for column, order in self._orders.items():
+            if column not in changed:
+                index._orders[column] = order
+        return index
+
+    def column(self, index: int) -> ColumnData:
+        """Колоночные данные столбца (строятся при первом обращении)"""
+        column = self._columns.get(index)
+        if column is None:
+            column = build_column(self._rows, index, self._offset)
+            self._columns[index] = column
+        return column
+
+    def sort_order(self, index: int) -> np.ndarray:
+        """
+        Перестановка строк по возрастанию значений столбца
+
+        Числа сравниваются как числа, текст - без учета регистра, пустые
+        ячейки идут последними. Равные значения сохраняют исходный порядок.
+
+        Args:
+            index: Номер столбца
+
+        Returns:
+            np.ndarray: Номера строк в порядке сортировки
+        """
+        order = self._orders.get(index)
+        if order is None:
+            column = self.column(index)
+            rows = np.flatnonzero(column.valid)
+            keys = self._sort_keys(column, rows)
+            order = np.concatenate([rows[np.argsort(keys, kind="stable")],
+                                    np.flatnonzero(~column.valid)])
+            self._orders[index] = order
+        return order
+
+    def _sort_keys(self, column: ColumnData, rows: np.ndarray) -> np.ndarray:
+        if column.kind in (ColumnKind.INTEGER, ColumnKind.FLOAT):
+            return column.values[rows]
+        if column.kind == ColumnKind.CATEGORY:
+            # Ранг категории в отсортированном словаре вместо строк
+            categories = column.categories
+            ranks = np.empty(len(categories), dtype=np.int64)
+            ranks[sorted(range(len(categories)), key=lambda i: categories[i].casefold())] = \
+                np.arange(len(categories))
+            return ranks[column.values[rows]]
+
+        values = column.values[rows]
+        ranks = np.empty(len(values), dtype=np.int64)
+        ranks[sorted(range(len(values)), key=lambda i: sort_key(values[i]))] = \
+            np.arange(len(values))
+        return ranks
+
+    def filter_mask(self, row_filter: RowFilter) -> np.ndarray:
+        """
+        Маска строк, удовлетворяющих условию
+
+        Args:
+            row_filter: Условие
+
+        Returns:
+            np.ndarray: Булева маска по строкам
+        """
+        column = self.column(row_filter.column)
+        if row_filter.value == "":
+            return column.valid.copy() if row_filter.operator == "!=" else ~column.valid
+        if row_filter.operator == "!=":
+            # Как в фильтрах Excel: пустые ячейки тоже «не равны»
+            return ~self._match(row_filter, "==")
+        return self._match(row_filter, row_filter.operator)
+
+    def _match(self, row_filter: RowFilter, op: str) -> np.ndarray:
+        column = self.column(row_filter.column)
+        compare = OPERATORS[op]
+
+        if op != "~" and column.kind in (ColumnKind.INTEGER, ColumnKind.FLOAT):
+            number = _parse_number(row_filter.value)
+            if number is None:
+                raise FilterError(f"Столбец «{row_filter.column_name}» числовой, "
+                                  f"а значение - нет: {row_filter.value}")
+            return compare(column.values, number) & column.valid
+
+        predicate = _cell_predicate(op, row_filter.value)
+        if column.kind == ColumnKind.CATEGORY:
+            # Условие проверяется один раз на значение словаря
+            matches = np.fromiter(map(predicate, column.categories), dtype=bool,
+                                  count=len(column.categories))
+            return matches[column.values] & column.valid
+
+        cells = column.values if column.kind == ColumnKind.OBJECT else self._cells(row_filter.column)
+        return np.fromiter(map(predicate, cells), dtype=bool, count=self.row_count) & column.valid
+
+    def _cells(self, index: int):
+        return (row[index] if index < len(row) else ""
+                for row in islice(self._rows, self._offset, None))
+
+    def view_rows(self, sort_column: Optional[int] = None, descending: bool = False,
+                  filters: Sequence[RowFilter] = ()) -> Optional[np.ndarray]:
+        """
+        Строки в порядке показа после сортировки и фильтров
+
+        Args:
+            sort_column: Столбец сортировки или None
+            descending: Сортировка по убыванию (пустые ячейки остаются в конце)
+            filters: Условия, объединяемые по И
+
+        Returns:
+            Optional[np.ndarray]: Номера строк или None, если порядок исходный
+        """
+        if sort_column is None and not filters:
+            return None
+
+        mask = None
+        for row_filter in filters:
+            filter_mask = self.filter_mask(row_filter)
+            mask = filter_mask if mask is None else mask & filter_mask
+
+        if sort_column is None:
+            return np.flatnonzero(mask)
+
+        order = self.sort_order(sort_column)
+        if descending:
+            filled = int(self.column(sort_column).valid.sum())
+            order = np.concatenate([order[filled - 1::-1] if filled else order[:0],
+                                    order[filled:]])
+        if mask is None:
+            return order
+        return order[mask[order]]
+
+
+def sort_key(value: Any):
+    """Ключ сортировки смешанного столбца: числа, затем даты и прочее, затем текст"""
+    if isinstance(value, (int, float)):
+        return 0, value, ""
+    if isinstance(value, str):
+        return 2, 0, value.casefold()
+    # Даты и время в ISO-виде упорядочиваются как текст
+    return 1, 0, str(value)
+
+
+def _cell_predicate(op: str, value: str) -> Callable[[Any], bool]:
+    """Проверка ячейки: числа сравниваются как числа, остальное - как текст"""
+    compare = OPERATORS[op]
+    number = _parse_number(value) if op != "~" else None
+    needle = value.casefold()
+
+    def predicate(cell: Any) -> bool:
+        if number is not None and isinstance(cell, (int, float)):
+            return bool(compare(cell, number))
+        return bool(compare(str(cell).casefold(), needle))
+
+    return predicate
@@ -0,0 +1,310 @@
+import re
+from collections import defaultdict
+from itertools import chain, count
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.dataclasses import ColumnData, ColumnKind
+
+_TOKEN = re.compile(r"\w+")
+# Все, кроме букв, цифр и разделителя значений
+_SEPARATORS = re.compile(r"[^\w\0]+")
+# Больше любого символа: граница диапазона токенов с заданным префиксом
+_MAX_CHAR = "\U0010ffff"
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова и числа текста без учета регистра"""
+    return _TOKEN.findall(text.casefold())
+
+
+def _tokenize_values(values: List[Any]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Токены текстов значений (как tokenize) одним потоком
+
+    Тексты склеиваются через NUL, разделители заменяются пробелами одним
+    вызовом re.sub, и строка делится на токены одним split: NUL остается
+    отдельным токеном-границей значений. В xlsx символ NUL недопустим;
+    если он все же встретился, значения разбираются по одному.
+
+    Args:
+        values: Различные значения
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, List[str]]: Номера токенов значений
+            подряд, число токенов каждого значения и токены по алфавиту
+    """
+    texts = list(map(str, values))
+    text = "\0".join(texts)
+    if text.count("\0") == len(texts) - 1:
+        stream = _SEPARATORS.sub(" ", text.casefold()).replace("\0", " \0 ").split()
+        stream.append("\0")
+    else:
+        stream = list(chain.from_iterable(tokenize(text) + ["\0"] for text in texts))
+
+    # Номера по первому появлению, затем - места в алфавитном порядке;
+    # NUL меньше любого токена и получает место 0
+    token_ids: Dict[str, int] = defaultdict(count().__next__)
+    ids = np.fromiter(map(token_ids.__getitem__, stream), dtype=np.intc, count=len(stream))
+    tokens = sorted(token_ids)
+    ranks = np.empty(len(tokens), dtype=np.intc)
+    ranks[np.fromiter(map(token_ids.__getitem__, tokens), dtype=np.intc,
+                      count=len(tokens))] = np.arange(len(tokens), dtype=np.intc)
+    ids = ranks[ids]
+
+    boundaries = np.flatnonzero(ids == 0)
+    token_counts = np.diff(boundaries, prepend=-1) - 1
+    return ids[ids != 0] - 1, token_counts, tokens[1:]
+
+
+class SearchIndex:
+    """
+    Обратный индекс ячеек листа: токен -> отсортированные номера ячеек
+
+    Номер ячейки - row * column_count + column, строки - индексы во всех
+    строках листа (file_info.raw_rows); search отдает номера относительно
+    первой строки данных row_offset, поэтому смена режима заголовков
+    индекс не перестраивает (with_row_offset). Токены хранятся
+    отсортированным списком, поэтому префиксный поиск - это диапазон,
+    найденный двоичным поиском.
+
+    Списки ячеек сжаты: первая ячейка токена хранится отдельно, остальные -
+    разностями с предыдущей в общем массиве uint16 (если все разности
+    токена меньше 65536) или uint32. Токены из одной ячейки места в
+    массивах разностей не занимают.
+    """
+
+    def __init__(self, tokens: List[str], firsts: np.ndarray, counts: np.ndarray,
+                 starts: np.ndarray, wide: np.ndarray, narrow_deltas: np.ndarray,
+                 wide_deltas: np.ndarray, column_count: int, row_offset: int = 0):
+        self.tokens = tokens
+        self.column_count = column_count
+        self.row_offset = row_offset
+        self._firsts = firsts
+        self._counts = counts
+        self._starts = starts
+        self._wide = wide
+        self._narrow_deltas = narrow_deltas
+        self._wide_deltas = wide_deltas
+
+    @classmethod
+    def build(cls, rows: Sequence[Sequence[Any]], column_count: int,
+              columns: Optional[Sequence[ColumnData]] = None,
+              progress_callback: Optional[Callable[[int], None]] = None,
+              columns_offset: int = 0, row_offset: int = 0) -> "SearchIndex":
+        """
+        Строит индекс по тексту ячеек (как они показываются в таблице)
+
+        Ячейки нумеруются по различным значениям столбца (np.unique для
+        чисел, коды словаря для текста); на токены каждое значение
+        разбирается один раз, списки ячеек собираются векторно.
+
+        Args:
+            rows: Все строки листа
+            column_count: Количество столбцов; ячейки правее не индексируются
+            columns: Колоночные данные строк rows[columns_offset:], если
+                уже построены; строки перед ними разбираются отдельно
+            progress_callback: Вызывается с числом обработанных столбцов;
+                может прервать построение исключением
+            columns_offset: Первая строка rows в columns
+            row_offset: Первая строка данных (см. with_row_offset)
+
+        Returns:
+            SearchIndex: Индекс
+        """
+        from .columnar import build_column
+
+        if columns is None:
+            columns_offset = 0
+        head = rows[:columns_offset]
+        # Номер значения в каждой ячейке, -1 - пустая ячейка
+        cell_values = np.full((len(rows), column_count), -1, dtype=np.intc)
+        values: List[Any] = []
+        for i in range(column_count):
+            if progress_callback is not None:
+                progress_callback(i)
+            parts = [(columns_offset, columns[i] if columns is not None else build_column(rows, i))]
+            if columns_offset:
+                parts.append((0, build_column(head, i)))
+            for start, column in parts:
+                ids, distinct = _value_ids(column)
+                cell_values[start:start + len(column.valid), i][column.valid] = ids + len(values)
+                values.extend(distinct)
+
+        value_tokens, token_counts, tokens = _tokenize_values(values)
+        index = cls._from_cells(cell_values.ravel(), value_tokens, token_counts,
+                                tokens, column_count)
+        return index.with_row_offset(row_offset)
+
+    def with_row_offset(self, row_offset: int) -> "SearchIndex":
+        """
+        Тот же индекс с другой первой строкой данных (массивы общие)
+
+        Args:
+            row_offset: Индекс первой строки данных во всех строках листа
+
+        Returns:
+            SearchIndex: Индекс, нумерующий строки от row_offset
+        """
+        if row_offset == self.row_offset:
+            return self
+        return SearchIndex(self.tokens, self._firsts, self._counts, self._starts,
+                           self._wide, self._narrow_deltas, self._wide_deltas,
+                           self.column_count, row_offset)
+
+    @classmethod
+    def _from_cells(cls, cell_values: np.ndarray, value_tokens: np.ndarray,
+                    token_counts: np.ndarray, tokens: List[str],
+                    column_count: int) -> "SearchIndex":
+        """
+        Сжатые списки ячеек по номерам значений ячеек
+
+        Args:
+            cell_values: Номер значения в каждой ячейке (-1 - пустая)
+            value_tokens: Номера токенов значений подряд
+            token_counts: Число токенов каждого значения
+            tokens: Токены по номерам (по алфавиту)
+            column_count: Количество столбцов
+        """
+        # Пары (токен, ячейка) для каждого токена каждой непустой ячейки
+        cells = np.flatnonzero(cell_values >= 0)
+        cell_value = cell_values[cells]
+        per_cell = token_counts[cell_value].astype(np.int64)
+        value_starts = np.cumsum(token_counts, dtype=np.int64) - token_counts
+        within = np.arange(per_cell.sum()) - np.repeat(np.cumsum(per_cell) - per_cell, per_cell)
+        pair_tokens = value_tokens[np.repeat(value_starts[cell_value], per_cell) + within]
+        pair_cells = np.repeat(cells, per_cell)
+
+        # Устойчивая сортировка по токену сохраняет порядок ячеек внутри токена
+        order = np.argsort(pair_tokens, kind="stable")
+        pair_tokens, pair_cells = pair_tokens[order], pair_cells[order]
+        # Слово, повторенное в ячейке, дает одну пару
+        unique = np.ones(len(pair_cells), dtype=bool)
+        unique[1:] = (pair_tokens[1:] != pair_tokens[:-1]) | (pair_cells[1:] != pair_cells[:-1])
+        pair_tokens, pair_cells = pair_tokens[unique], pair_cells[unique]
+
+        counts = np.bincount(pair_tokens, minlength=len(tokens)).astype(np.int64)
+        first_pairs = np.cumsum(counts) - counts
+
+        deltas = np.empty(len(pair_cells), dtype=np.int64)
+        deltas[0:1] = 0
+        np.subtract(pair_cells[1:], pair_cells[:-1], out=deltas[1:])
+        deltas[first_pairs] = 0
+        wide = np.maximum.reduceat(deltas, first_pairs) >= 2 ** 16 if len(tokens) else \
+            np.zeros(0, dtype=bool)
+
+        rest = np.ones(len(pair_cells), dtype=bool)
+        rest[first_pairs] = False
+        pair_wide = np.repeat(wide, counts)
+        sizes = counts - 1
+        narrow_sizes, wide_sizes = np.where(wide, 0, sizes), np.where(wide, sizes, 0)
+        starts = np.where(wide, np.cumsum(wide_sizes) - wide_sizes,
+                          np.cumsum(narrow_sizes) - narrow_sizes)
+
+        return cls(tokens, pair_cells[first_pairs], counts, starts, wide,
+                   deltas[rest & ~pair_wide].astype(np.uint16),
+                   deltas[rest & pair_wide].astype(np.uint32), column_count)
+
+    @property
+    def nbytes(self) -> int:
+        """Размер массивов индекса (без списка токенов)"""
+        return sum(array_.nbytes for array_ in (self._firsts, self._counts, self._starts,
+                                                self._wide, self._narrow_deltas,
+                                                self._wide_deltas))
+
+    def search(self, query: str, prefix: bool = True) -> np.ndarray:
+        """
+        Ячейки, содержащие все слова запроса
+
+        Args:
+            query: Текст запроса
+            prefix: Слово запроса совпадает с началом слова ячейки;
+                иначе - только целое слово
+
+        Returns:
+            np.ndarray: Отсортированные номера ячеек строк данных
+        """
+        result = None
+        for term in dict.fromkeys(tokenize(query)):
+            cells = self._term_cells(term, prefix)
+            result = cells if result is None else np.intersect1d(result, cells,
+                                                                 assume_unique=True)
+            if not len(result):
+                break
+        if result is None:
+            return np.empty(0, dtype=np.int64)
+        # Ячейки до первой строки данных (строка заголовков) не ищутся
+        shift = self.row_offset * self.column_count
+        return result[result >= shift] - shift if shift else result
+
+    def positions(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Строки и столбцы ячеек"""
+        return np.divmod(cells, self.column_count)
+
+    def _term_cells(self, term: str, prefix: bool) -> np.ndarray:
+        low = bisect_left(self.tokens, term)
+        if prefix:
+            high = bisect_left(self.tokens, term + _MAX_CHAR, low)
+        else:
+            high = low + 1 if low < len(self.tokens) and self.tokens[low] == term else low
+
+        counts = self._counts[low:high]
+        parts = [self._firsts[low:high][counts == 1]]
+        parts.extend(self._cells(i) for i in low + np.flatnonzero(counts > 1))
+        cells = np.concatenate(parts)
+        if high - low > 1:
+            # Ячейки разных токенов: сортировка и удаление повторов
+            cells.sort()
+            cells = cells[np.concatenate(([True], cells[1:] != cells[:-1]))]
+        return cells
+
+    def _cells(self, i: int) -> np.ndarray:
+        count, start = int(self._counts[i]), int(self._starts[i])
+        deltas = (self._wide_deltas if self._wide[i] else self._narrow_deltas)[start:start + count - 1]
+        cells = np.empty(count, dtype=np.int64)
+        cells[0] = self._firsts[i]
+        np.cumsum(deltas, dtype=np.int64, out=cells[1:])
+        cells[1:] += cells[0]
+        return cells
+
+
+def _value_ids(column: ColumnData) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Номера значений непустых ячеек столбца и сами значения
+
+    Args:
+        column: Колоночные данные столбца
+
+    Returns:
+        Tuple[np.ndarray, List[Any]]: Номер значения каждой непустой ячейки
+            и различные значения по номерам
+    """
+    if column.kind == ColumnKind.CATEGORY:
+        return column.values[column.valid], column.categories
+
+    if column.kind != ColumnKind.OBJECT and column.integer is None:
+        distinct, ids = np.unique(column.values[column.valid], return_inverse=True)
+        return ids.reshape(-1), distinct.tolist()
+
+    if column.kind == ColumnKind.OBJECT:
+        present = column.values[column.valid]
+    else:
+        # Целые и дробные вперемешку: 1 и 1.0 показываются по-разному
+        present = column.values[column.valid].astype(object)
+        integer = column.integer[column.valid]
+        present[integer] = column.values[column.valid][integer].astype(np.int64).tolist()
+
+    value_ids: Dict[Any, int] = {}
+    distinct = []
+    ids = np.empty(len(present), dtype=np.intc)
+    for i, value in enumerate(present):
+        # 1, 1.0 и True показываются по-разному
+        key = value if value.__class__ is str else (value.__class__, value)
+        value_id = value_ids.get(key)
+        if value_id is None:
+            value_id = value_ids[key] = len(distinct)
+            distinct.append(value)
+        ids[i] = value_id
+    return ids, distinct
@@ -0,0 +1,76 @@
+import hashlib
+import pickle
+from typing import Any, List, Sequence
+
+from ..core.dataclasses import ExcelFileInfo, SheetChanges
+
+# Строк в блоке: хэш считается на блок, построчно сравниваются только
+# блоки с отличающимся хэшем
+BLOCK_ROWS = 512
+
+
+def block_hashes(rows: Sequence[Sequence[Any]], block_rows: int = BLOCK_ROWS) -> List[bytes]:
+    """
+    Хэши последовательных блоков строк
+
+    Блок сериализуется pickle, поэтому 1 и 1.0 дают разные хэши.
+
+    Args:
+        rows: Строки листа
+        block_rows: Строк в блоке
+
+    Returns:
+        List[bytes]: Хэш каждого блока (последний может быть неполным)
+    """
+    return [
+        hashlib.blake2b(pickle.dumps(rows[start:start + block_rows],
+                                     protocol=pickle.HIGHEST_PROTOCOL),
+                        digest_size=16).digest()
+        for start in range(0, len(rows), block_rows)
+    ]
+
+
+def file_hashes(file_info: ExcelFileInfo) -> List[bytes]:
+    """Хэши блоков листа; считаются один раз и сохраняются в file_info"""
+    if file_info.block_hashes is None:
+        file_info.block_hashes = block_hashes(file_info.raw_rows)
+    return file_info.block_hashes
+
+
+def diff_sheets(old: ExcelFileInfo, new: ExcelFileInfo) -> SheetChanges:
+    """
+    Находит измененные и добавленные строки листа по хэшам блоков
+
+    Args:
+        old: Предыдущее чтение листа
+        new: Новое чтение того же листа
+
+    Returns:
+        SheetChanges: Отличия
+    """
+    old_rows, new_rows = old.raw_rows, new.raw_rows
+    changes = SheetChanges(old_count=len(old_rows), new_count=len(new_rows))
+    if old.sheet_name != new.sheet_name or old.count_column != new.count_column:
+        changes.structural = True
+        return changes
+
+    old_hashes, new_hashes = file_hashes(old), file_hashes(new)
+    common_rows = min(len(old_rows), len(new_rows))
+
+    for block, (old_hash, new_hash) in enumerate(zip(old_hashes, new_hashes)):
+        if old_hash == new_hash:
+            continue
+        # Блок мог отличаться только дописанными строками
+        for i in range(block * BLOCK_ROWS, min((block + 1) * BLOCK_ROWS, common_rows)):
+            columns = _changed_columns(old_rows[i], new_rows[i])
+            if columns:
+                changes.changed_cells[i] = columns
+
+    return changes
+
+
+def _changed_columns(old_row: Sequence[Any], new_row: Sequence[Any]) -> List[int]:
+    if len(old_row) != len(new_row):
+        return list(range(max(len(old_row), len(new_row))))
+    return [i for i, (old_value, new_value) in enumerate(zip(old_row, new_row))
+            if type(old_value) is not type(new_value) or old_value != new_value]
@@ -0,0 +1,442 @@
+import heapq
+import math
+import struct
+from operator import itemgetter
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+MASK64 = (1 << 64) - 1
+
+_DOUBLE = struct.Struct("<d")
+
+
+def splitmix64(x: int) -> int:
+    """Перемешивание 64-битного числа (финализатор SplitMix64)"""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def value_hash(value: Any) -> int:
+    """
+    64-битный хэш значения ячейки для HyperLogLog
+
+    Числа хэшируются по битам float64, как и в векторном пути
+    (columnar.fill_hyperloglog), поэтому 5 и 5.0 считаются одним значением.
+    Строки хэшируются встроенным hash(), который стабилен в пределах процесса.
+
+    Args:
+        value: Значение
+
+    Returns:
+        int: Хэш
+    """
+    if type(value) is int or type(value) is float:
+        try:
+            bits = int.from_bytes(_DOUBLE.pack(value + 0.0), "little")
+        except OverflowError:
+            bits = hash(value) & MASK64
+        return splitmix64(bits)
+    return splitmix64(hash(value) & MASK64)
+
+
+class HyperLogLog:
+    """
+    Оценка числа различных значений (HyperLogLog)
+
+    Память - 2**precision байт. Стандартная ошибка 1.04 / sqrt(2**precision):
+    около 1.6% при precision=12. Для малых оценок применяется линейный
+    подсчет по пустым регистрам.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    # Остаток хэша после индекса регистра должен точно помещаться в float64
+    # (векторное заполнение в columnar.fill_hyperloglog)
+    MIN_PRECISION = 11
+    MAX_PRECISION = 18
+
+    def __init__(self, precision: int = 12):
+        if not self.MIN_PRECISION <= precision <= self.MAX_PRECISION:
+            raise ValueError(f"точность HyperLogLog должна быть от {self.MIN_PRECISION} "
+                             f"до {self.MAX_PRECISION}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add_hash(self, hashed: int):
+        """Учитывает значение по его 64-битному хэшу (value_hash)"""
+        width = 64 - self.precision
+        index = hashed >> width
+        rank = width - (hashed & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        """Объединяет с оценкой другого фрагмента (та же точность)"""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def copy(self) -> "HyperLogLog":
+        sketch = HyperLogLog(self.precision)
+        sketch.registers = bytearray(self.registers)
+        return sketch
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        total = math.fsum(2.0 ** -register for register in self.registers)
+        estimate = alpha * m * m / total
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class KllSketch:
+    """
+    Квантили потока (KLL, Karnin-Lang-Liberty)
+
+    Элемент на уровне h представляет 2**h исходных значений; переполненный
+    уровень сортируется и каждый второй элемент переходит на уровень выше.
+    Память - O(k) элементов; ошибка ранга порядка 1.65 / k с вероятностью
+    99% (около 0.8% при k=200). Половина для сжатия выбирается поочередно,
+    поэтому результат детерминирован.
+    """
+
+    __slots__ = ("k", "levels", "count", "_size", "_max_size", "_odd")
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.levels: List[List[Any]] = []
+        self.count = 0
+        self._size = 0
+        self._max_size = 0
+        self._odd = False
+        self._grow()
+
+    def add(self, value: Any, weight: int = 1):
+        """
+        Учитывает значение weight раз
+
+        Вес раскладывается по двоичным разрядам: разряд h - один элемент
+        на уровне h, поэтому добавление веса стоит O(log weight).
+        """
+        if weight == 1:
+            self.count += 1
+            self.levels[0].append(value)
+            self._size += 1
+            if self._size >= self._max_size:
+                self._compress()
+            return
+
+        self.count += weight
+        level = 0
+        while weight:
+            if weight & 1:
+                while level >= len(self.levels):
+                    self._grow()
+                self.levels[level].append(value)
+                self._size += 1
+            weight >>= 1
+            level += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def add_level(self, level: int, values: Iterable[Any]):
+        """Добавляет готовые элементы уровня level (вес 2**level каждый)"""
+        while level >= len(self.levels):
+            self._grow()
+        values = list(values)
+        self.levels[level].extend(values)
+        self.count += len(values) << level
+        self._size += len(values)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "KllSketch"):
+        """Объединяет с квантилями другого фрагмента"""
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self._size += other._size
+        while self._size >= self._max_size:
+            self._compress()
+
+    def copy(self) -> "KllSketch":
+        sketch = KllSketch(self.k)
+        sketch.levels = [list(items) for items in self.levels]
+        sketch.count = self.count
+        sketch._size = self._size
+        sketch._max_size = self._max_size
+        sketch._odd = self._odd
+        return sketch
+
+    def quantiles(self, fractions: Iterable[float]) -> List[Any]:
+        """
+        Квантили: наименьшее значение, ранг которого не меньше q * count
+
+        Args:
+            fractions: Доли от 0 до 1
+
+        Returns:
+            List[Any]: Значения (None, если данных нет)
+        """
+        weighted = sorted(((value, 1 << level)
+                           for level, items in enumerate(self.levels)
+                           for value in items), key=itemgetter(0))
+        return weighted_quantiles(weighted, self.count, fractions)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _grow(self):
+        self.levels.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self):
+        for level in range(len(self.levels)):
+            items = self.levels[level]
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 == len(self.levels):
+                self._grow()
+
+            items.sort()
+            kept = [items.pop()] if len(items) % 2 else []
+            self._odd = not self._odd
+            promoted = items[int(self._odd)::2]
+            self.levels[level + 1].extend(promoted)
+            self.levels[level] = kept
+            self._size -= len(items) - len(promoted)
+
+            if self._size < self._max_size:
+                break
+
+
+class FrequentItems:
+    """
+    Частые значения (Space-Saving в форме Misra-Gries)
+
+    Хранит до 2 * capacity счетчиков; при переполнении из всех вычитается
+    (capacity + 1)-й по величине счетчик, обнуленные удаляются. Оценка
+    частоты (counter + decrement) не меньше истинной и завышена не более
+    чем на decrement <= N / (capacity + 1). Сводки объединяются сложением.
+    """
+
+    __slots__ = ("capacity", "counters", "decrement")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counters: Dict[Hashable, int] = {}
+        self.decrement = 0
+
+    def add(self, value: Hashable, count: int = 1):
+        counters = self.counters
+        counters[value] = counters.get(value, 0) + count
+        if len(counters) > 2 * self.capacity:
+            self._prune()
+
+    def merge(self, other: "FrequentItems"):
+        for value, count in other.counters.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        self.decrement += other.decrement
+        if len(self.counters) > self.capacity:
+            self._prune()
+
+    def copy(self) -> "FrequentItems":
+        sketch = FrequentItems(self.capacity)
+        sketch.counters = dict(self.counters)
+        sketch.decrement = self.decrement
+        return sketch
+
+    def top(self, k: int) -> List[Tuple[Any, int]]:
+        """
+        Самые частые значения с оценкой частоты сверху
+
+        Значения, частота которых не отличима от ошибки (counter <= decrement),
+        не возвращаются: в столбце без повторов частых значений нет.
+        """
+        heavy = [(value, count) for value, count in self.counters.items()
+                 if count > self.decrement]
+        return [(value, count + self.decrement) for value, count in top_counts(heavy, k)]
+
+    def _prune(self):
+        largest = heapq.nlargest(self.capacity + 1, self.counters.items(), key=itemgetter(1))
+        if len(largest) <= self.capacity:
+            return
+        threshold = largest[-1][1]
+        self.counters = {value: count - threshold
+                         for value, count in largest[:-1] if count > threshold}
+        self.decrement += threshold
+
+
+class ColumnSketch:
+    """
+    Расширенная статистика столбца с ограниченной памятью
+
+    Пока различных значений не больше exact_limit, хранятся точные частоты:
+    число различных, квантили и частые значения считаются точно. После
+    этого частоты переносятся в HyperLogLog, KLL и FrequentItems, и память
+    больше не растет с числом строк.
+    """
+
+    __slots__ = ("exact_limit", "top_k", "precision", "kll_k",
+                 "counts", "numbers", "distinct", "quantile_sketch", "frequent")
+
+    def __init__(self, exact_limit: int, top_k: int, precision: int, kll_k: int):
+        self.exact_limit = exact_limit
+        self.top_k = top_k
+        self.precision = precision
+        self.kll_k = kll_k
+        # Точный режим: частоты значений и частоты чисел (для квантилей)
+        self.counts: Optional[Dict[Hashable, int]] = {}
+        self.numbers: Dict[Any, int] = {}
+        # Режим оценок
+        self.distinct: Optional[HyperLogLog] = None
+        self.quantile_sketch: Optional[KllSketch] = None
+        self.frequent: Optional[FrequentItems] = None
+
+    @property
+    def exact(self) -> bool:
+        """Статистика посчитана точно"""
+        return self.counts is not None
+
+    def new(self) -> "ColumnSketch":
+        """Пустая статистика с теми же параметрами"""
+        return ColumnSketch(self.exact_limit, self.top_k, self.precision, self.kll_k)
+
+    def add(self, value: Hashable, number: Any = None, count: int = 1):
+        """
+        Учитывает непустое значение count раз
+
+        Args:
+            value: Значение ячейки; для чисел и строк-чисел - само число,
+                чтобы "5" и 5 считались одним значением
+            number: Числовое значение или None
+            count: Сколько раз встречается значение
+        """
+        counts = self.counts
+        if counts is not None:
+            counts[value] = counts.get(value, 0) + count
+            if number is not None:
+                self.numbers[number] = self.numbers.get(number, 0) + count
+            if len(counts) > self.exact_limit:
+                self._to_sketch()
+            return
+
+        self.distinct.add_hash(value_hash(value))
+        self.frequent.add(value, count)
+        if number is not None:
+            self.quantile_sketch.add(number, count)
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        """
+        Объединяет статистику двух фрагментов столбца
+
+        Args:
+            other: Статистика другого фрагмента
+
+        Returns:
+            ColumnSketch: Новая статистика для обоих фрагментов
+        """
+        base, extra = (self, other) if self._weight() >= other._weight() else (other, self)
+        merged = base.copy()
+
+        if extra.counts is not None:
+            for value, count in extra.counts.items():
+                merged.add(value, value if value in extra.numbers else None, count)
+            return merged
+
+        if merged.counts is not None:
+            merged._to_sketch()
+        merged.distinct.merge(extra.distinct)
+        merged.frequent.merge(extra.frequent)
+        merged.quantile_sketch.merge(extra.quantile_sketch)
+        return merged
+
+    def copy(self) -> "ColumnSketch":
+        sketch = self.new()
+        if self.counts is not None:
+            sketch.counts = dict(self.counts)
+            sketch.numbers = dict(self.numbers)
+        else:
+            sketch.counts = None
+            sketch.numbers = {}
+            sketch.distinct = self.distinct.copy()
+            sketch.quantile_sketch = self.quantile_sketch.copy()
+            sketch.frequent = self.frequent.copy()
+        return sketch
+
+    def distinct_count(self) -> int:
+        if self.counts is not None:
+            return len(self.counts)
+        return self.distinct.estimate()
+
+    def quantiles(self, fractions: Iterable[float]) -> List[Any]:
+        if self.counts is not None:
+            weighted = sorted(self.numbers.items(), key=itemgetter(0))
+            return weighted_quantiles(weighted, sum(self.numbers.values()), fractions)
+        return self.quantile_sketch.quantiles(fractions)
+
+    def top(self) -> List[Tuple[Any, int]]:
+        if self.counts is not None:
+            return top_counts(self.counts.items(), self.top_k)
+        return self.frequent.top(self.top_k)
+
+    def start_sketch(self):
+        """Переходит в режим оценок сразу, без точных частот"""
+        self.counts = None
+        self.numbers = {}
+        self.distinct = HyperLogLog(self.precision)
+        self.quantile_sketch = KllSketch(self.kll_k)
+        self.frequent = FrequentItems(self.top_k * 10)
+
+    def _to_sketch(self):
+        counts, numbers = self.counts, self.numbers
+        self.start_sketch()
+        for value, count in counts.items():
+            self.distinct.add_hash(value_hash(value))
+            self.frequent.add(value, count)
+        for number, count in numbers.items():
+            self.quantile_sketch.add(number, count)
+
+    def _weight(self) -> int:
+        if self.counts is not None:
+            return len(self.counts)
+        return self.exact_limit + 1
+
+
+def weighted_quantiles(weighted: List[Tuple[Any, int]], total: int,
+                       fractions: Iterable[float]) -> List[Any]:
+    """
+    Квантили по отсортированным парам (значение, вес)
+
+    Квантиль q - наименьшее значение, накопленный вес которого не меньше
+    q * total (обратная функция распределения).
+    """
+    results = []
+    for fraction in fractions:
+        if not total:
+            results.append(None)
+            continue
+        target = max(1, math.ceil(fraction * total))
+        cumulative = 0
+        value = None
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                break
+        results.append(value)
+    return results
+
+
+def top_counts(items: Iterable[Tuple[Any, int]], k: int) -> List[Tuple[Any, int]]:
+    """k самых частых значений; при равной частоте - по значению"""
+    return sorted(items, key=lambda item: (-item[1], _order_key(item[0])))[:k]
+
+
+def _order_key(value: Any) -> Tuple[str, Any]:
+    return (type(value).__name__, value)
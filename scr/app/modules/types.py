@@ -1,10 +1,23 @@
 import re
-from datetime import datetime
-from typing import Any, List, Set
 from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Set, Tuple
 from ..core.dataclasses import ColumnType
 from ..core.constants import CONFIG
 
+# Тип ячейки и ее числовое значение (для чисел и строк-чисел)
+CellClass = Tuple[ColumnType, Optional[Any]]
+
+# Регулярные выражения для директив strptime в настроенных форматах дат
+_DATE_DIRECTIVES = {
+    "%Y": r"\d{4}",
+    "%m": r"\d{1,2}",
+    "%d": r"\d{1,2}",
+    "%H": r"\d{1,2}",
+    "%M": r"\d{1,2}",
+    "%S": r"\d{1,2}",
+}
+
 
 class TypeDetector:
     """Детектор типов данных в столбцах"""
@@ -12,32 +25,63 @@ class TypeDetector:
     INTEGER_REGEX = re.compile(r'^-?\d+$')
     FLOAT_REGEX = re.compile(r'^-?\d+\.\d+$')
 
+    # Символы, с которых может начинаться строка-число или дата
+    NUMERIC_START = frozenset("-0123456789")
+
+    # Сколько разобранных строк-чисел и дат помнить (повторы в столбцах часты)
+    STRING_CACHE_SIZE = 65536
+
+    VALUE_TYPES = {
+        bool: ColumnType.BOOLEAN,
+        int: ColumnType.INTEGER,
+        float: ColumnType.FLOAT,
+        datetime: ColumnType.DATETIME,
+    }
+
     def __init__(self, date_formats: List[str] = None):
         self.date_formats = date_formats or CONFIG.date_formats
+        self._date_patterns = [(fmt, _date_regex(fmt)) for fmt in self.date_formats]
+        self._last_date_format = 0
+        self._string_cache: Dict[str, CellClass] = {}
 
-    def detect_column_type(self, column_data: List[Any]) -> ColumnType:
+    def detect_column_type(self, column_data: Iterable[Any]) -> ColumnType:
         """
-        Определяет тип данных
+        Определяет тип данных по всем значениям столбца
         Если встречается хотя бы два разных типа (не считая пустых) - возвращает MIXED.
 
         Args:
-            column_data: Список значений
+            column_data: Значения столбца
 
         Returns:
             ColumnType: Тип
         """
-        if not column_data:
-            return ColumnType.EMPTY
+        return self.resolve_column_type(self.type_histogram(column_data))
+
+    def type_histogram(self, column_data: Iterable[Any]) -> Dict[ColumnType, int]:
+        """
+        Считает, сколько ячеек столбца относится к каждому типу
 
-        size = min(CONFIG.size_type_detect, len(column_data))
-        column = column_data[:size]
+        Args:
+            column_data: Значения столбца
+
+        Returns:
+            Dict[ColumnType, int]: Число ячеек по типам
+        """
+        classify = self.classify
+        return Counter(classify(cell)[0] for cell in column_data)
+
+    def resolve_column_type(self, cell_types: Iterable[ColumnType]) -> ColumnType:
+        """
+        Сводит типы ячеек к типу столбца
 
-        unique_types: Set[ColumnType] = set()
+        Args:
+            cell_types: Типы отдельных ячеек (или ключи гистограммы типов)
 
-        for cell in column:
-            cell_type = self._detect_cell_type(cell)
-            if cell_type != ColumnType.EMPTY:
-                unique_types.add(cell_type)
+        Returns:
+            ColumnType: Тип
+        """
+        unique_types: Set[ColumnType] = set(cell_types)
+        unique_types.discard(ColumnType.EMPTY)
 
         if not unique_types:
             return ColumnType.EMPTY
@@ -46,6 +90,31 @@ class TypeDetector:
         else:
             return ColumnType.MIXED
 
+    def classify(self, cell_value: Any) -> CellClass:
+        """
+        Определяет тип ячейки и ее числовое значение
+
+        Строки вида "-12" и "3.5" считаются числами, строки в одном из
+        настроенных форматов дат - датами. Формат, подошедший последним,
+        проверяется первым.
+
+        Args:
+            cell_value: Значение ячейки
+
+        Returns:
+            CellClass: Тип ячейки и число (для числовых типов, иначе None)
+        """
+        value_type = type(cell_value)
+        if value_type is str:
+            return self._classify_string(cell_value)
+
+        column_type = self.VALUE_TYPES.get(value_type)
+        if column_type is None:
+            column_type = self._classify_other(cell_value)
+        if column_type is ColumnType.INTEGER or column_type is ColumnType.FLOAT:
+            return column_type, cell_value
+        return column_type, None
+
     def _detect_cell_type(self, cell_value: Any) -> ColumnType:
         """
         Определяет тип данных в ячейке
@@ -56,27 +125,63 @@ class TypeDetector:
         Returns:
             ColumnType: Тип данных ячейки
         """
-        if cell_value is None or cell_value == "":
+        return self.classify(cell_value)[0]
+
+    def _classify_string(self, value: str) -> CellClass:
+        if not value:
+            return ColumnType.EMPTY, None
+        if value[0] not in self.NUMERIC_START:
+            return ColumnType.STRING, None
+
+        cell_class = self._string_cache.get(value)
+        if cell_class is None:
+            cell_class = self._parse_string(value)
+            if len(self._string_cache) >= self.STRING_CACHE_SIZE:
+                self._string_cache.clear()
+            self._string_cache[value] = cell_class
+        return cell_class
+
+    def _parse_string(self, value: str) -> CellClass:
+        if self.INTEGER_REGEX.fullmatch(value):
+            return ColumnType.INTEGER, int(value)
+        if self.FLOAT_REGEX.fullmatch(value):
+            return ColumnType.FLOAT, float(value)
+        if self._match_date(value):
+            return ColumnType.DATETIME, None
+        return ColumnType.STRING, None
+
+    def _match_date(self, value: str) -> bool:
+        patterns = self._date_patterns
+        count = len(patterns)
+        for shift in range(count):
+            index = (self._last_date_format + shift) % count
+            fmt, pattern = patterns[index]
+            if not pattern.fullmatch(value):
+                continue
+            try:
+                datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            self._last_date_format = index
+            return True
+        return False
+
+    @staticmethod
+    def _classify_other(cell_value: Any) -> ColumnType:
+        if cell_value is None:
             return ColumnType.EMPTY
-
         if isinstance(cell_value, bool):
             return ColumnType.BOOLEAN
-
-        if isinstance(cell_value, (int, float)):
-            if isinstance(cell_value, int):
-                return ColumnType.INTEGER
-            elif isinstance(cell_value, float):
-                return ColumnType.FLOAT
-
+        if isinstance(cell_value, int):
+            return ColumnType.INTEGER
+        if isinstance(cell_value, float):
+            return ColumnType.FLOAT
         if isinstance(cell_value, str):
             return ColumnType.STRING
-
         if isinstance(cell_value, datetime):
             return ColumnType.DATETIME
-
         return ColumnType.UNKNOWN
 
-
     def is_numeric_type(self, column_type: ColumnType) -> bool:
         """
         Проверяет, является ли тип числовым
@@ -99,4 +204,15 @@ class TypeDetector:
         Returns:
             bool: True если можно рассчитать min/max/mean
         """
-        return column_type in (ColumnType.INTEGER, ColumnType.FLOAT)
\ No newline at end of file
+        return column_type in (ColumnType.INTEGER, ColumnType.FLOAT)
+
+
+def _date_regex(date_format: str) -> Pattern:
+    """Быстрая проверка строки на формат даты до вызова strptime"""
+    pattern = []
+    for part in re.split(r"(%.)", date_format):
+        if len(part) == 2 and part.startswith("%"):
+            pattern.append(_DATE_DIRECTIVES.get(part, ".+?"))
+        else:
+            pattern.append(re.escape(part))
+    return re.compile("".join(pattern))
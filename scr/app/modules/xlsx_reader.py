@@ -0,0 +1,279 @@
+import posixpath
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree.ElementTree import fromstring, iterparse
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+ROW_TAG = MAIN_NS + "row"
+CELL_TAG = MAIN_NS + "c"
+VALUE_TAG = MAIN_NS + "v"
+INLINE_TAG = MAIN_NS + "is"
+TEXT_TAG = MAIN_NS + "t"
+RUN_TAG = MAIN_NS + "r"
+SI_TAG = MAIN_NS + "si"
+DIMENSION_TAG = MAIN_NS + "dimension"
+SHEET_DATA_TAG = MAIN_NS + "sheetData"
+
+DIGITS = "0123456789"
+
+
+class FastXlsxReader:
+    """
+    Потоковое чтение листов .xlsx напрямую из XML
+
+    Лист разбирается инкрементально (iterparse) прямо из zip-архива,
+    общие строки один раз загружаются в список. Строки выдаются уже
+    готовыми значениями - без объектов ячеек openpyxl и без повторной
+    обработки extract_value. Значения совпадают с openpyxl в режиме
+    read_only/data_only, включая даты по числовым форматам стилей.
+    """
+
+    def __init__(self, file_path: str):
+        self._zip = zipfile.ZipFile(file_path)
+        try:
+            self._read_workbook()
+        except Exception:
+            self._zip.close()
+            raise
+        self._shared_strings: Optional[List[str]] = None
+        self._date_styles: Optional[Set[int]] = None
+        self._timedelta_styles: Set[int] = set()
+        self._column_cache: Dict[str, int] = {}
+
+    def close(self):
+        self._zip.close()
+
+    @property
+    def active_sheet(self) -> str:
+        """Имя активного листа книги"""
+        return self.sheet_names[min(self._active_index, len(self.sheet_names) - 1)]
+
+    def dimension(self, sheet_name: str) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Размеры листа из тега <dimension>, если он есть
+
+        Args:
+            sheet_name: Имя листа
+
+        Returns:
+            Tuple[Optional[int], Optional[int]]: Число строк и столбцов
+        """
+        with self._zip.open(self._sheet_paths[sheet_name]) as source:
+            for _, element in iterparse(source, events=("start",)):
+                if element.tag == DIMENSION_TAG:
+                    ref = element.get("ref", "")
+                    last = ref.split(":")[-1]
+                    letters = last.rstrip(DIGITS)
+                    if letters and last[len(letters):]:
+                        return int(last[len(letters):]), self._column_index(letters)
+                    return None, None
+                if element.tag == SHEET_DATA_TAG:
+                    return None, None
+        return None, None
+
+    def iter_rows(self, sheet_name: str) -> Iterator[List[Any]]:
+        """
+        Выдает строки листа значениями; пустые ячейки - ""
+
+        Размерам из <dimension> не доверяет: строка заканчивается на
+        последней ячейке в XML, пропущенные в XML строки выдаются пустыми.
+
+        Args:
+            sheet_name: Имя листа
+
+        Yields:
+            List[Any]: Значения ячеек строки
+        """
+        shared = self._load_shared_strings()
+        date_styles = self._load_styles()
+        timedelta_styles = self._timedelta_styles
+        epoch = self._epoch
+        column_index = self._column_index
+        cell_value = self._cell_value
+
+        row_number = 0
+        # Разобранные строки удаляются из <sheetData>: иначе пустые
+        # элементы <row> копятся в дереве до конца листа
+        sheet_data = None
+        with self._zip.open(self._sheet_paths[sheet_name]) as source:
+            for event, element in iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if element.tag == SHEET_DATA_TAG:
+                        sheet_data = element
+                    continue
+                if element.tag != ROW_TAG:
+                    continue
+
+                index = element.get("r")
+                index = int(index) if index else row_number + 1
+                while row_number + 1 < index:
+                    row_number += 1
+                    yield []
+                row_number = index
+
+                values: List[Any] = []
+                column = 0
+                for cell in element:
+                    if cell.tag != CELL_TAG:
+                        continue
+                    ref = cell.get("r")
+                    column = column_index(ref.rstrip(DIGITS)) if ref else column + 1
+
+                    value = cell_value(cell, shared, date_styles,
+                                       timedelta_styles, epoch)
+                    if len(values) < column:
+                        values.extend([""] * (column - len(values)))
+                    values[column - 1] = value
+
+                if sheet_data is not None:
+                    sheet_data.clear()
+                else:
+                    element.clear()
+                yield values
+
+    @staticmethod
+    def _cell_value(cell, shared: List[str], date_styles: Set[int],
+                    timedelta_styles: Set[int], epoch) -> Any:
+        data_type = cell.get("t", "n")
+
+        if data_type == "inlineStr":
+            inline = cell.find(INLINE_TAG)
+            value = _text_content(inline) if inline is not None else None
+        else:
+            value = cell.findtext(VALUE_TAG) or None
+            if value is None:
+                return ""
+
+            if data_type == "n":
+                if "." in value or "E" in value or "e" in value:
+                    value = float(value)
+                else:
+                    value = int(value)
+                style = cell.get("s")
+                if style and int(style) in date_styles:
+                    try:
+                        return from_excel(value, epoch,
+                                          timedelta=int(style) in timedelta_styles)
+                    except (OverflowError, ValueError):
+                        return "#VALUE!"
+                return value
+            elif data_type == "s":
+                value = shared[int(value)]
+            elif data_type == "b":
+                return bool(int(value))
+            elif data_type == "d":
+                return from_ISO8601(value)
+
+        if value is None or not value.strip():
+            return ""
+        return value
+
+    def _column_index(self, letters: str) -> int:
+        index = self._column_cache.get(letters)
+        if index is None:
+            index = 0
+            for char in letters:
+                index = index * 26 + ord(char) - 64
+            self._column_cache[letters] = index
+        return index
+
+    def _read_workbook(self):
+        relationships = self._read_relationships("xl/workbook.xml")
+        workbook = fromstring(self._zip.read("xl/workbook.xml"))
+
+        properties = workbook.find(MAIN_NS + "workbookPr")
+        date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+        self._epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        view = workbook.find(f"{MAIN_NS}bookViews/{MAIN_NS}workbookView")
+        self._active_index = int(view.get("activeTab", 0)) if view is not None else 0
+
+        self.sheet_names: List[str] = []
+        self._sheet_paths: Dict[str, str] = {}
+        for sheet in workbook.iter(MAIN_NS + "sheet"):
+            target = relationships.get(sheet.get(REL_NS + "id"))
+            if target is None:
+                continue
+            self.sheet_names.append(sheet.get("name"))
+            self._sheet_paths[sheet.get("name")] = target
+
+        self._part_paths = {rel_type.rsplit("/", 1)[-1]: target
+                            for target, rel_type in self._relationship_types.items()}
+
+    def _read_relationships(self, part: str) -> Dict[str, str]:
+        folder, name = posixpath.split(part)
+        rels_path = posixpath.join(folder, "_rels", name + ".rels")
+        relationships = {}
+        self._relationship_types: Dict[str, str] = {}
+        if rels_path not in self._zip.namelist():
+            return relationships
+
+        for rel in fromstring(self._zip.read(rels_path)).iter(PKG_REL_NS + "Relationship"):
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target = target.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            relationships[rel.get("Id")] = target
+            self._relationship_types[target] = rel.get("Type", "")
+        return relationships
+
+    def _load_shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            self._shared_strings = []
+            path = self._part_paths.get("sharedStrings", "xl/sharedStrings.xml")
+            if path in self._zip.namelist():
+                # Разобранные <si> удаляются из корня <sst>, как строки в iter_rows
+                root = None
+                with self._zip.open(path) as source:
+                    for event, element in iterparse(source, events=("start", "end")):
+                        if event == "start":
+                            if root is None:
+                                root = element
+                            continue
+                        if element.tag == SI_TAG:
+                            text = _text_content(element).replace("x005F_", "")
+                            self._shared_strings.append(text)
+                            root.clear()
+        return self._shared_strings
+
+    def _load_styles(self) -> Set[int]:
+        if self._date_styles is None:
+            self._date_styles = set()
+            path = self._part_paths.get("styles", "xl/styles.xml")
+            if path not in self._zip.namelist():
+                return self._date_styles
+
+            styles = fromstring(self._zip.read(path))
+            formats = dict(BUILTIN_FORMATS)
+            for number_format in styles.iter(MAIN_NS + "numFmt"):
+                formats[int(number_format.get("numFmtId"))] = number_format.get("formatCode")
+
+            cell_xfs = styles.find(MAIN_NS + "cellXfs")
+            if cell_xfs is not None:
+                for style_id, xf in enumerate(cell_xfs.iter(MAIN_NS + "xf")):
+                    fmt = formats.get(int(xf.get("numFmtId", 0)))
+                    if is_date_format(fmt):
+                        self._date_styles.add(style_id)
+                        if is_timedelta_format(fmt):
+                            self._timedelta_styles.add(style_id)
+        return self._date_styles
+
+
+def _text_content(element) -> str:
+    """Текст строки без форматирования: <t> и <r><t>, без фонетики <rPh>"""
+    snippets = []
+    for child in element:
+        if child.tag == TEXT_TAG:
+            snippets.append(child.text or "")
+        elif child.tag == RUN_TAG:
+            text = child.find(TEXT_TAG)
+            if text is not None:
+                snippets.append(text.text or "")
+    return "".join(snippets)
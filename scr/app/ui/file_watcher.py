@@ -0,0 +1,93 @@
+import os
+from typing import Optional, Tuple
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal, pyqtSlot
+
+
+class FileWatcher(QObject):
+    """
+    Следит за открытым файлом и сообщает о его изменении
+
+    Сигнал отправляется после паузы debounce_ms без новых изменений:
+    файл обычно пишется несколькими операциями. Каталог файла тоже
+    отслеживается, потому что при замене через переименование
+    QFileSystemWatcher перестает следить за путем.
+    """
+
+    changed = pyqtSignal(str)
+
+    def __init__(self, debounce_ms: int, parent=None):
+        super().__init__(parent)
+        self._path: Optional[str] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._watcher = QFileSystemWatcher(self)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+
+        self._watcher.fileChanged.connect(self._on_changed)
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._timer.timeout.connect(self._on_timeout)
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def watch(self, path: str):
+        """
+        Начинает следить за файлом вместо предыдущего
+
+        Args:
+            path: Путь к файлу
+        """
+        if path == self._path:
+            self._signature = _signature(path)
+            return
+        self.stop()
+        self._path = path
+        self._signature = _signature(path)
+        self._watcher.addPath(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        if os.path.isdir(directory):
+            self._watcher.addPath(directory)
+
+    def stop(self):
+        """Прекращает наблюдение"""
+        self._timer.stop()
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._path = None
+        self._signature = None
+
+    def schedule(self):
+        """Откладывает проверку файла еще на debounce_ms (например, пока идет загрузка)"""
+        if self._path is not None:
+            self._timer.start()
+
+    @pyqtSlot(str)
+    def _on_changed(self, _path: str):
+        if self._path is not None:
+            self._timer.start()
+
+    @pyqtSlot()
+    def _on_timeout(self):
+        path = self._path
+        if path is None or not os.path.exists(path):
+            return
+        if path not in self._watcher.files():
+            self._watcher.addPath(path)
+
+        signature = _signature(path)
+        if signature != self._signature:
+            self._signature = signature
+            self.changed.emit(path)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    """Время изменения и размер файла"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -1,37 +1,159 @@
-from typing import Optional
+import importlib
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from PyQt5.QtCore import Qt, pyqtSlot
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout,
-    QHBoxLayout, QMessageBox, QSplitter
+    QHBoxLayout, QMessageBox, QSplitter,
+    QPushButton, QProgressBar, QLabel, QLineEdit,
+    QMenu, QFileDialog, QTabWidget
 )
 
+from .file_watcher import FileWatcher
 from .widgets.analysis_panel import AnalysisPanel
 from .widgets.data_table import DataTable
 from .widgets.file_selector import FileSelector
+from .widgets.pivot_panel import PivotPanel
+from .workers.export_worker import ExportWorker
+from .workers.file_load_worker import FileLoadWorker
+from .workers.file_refresh_worker import FileRefreshWorker
+from .workers.search_index_worker import SearchIndexWorker
 from ..core.constants import CONFIG
-from ..core.dataclasses import ExcelFileInfo, AnalysisResult
-from ..core.exceptions import (
-    FileLoadError, FileFormatError,
-    FileError, EmptyFileError, AnalysisError
+from ..core.dataclasses import ExcelFileInfo, AnalysisResult, SheetChanges, SheetInfo
+from ..core.instrumentation import INSTRUMENTATION, format_breakdown
+from ..core.exceptions import AnalysisError, ExportError, FilterError, PivotError
+
+if TYPE_CHECKING:
+    from ..modules.data_analyzer import DataAnalyzer
+    from ..modules.excel_loader import ExcelLoader
+    from ..modules.pivot import PivotEngine
+    from ..modules.search_index import SearchIndex
+
+# Модули загрузки и анализа (с openpyxl, xlrd и NumPy): импортируются
+# в фоне после первой отрисовки окна, а не до нее
+BACKEND_MODULES = (
+    "app.modules.excel_loader",
+    "app.modules.xlsx_reader",
+    "app.modules.data_analyzer",
+    "app.modules.columnar",
+    "openpyxl",
+    "xlrd",
 )
-from ..modules.data_analyzer import DataAnalyzer
-from ..modules.excel_loader import ExcelLoader
+
+# Фильтры диалога экспорта: расширение -> строка фильтра
+EXPORT_FILTERS = {
+    ".csv": "CSV (*.csv)",
+    ".xlsx": "Excel (*.xlsx)",
+    ".parquet": "Parquet (*.parquet)",
+}
 
 
 class MainWindow(QMainWindow):
+    # Окно отрисовано первый раз (время до первого окна, см. tools.startup)
+    first_painted = pyqtSignal()
+
     def __init__(self):
         super().__init__()
+        self._painted = False
         self._current_file_info: Optional[ExcelFileInfo] = None
         self._current_analysis: Optional[AnalysisResult] = None
-        self.excel_loader = ExcelLoader()
-        self.data_analyzer = DataAnalyzer()
+        # Фоновая задача: загрузка, обновление или экспорт (одна за раз)
+        self._load_thread: Optional[QThread] = None
+        self._load_worker: Optional[FileLoadWorker] = None
+        # Загруженные листы текущего файла: имя листа -> данные и анализ
+        self._sheet_results: Dict[str, Tuple[ExcelFileInfo, AnalysisResult]] = {}
+        # Метка замеров, с которой начался текущий шаг (загрузка, смена листа)
+        self._trace_mark = 0
+        # Постепенная загрузка: начало и показаны ли уже первые строки
+        self._load_started = 0.0
+        self._preview_shown = False
+        self._provisional_analysis: Optional[AnalysisResult] = None
+        self._excel_loader: Optional["ExcelLoader"] = None
+        self._data_analyzer: Optional["DataAnalyzer"] = None
+        self._preload_thread: Optional[threading.Thread] = None
+        # Индекс поиска по текущему листу строится в фоне после показа
+        self._search_index: Optional["SearchIndex"] = None
+        self._search_thread: Optional[QThread] = None
+        self._search_worker: Optional[SearchIndexWorker] = None
+        # Столбцов в последнем запущенном построении индекса
+        self._indexed_columns = 0
+        # Лист изменился, пока строился индекс: построить заново
+        self._search_restart = False
+        self._search_query: Optional[str] = None
+        self._search_matches = None
+        self._search_position = -1
+        # Сводная таблица по колоночным данным таблицы (data_table.row_index)
+        self._pivot_engine: Optional["PivotEngine"] = None
+        # Следит за открытым файлом, если включено в настройках watch
+        self.file_watcher: Optional[FileWatcher] = None
+        if CONFIG.watch_enabled:
+            self.file_watcher = FileWatcher(CONFIG.watch_debounce_ms, self)
         self._setup_ui()
         self._connect_signals()
+        self.first_painted.connect(self.preload_backends)
         self._apply_styles()
         self.setWindowTitle(CONFIG.name)
         self.resize(*CONFIG.window_size)
 
+    @property
+    def excel_loader(self) -> "ExcelLoader":
+        if self._excel_loader is None:
+            self._wait_preload()
+            from ..modules.excel_loader import ExcelLoader
+            self._excel_loader = ExcelLoader()
+        return self._excel_loader
+
+    @property
+    def data_analyzer(self) -> "DataAnalyzer":
+        if self._data_analyzer is None:
+            self._wait_preload()
+            from ..modules.data_analyzer import DataAnalyzer
+            self._data_analyzer = DataAnalyzer()
+        return self._data_analyzer
+
+    def preload_backends(self):
+        """
+        Импортирует модули загрузки и анализа в фоновом потоке
+
+        Вызывается после первой отрисовки окна, чтобы к выбору файла
+        они уже были загружены. Ошибки импорта здесь не показываются:
+        они проявятся при загрузке файла. Если загрузка уже началась,
+        модули импортирует она сама.
+        """
+        if self._excel_loader is not None:
+            return
+
+        def preload():
+            for name in BACKEND_MODULES:
+                try:
+                    importlib.import_module(name)
+                except ImportError:
+                    pass
+
+        self._preload_thread = threading.Thread(target=preload, name="preload", daemon=True)
+        self._preload_thread.start()
+
+    def _wait_preload(self):
+        """
+        Дожидается фонового импорта перед первой загрузкой
+
+        Иначе рабочий поток импортирует openpyxl одновременно с фоновым, и
+        импорт может завершиться ошибкой «deadlock detected by _ModuleLock».
+        """
+        if self._preload_thread is not None:
+            self._preload_thread.join()
+            self._preload_thread = None
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            # После возврата в цикл событий, чтобы не задерживать отрисовку
+            QTimer.singleShot(0, self.first_painted.emit)
+
     def _setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -41,26 +163,72 @@ class MainWindow(QMainWindow):
         central_widget.setLayout(main_layout)
         control_panel = QHBoxLayout()
         self.file_selector = FileSelector()
-        control_panel.addWidget(self.file_selector)
+        control_panel.addWidget(self.file_selector, 1)
+        self.export_btn = QPushButton("Экспорт")
+        self.export_btn.setFixedWidth(90)
+        export_menu = QMenu(self.export_btn)
+        self.export_data_action = export_menu.addAction("Показанные строки...")
+        self.export_stats_action = export_menu.addAction("Статистика столбцов...")
+        self.export_btn.setMenu(export_menu)
+        self.export_btn.setEnabled(False)
+        control_panel.addWidget(self.export_btn)
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setFixedWidth(120)
+        self.cancel_btn = QPushButton("Отмена")
+        self.cancel_btn.setFixedWidth(90)
+        control_panel.addWidget(self.progress_label)
+        control_panel.addWidget(self.progress_bar)
+        control_panel.addWidget(self.cancel_btn)
         main_layout.addLayout(control_panel)
         splitter = QSplitter(Qt.Horizontal)
+        table_panel = QWidget()
+        table_layout = QVBoxLayout(table_panel)
+        table_layout.setContentsMargins(0, 0, 0, 0)
+        table_layout.setSpacing(3)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Фильтр: сумма > 1000; регион == Москва (Enter)")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Поиск (Enter - следующее, \"слово\" - целиком)")
+        self.search_edit.setClearButtonEnabled(True)
+        search_row = QHBoxLayout()
+        search_row.addWidget(self.filter_edit, 3)
+        search_row.addWidget(self.search_edit, 2)
+        table_layout.addLayout(search_row)
         self.data_table = DataTable()
-        splitter.addWidget(self.data_table)
+        table_layout.addWidget(self.data_table, 1)
+        splitter.addWidget(table_panel)
         self.analysis_panel = AnalysisPanel()
-        splitter.addWidget(self.analysis_panel)
+        self.pivot_panel = PivotPanel()
+        self.side_tabs = QTabWidget()
+        self.side_tabs.addTab(self.analysis_panel, "Анализ")
+        self.side_tabs.addTab(self.pivot_panel, "Сводная")
+        splitter.addWidget(self.side_tabs)
         splitter.setSizes([int(self.width() * 0.7),
                            int(self.width() * 0.3)])
 
         main_layout.addWidget(splitter, 1)
+        self._set_loading(False)
 
     def _connect_signals(self):
         self.file_selector.file_selected.connect(self._on_file_selected)
         self.file_selector.headers_changed.connect(self._on_headers_changed)
+        self.file_selector.sheet_changed.connect(self._on_sheet_changed)
+        self.cancel_btn.clicked.connect(self._on_cancel_clicked)
+        self.filter_edit.returnPressed.connect(self._on_filter_entered)
+        self.search_edit.returnPressed.connect(self._on_search_entered)
+        self.export_data_action.triggered.connect(self._on_export_data)
+        self.export_stats_action.triggered.connect(self._on_export_statistics)
+        self.pivot_panel.build_requested.connect(self._on_pivot_requested)
+        if self.file_watcher is not None:
+            self.file_watcher.changed.connect(self._on_file_changed)
 
     def _apply_styles(self):
         self.setStyleSheet("""
             QMainWindow { background-color: #f5f5f5; }
-            QTableWidget { 
+            QTableView { 
                 background-color: white; 
                 alternate-background-color: #f9f9f9;
                 font-size: 11px;
@@ -84,34 +252,492 @@ class MainWindow(QMainWindow):
 
     @pyqtSlot(str, bool)
     def _on_file_selected(self, file_path: str, has_headers: bool):
+        if self._load_worker is not None:
+            return
+        self._sheet_results.clear()
+        self._start_loading(file_path, has_headers)
+
+    @pyqtSlot(str)
+    def _on_sheet_changed(self, sheet_name: str):
+        if self._load_worker is not None or self._current_file_info is None:
+            return
+        self._trace_mark = INSTRUMENTATION.mark()
+        has_headers = self.file_selector.headers_checkbox.isChecked()
+        if sheet_name in self._sheet_results:
+            file_info, analysis_result = self._sheet_results[sheet_name]
+            if file_info.has_headers != has_headers:
+                file_info = file_info.with_headers(has_headers)
+                analysis_result = self.data_analyzer.reanalyze_headers(
+                    file_info, analysis_result
+                )
+            self._show_sheet(file_info, analysis_result)
+        else:
+            self._start_loading(self._current_file_info.file_path, has_headers, sheet_name)
+
+    def _start_loading(self, file_path: str, has_headers: bool,
+                       sheet_name: Optional[str] = None):
+        self._trace_mark = INSTRUMENTATION.mark()
+        self._set_loading(True)
+        self._load_started = time.perf_counter()
+        self._preview_shown = False
+        self._provisional_analysis = None
+
+        thread = QThread(self)
+        worker = FileLoadWorker(self.excel_loader, self.data_analyzer,
+                                file_path, has_headers, sheet_name)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(self._on_load_progress)
+        worker.rows_read.connect(self._on_rows_read)
+        worker.provisional.connect(self._on_provisional_analysis)
+        worker.finished.connect(self._on_load_finished)
+        worker.failed.connect(self._on_load_failed)
+        worker.cancelled.connect(self._on_load_cancelled)
+        for signal in (worker.finished, worker.failed, worker.cancelled):
+            signal.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._load_thread = thread
+        self._load_worker = worker
+        thread.start()
+
+    @pyqtSlot()
+    def _on_filter_entered(self):
+        if self._current_file_info is None:
+            return
+        try:
+            shown = self.data_table.set_filter(self.filter_edit.text())
+        except FilterError as e:
+            self.statusBar().showMessage(f"Фильтр не применен: {str(e)}")
+            return
+        # Совпадения поиска отбираются по показанным строкам
+        self._search_query = None
+        self.statusBar().showMessage(
+            f"Показано строк: {shown} из {len(self._current_file_info.data)}"
+        )
+        self._refresh_pivot()
+
+    @pyqtSlot(list, list)
+    def _on_pivot_requested(self, keys: list, aggregates: list):
+        """Строит сводную по показанным (отфильтрованным) строкам листа"""
+        if self._current_file_info is None or self._load_worker is not None:
+            return
+        from ..modules.pivot import PivotEngine
+
+        row_index = self.data_table.row_index
+        # Кэш кодов ключей действителен, пока таблица показывает те же данные
+        if self._pivot_engine is None or self._pivot_engine.row_index is not row_index:
+            self._pivot_engine = PivotEngine(row_index)
+        started = time.perf_counter()
+        try:
+            result = self._pivot_engine.run(keys, aggregates, self.data_table.shown_rows)
+        except PivotError as e:
+            self.statusBar().showMessage(f"Сводная не построена: {str(e)}")
+            return
+        self.pivot_panel.show_result(result, time.perf_counter() - started)
+
+    def _refresh_pivot(self):
+        """Перестраивает показанную сводную после фильтра или обновления файла"""
+        if self.pivot_panel.has_result:
+            self._on_pivot_requested(self.pivot_panel.keys(), self.pivot_panel.aggregates())
+
+    @pyqtSlot()
+    def _on_search_entered(self):
+        query = self.search_edit.text().strip()
+        if not query or self._current_file_info is None:
+            self._search_query = None
+            return
+        if self._search_index is None:
+            self.statusBar().showMessage("Индекс поиска еще строится, поиск выполнится по готовности")
+            return
+        if query != self._search_query:
+            self._run_search(query)
+        self._show_next_match()
+
+    def _run_search(self, query: str):
+        """Находит ячейки по индексу; совпадения в скрытых фильтром строках отбрасываются"""
+        import numpy as np
+
+        # "слово" - только целые слова, иначе слова запроса - начала слов
+        exact = len(query) >= 2 and query[0] == query[-1] == '"'
+        with INSTRUMENTATION.span("search.query") as span:
+            matches = self._search_index.search(query.strip('"') if exact else query,
+                                                prefix=not exact)
+            shown_rows = self.data_table.shown_rows
+            if shown_rows is not None:
+                rows, _ = self._search_index.positions(matches)
+                matches = matches[np.isin(rows, shown_rows)]
+            span.count(matches=len(matches))
+        self._search_query = query
+        self._search_matches = matches
+        self._search_position = -1
+
+    def _show_next_match(self):
+        matches = self._search_matches
+        if not len(matches):
+            self.statusBar().showMessage(f"Не найдено: {self._search_query}")
+            return
+        self._search_position = (self._search_position + 1) % len(matches)
+        row, column = divmod(int(matches[self._search_position]), self._search_index.column_count)
+        self.data_table.select_cell(row, column)
+        self.statusBar().showMessage(
+            f"Совпадение {self._search_position + 1} из {len(matches)}: строка {row + 1}"
+        )
+
+    def _start_indexing(self):
+        """Строит индекс поиска по текущему листу в фоне (прежний индекс отбрасывается)"""
+        self._search_index = None
+        self._search_query = None
+        if self._search_worker is not None:
+            self._search_restart = True
+            self._search_worker.cancel()
+            return
+        if self._current_file_info is None:
+            return
+
+        thread = QThread(self)
+        self._indexed_columns = self.data_table.model().columnCount()
+        worker = SearchIndexWorker(self._current_file_info, self._indexed_columns)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(self._on_index_finished)
+        worker.failed.connect(self._on_index_failed)
+        worker.cancelled.connect(self._on_index_stopped)
+        for signal in (worker.finished, worker.failed, worker.cancelled):
+            signal.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._search_thread = thread
+        self._search_worker = worker
+        thread.start()
+
+    @pyqtSlot(object, object)
+    def _on_index_finished(self, file_info: ExcelFileInfo, index: "SearchIndex"):
+        current = self._current_file_info
+        if self._on_index_stopped() or current is None or file_info.raw_rows is not current.raw_rows:
+            return
+        self._search_index = index.with_row_offset(current.data_offset)
+        if self.search_edit.text().strip():
+            self._on_search_entered()
+
+    @pyqtSlot(str)
+    def _on_index_failed(self, message: str):
+        if not self._on_index_stopped():
+            self.statusBar().showMessage(f"Поиск недоступен: {message}")
+
+    @pyqtSlot()
+    def _on_index_stopped(self) -> bool:
+        """Освобождает фоновое построение; True, если индекс строится заново"""
+        self._search_worker = None
+        self._search_thread = None
+        if self._search_restart:
+            self._search_restart = False
+            self._start_indexing()
+            return True
+        return False
+
+    def _ask_export_path(self, title: str, suffix: str) -> Optional[str]:
+        """Путь для экспорта; расширение добавляется по выбранному фильтру"""
+        file_info = self._current_file_info
+        source = Path(file_info.file_path)
+        default = source.with_name(f"{source.stem}_{file_info.sheet_name}{suffix}.csv")
+        path, selected = QFileDialog.getSaveFileName(
+            self, title, str(default), ";;".join(EXPORT_FILTERS.values())
+        )
+        if not path:
+            return None
+        if Path(path).suffix.lower() not in EXPORT_FILTERS:
+            extensions = {value: key for key, value in EXPORT_FILTERS.items()}
+            path += extensions.get(selected, ".csv")
+        return path
+
+    @pyqtSlot()
+    def _on_export_data(self):
+        if self._current_file_info is None or self._load_worker is not None:
+            return
+        path = self._ask_export_path("Экспорт строк", "")
+        if path is None:
+            return
+        # Пишутся строки в порядке показа: с сортировкой и фильтром
+        order = self.data_table.shown_rows
+        total = len(order) if order is not None else len(self._current_file_info.data)
+        self._trace_mark = INSTRUMENTATION.mark()
+        self._set_loading(True)
+        self.progress_label.setText("Экспорт...")
+
+        thread = QThread(self)
+        worker = ExportWorker(path, self.data_table.headers,
+                              self._current_file_info.data, order)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(lambda rows: self.progress_label.setText(
+            f"Записано строк: {rows} из {total}"))
+        worker.finished.connect(self._on_export_finished)
+        worker.failed.connect(self._on_export_failed)
+        worker.cancelled.connect(self._on_export_cancelled)
+        for signal in (worker.finished, worker.failed, worker.cancelled):
+            signal.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._load_thread = thread
+        self._load_worker = worker
+        thread.start()
+
+    @pyqtSlot()
+    def _on_export_statistics(self):
+        # Статистика - строка на столбец: пишется сразу, без фонового потока
+        if self._current_analysis is None:
+            return
+        path = self._ask_export_path("Экспорт статистики", "_stats")
+        if path is None:
+            return
+        from ..modules.exporter import export_statistics
+
         try:
-            self.file_selector.set_enabled(False)
-            file_info = self.excel_loader.load_file(file_path, has_headers)
+            export_statistics(path, self._current_analysis)
+        except ExportError as e:
+            QMessageBox.critical(self, "Ошибка", str(e))
+            return
+        self.statusBar().showMessage(f"Статистика сохранена: {path}")
+
+    @pyqtSlot(str, int)
+    def _on_export_finished(self, path: str, rows: int):
+        self._finish_loading()
+        self.statusBar().showMessage(f"Экспортировано строк: {rows} в {path}")
+        self._show_instrumentation()
+
+    @pyqtSlot(str)
+    def _on_export_failed(self, message: str):
+        self._finish_loading()
+        QMessageBox.critical(self, "Ошибка экспорта", message)
+
+    @pyqtSlot()
+    def _on_export_cancelled(self):
+        self._finish_loading()
+        self.statusBar().showMessage("Экспорт отменен")
+
+    @pyqtSlot(str)
+    def _on_file_changed(self, file_path: str):
+        if self._current_file_info is None or file_path != self._current_file_info.file_path:
+            return
+        if self._load_worker is not None:
+            # Повторить, когда закончится текущая загрузка
+            self.file_watcher.schedule()
+            return
+        self._start_refresh()
+
+    def _start_refresh(self):
+        """Перечитывает текущий лист в фоне и обновляет только изменившееся"""
+        self._trace_mark = INSTRUMENTATION.mark()
+        self._set_loading(True)
+        self.progress_label.setText("Файл изменен, обновление...")
+
+        thread = QThread(self)
+        worker = FileRefreshWorker(self.excel_loader, self.data_analyzer,
+                                   self._current_file_info, self._current_analysis)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(self._on_load_progress)
+        worker.refreshed.connect(self._on_refresh_finished)
+        worker.failed.connect(self._on_refresh_failed)
+        worker.cancelled.connect(self._on_load_cancelled)
+        for signal in (worker.refreshed, worker.failed, worker.cancelled):
+            signal.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._load_thread = thread
+        self._load_worker = worker
+        thread.start()
+
+    @pyqtSlot(object, object, object)
+    def _on_refresh_finished(self, file_info: ExcelFileInfo, analysis_result: AnalysisResult,
+                             changes: SheetChanges):
+        self._finish_loading()
+        # Другие листы прочитаны из прежней версии файла
+        self._sheet_results.clear()
+
+        if changes.structural or changes.removed:
+            self._show_sheet(file_info, analysis_result)
+        else:
+            previous = self._current_analysis
             self._current_file_info = file_info
-            rows, columns = self.data_table.load_data(file_info, has_headers)
-            analysis_result = self.data_analyzer.analyze(file_info, has_headers)
             self._current_analysis = analysis_result
-            self.analysis_panel.update_analysis(analysis_result)
+            self._sheet_results[file_info.sheet_name] = (file_info, analysis_result)
+            self.data_table.update_data(file_info, changes)
+            self.analysis_panel.update_analysis(analysis_result, previous)
+            self._refresh_pivot()
+            self._start_indexing()
+            self._show_instrumentation()
 
-        except (FileFormatError, EmptyFileError, FileError,
-                FileLoadError, AnalysisError) as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-            self._clear_data()
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка: {str(e)}")
-            self._clear_data()
-        finally:
-            self.file_selector.set_enabled(True)
+        self.statusBar().showMessage(
+            f"Файл обновлен: изменено строк {len(changes.changed_cells)}, "
+            f"добавлено {changes.appended}, удалено {changes.removed}"
+        )
+
+    @pyqtSlot(str)
+    def _on_refresh_failed(self, message: str):
+        # Файл мог быть еще не дописан: показываем прежние данные
+        self._finish_loading()
+        self.statusBar().showMessage(f"Не удалось обновить файл: {message}")
+
+    @pyqtSlot(object, list)
+    def _on_rows_read(self, sheet_info: SheetInfo, rows: list):
+        """Показывает строки листа, пока он дочитывается"""
+        if self._load_worker is None or self._load_worker.is_cancelled():
+            return
+        if not self._preview_shown:
+            self._preview_shown = True
+            self.data_table.start_preview(sheet_info)
+            self.data_table.append_preview(rows)
+            # Время до первых строк - главная задержка открытия файла
+            self.statusBar().showMessage(
+                f"Первые строки через {(time.perf_counter() - self._load_started) * 1000:.0f} мс"
+            )
+            return
+        self.data_table.append_preview(rows)
+
+    @pyqtSlot(object)
+    def _on_provisional_analysis(self, analysis_result: AnalysisResult):
+        if self._load_worker is None or self._load_worker.is_cancelled():
+            return
+        self.analysis_panel.update_analysis(analysis_result, self._provisional_analysis)
+        self._provisional_analysis = analysis_result
+
+    @pyqtSlot(int)
+    def _on_load_progress(self, rows_read: int):
+        self.progress_label.setText(f"Прочитано строк: {rows_read}")
+
+    @pyqtSlot(object, object)
+    def _on_load_finished(self, file_info: ExcelFileInfo, analysis_result: AnalysisResult):
+        self._finish_loading()
+        self._show_sheet(file_info, analysis_result)
+
+    def _show_sheet(self, file_info: ExcelFileInfo, analysis_result: AnalysisResult):
+        previous = self._current_file_info
+        self._current_file_info = file_info
+        self._current_analysis = analysis_result
+        self._sheet_results[file_info.sheet_name] = (file_info, analysis_result)
+        self.file_selector.set_sheets(file_info.sheet_names, file_info.sheet_name)
+        if self.file_watcher is not None:
+            self.file_watcher.watch(file_info.file_path)
+        self.filter_edit.clear()
+        self.export_btn.setEnabled(self._load_worker is None)
+        self.data_table.load_data(file_info, file_info.has_headers)
+        self.analysis_panel.update_analysis(analysis_result)
+        self._pivot_engine = None
+        self.pivot_panel.set_columns(self.data_table.headers)
+        if previous is not None and self._same_rows(previous, file_info):
+            # Те же строки листа (сменился режим заголовков): индекс
+            # только сдвигает первую строку данных
+            self._search_query = None
+            if self._search_index is not None:
+                self._search_index = self._search_index.with_row_offset(file_info.data_offset)
+        else:
+            self._start_indexing()
+        self._show_instrumentation()
+
+    def _same_rows(self, previous: ExcelFileInfo, file_info: ExcelFileInfo) -> bool:
+        """Индекс поиска по previous подходит file_info"""
+        if self._search_index is None and self._search_worker is None:
+            return False
+        return (previous.raw_rows is file_info.raw_rows
+                and self.data_table.model().columnCount() == self._indexed_columns)
+
+    def _show_instrumentation(self):
+        """Разбивка времени по этапам последнего шага в строке состояния"""
+        if not INSTRUMENTATION.enabled:
+            return
+        spans = INSTRUMENTATION.records(since=self._trace_mark)
+        self.statusBar().showMessage(format_breakdown(spans))
+        self.statusBar().setToolTip(format_breakdown(spans, nested=True))
+        if CONFIG.trace_file:
+            try:
+                INSTRUMENTATION.dump_trace(CONFIG.trace_file, since=self._trace_mark)
+            except OSError as e:
+                self.statusBar().showMessage(f"Не удалось сохранить трассу: {str(e)}")
+
+    @pyqtSlot(str)
+    def _on_load_failed(self, message: str):
+        self._finish_loading()
+        QMessageBox.critical(self, "Ошибка", message)
+        self._clear_data()
+
+    @pyqtSlot()
+    def _on_load_cancelled(self):
+        self._finish_loading()
+        if self._preview_shown:
+            # Показаны строки недочитанного листа: возвращается прежний
+            if self._current_file_info is not None:
+                self._show_sheet(self._current_file_info, self._current_analysis)
+            else:
+                self._clear_data()
+
+    @pyqtSlot()
+    def _on_cancel_clicked(self):
+        if self._load_worker is not None:
+            self.progress_label.setText("Отмена...")
+            self._load_worker.cancel()
+
+    def _finish_loading(self):
+        self._load_worker = None
+        self._load_thread = None
+        self._set_loading(False)
+        self._provisional_analysis = None
+
+    def _set_loading(self, loading: bool):
+        self.file_selector.set_enabled(not loading)
+        self.export_btn.setEnabled(not loading and self._current_file_info is not None)
+        # Фильтр и поиск относятся к показанному листу, а он может смениться
+        self.filter_edit.setEnabled(not loading)
+        self.search_edit.setEnabled(not loading)
+        self.progress_label.setVisible(loading)
+        self.progress_bar.setVisible(loading)
+        self.cancel_btn.setVisible(loading)
+        if loading:
+            self.progress_label.setText("Загрузка...")
+
+    def closeEvent(self, event):
+        if self._load_worker is not None:
+            self._load_worker.cancel()
+            self._load_thread.quit()
+            self._load_thread.wait()
+        if self._search_worker is not None:
+            self._search_restart = False
+            self._search_worker.cancel()
+            self._search_thread.quit()
+            self._search_thread.wait()
+        super().closeEvent(event)
 
     @pyqtSlot(bool)
     def _on_headers_changed(self, has_headers: bool):
-        if self._current_file_info:
-            file_path = self.file_selector.get_current_file()
-            if file_path:
-                self._on_file_selected(file_path, has_headers)
+        if not self._current_file_info or self._load_worker is not None:
+            return
+        self._trace_mark = INSTRUMENTATION.mark()
+        try:
+            file_info = self._current_file_info.with_headers(has_headers)
+            analysis_result = self.data_analyzer.reanalyze_headers(
+                file_info, self._current_analysis
+            )
+        except AnalysisError as e:
+            QMessageBox.critical(self, "Ошибка", str(e))
+            return
+        self._show_sheet(file_info, analysis_result)
 
     def _clear_data(self):
         self._current_file_info = None
         self._current_analysis = None
+        self._sheet_results.clear()
+        if self.file_watcher is not None:
+            self.file_watcher.stop()
+        self.file_selector.set_sheets([], "")
+        self.filter_edit.clear()
+        self.export_btn.setEnabled(False)
+        self._start_indexing()
         self.data_table.clear()
+        self._pivot_engine = None
+        self.pivot_panel.clear()
         self.analysis_panel._clear()
\ No newline at end of file
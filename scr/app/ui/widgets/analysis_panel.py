@@ -1,9 +1,12 @@
+from typing import Optional
+
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel,
     QTableWidget, QTableWidgetItem, QGroupBox
 )
 from PyQt5.QtCore import Qt
-from ...core.dataclasses import AnalysisResult, ColumnType
+from ...core.dataclasses import AnalysisResult, ColumnStatistics, ColumnType
+from ...core.instrumentation import INSTRUMENTATION
 
 
 class AnalysisPanel(QWidget):
@@ -22,9 +25,9 @@ class AnalysisPanel(QWidget):
         self.summary_label.setStyleSheet("font-weight: bold; padding: 5px;")
         layout.addWidget(self.summary_label)
         self.analysis_table = QTableWidget()
-        self.analysis_table.setColumnCount(5)
+        self.analysis_table.setColumnCount(8)
         self.analysis_table.setHorizontalHeaderLabels([
-            "Столбец", "Тип", "Пустых", "Min", "Mean"
+            "Столбец", "Тип", "Пустых", "Min", "Mean", "Median", "Std", "Уник."
         ])
         self.analysis_table.horizontalHeader().setStretchLastSection(True)
         self.analysis_table.verticalHeader().setVisible(False)
@@ -34,41 +37,92 @@ class AnalysisPanel(QWidget):
 
         self.setLayout(layout)
 
-    def update_analysis(self, analysis_result: AnalysisResult):
+    def update_analysis(self, analysis_result: AnalysisResult,
+                        previous: Optional[AnalysisResult] = None):
+        """
+        Показывает результат анализа
+
+        Args:
+            analysis_result: Результат анализа
+            previous: Показанный сейчас результат; если задан, обновляются
+                только строки столбцов, статистика которых изменилась
+        """
+        with INSTRUMENTATION.span("panel.update", columns=len(analysis_result.statistic)):
+            if (previous is not None
+                    and len(previous.statistic) == len(analysis_result.statistic)
+                    and self.analysis_table.rowCount() == len(previous.statistic)):
+                self._set_summary(analysis_result)
+                for i, (stat, old) in enumerate(zip(analysis_result.statistic,
+                                                    previous.statistic)):
+                    if stat is not old:
+                        self._set_row(i, stat)
+            else:
+                self._fill(analysis_result)
+
+    def _fill(self, analysis_result: AnalysisResult):
+        self._set_summary(analysis_result)
+        stats = analysis_result.statistic
+        self.analysis_table.setRowCount(len(stats))
+
+        for i, stat in enumerate(stats):
+            self._set_row(i, stat)
+        self.analysis_table.resizeColumnsToContents()
+
+    def _set_summary(self, analysis_result: AnalysisResult):
         summary = f"{analysis_result.file_name}\n"
         summary += f"Строк: {analysis_result.data_rows_count}, "
         summary += f"Столбцов: {analysis_result.count_column}"
 
         if analysis_result.has_headers:
             summary += " (с заголовками)"
+        if analysis_result.provisional:
+            summary += f"\nПредварительно: по первым {analysis_result.data_rows_count} строкам"
 
         self.summary_label.setText(summary)
-        stats = analysis_result.statistic
-        self.analysis_table.setRowCount(len(stats))
 
-        for i, stat in enumerate(stats):
-            name_item = QTableWidgetItem(stat.name[:20] + ("..." if len(stat.name) > 20 else ""))
-            name_item.setToolTip(stat.name)
-            self.analysis_table.setItem(i, 0, name_item)
-            type_item = QTableWidgetItem(stat.column_type.value)
-            self.analysis_table.setItem(i, 1, type_item)
-            empty_item = QTableWidgetItem(str(stat.empty_count))
-            if stat.empty_count > 0:
-                empty_item.setForeground(Qt.red)
-            self.analysis_table.setItem(i, 2, empty_item)
-            if stat.column_type in [ColumnType.INTEGER, ColumnType.FLOAT]:
-                min_item = QTableWidgetItem(
-                    f"{stat.min_value:.2f}" if stat.min_value is not None else "-"
-                )
-                self.analysis_table.setItem(i, 3, min_item)
-                mean_item = QTableWidgetItem(
-                    f"{stat.mean_value:.2f}" if stat.mean_value is not None else "-"
+    def _set_row(self, i: int, stat: ColumnStatistics):
+        name_item = QTableWidgetItem(stat.name[:20] + ("..." if len(stat.name) > 20 else ""))
+        name_item.setToolTip(stat.name)
+        self.analysis_table.setItem(i, 0, name_item)
+        type_item = QTableWidgetItem(stat.column_type.value)
+        self.analysis_table.setItem(i, 1, type_item)
+        empty_item = QTableWidgetItem(str(stat.empty_count))
+        if stat.empty_count > 0:
+            empty_item.setForeground(Qt.red)
+        self.analysis_table.setItem(i, 2, empty_item)
+        if stat.column_type in [ColumnType.INTEGER, ColumnType.FLOAT]:
+            numbers = [stat.min_value, stat.mean_value, stat.median_value, stat.std_value]
+            for col, value in enumerate(numbers, 3):
+                self.analysis_table.setItem(
+                    i, col, QTableWidgetItem(f"{value:.2f}" if value is not None else "-")
                 )
-                self.analysis_table.setItem(i, 4, mean_item)
-            else:
-                for col in [3, 4]:
-                    self.analysis_table.setItem(i, col, QTableWidgetItem("-"))
-        self.analysis_table.resizeColumnsToContents()
+        else:
+            for col in [3, 4, 5, 6]:
+                self.analysis_table.setItem(i, col, QTableWidgetItem("-"))
+        distinct_item = QTableWidgetItem(self._distinct_text(stat))
+        distinct_item.setToolTip(self._details(stat))
+        self.analysis_table.setItem(i, 7, distinct_item)
+
+    @staticmethod
+    def _distinct_text(stat: ColumnStatistics) -> str:
+        if stat.distinct_count is None:
+            return "-"
+        # Оценка по HyperLogLog помечается как приблизительная
+        return str(stat.distinct_count) if stat.exact else f"≈{stat.distinct_count}"
+
+    @staticmethod
+    def _details(stat: ColumnStatistics) -> str:
+        """Подсказка: квантили и частые значения столбца"""
+        lines = []
+        if stat.median_value is not None:
+            lines.append(f"Медиана: {stat.median_value:.2f}, p90: {stat.p90_value:.2f}, "
+                         f"p99: {stat.p99_value:.2f}")
+        if stat.top_values:
+            lines.append("Частые значения:")
+            lines.extend(f"  {str(value)[:40]} - {count}" for value, count in stat.top_values)
+        if not stat.exact:
+            lines.append("Значения приблизительные: потоковые оценки, а не точный подсчет")
+        return "\n".join(lines)
 
     def _clear(self):
         self.summary_label.setText("Выберите файл")
@@ -1,52 +1,561 @@
-from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView
-from PyQt5.QtCore import Qt
-from ...core.dataclasses import ExcelFileInfo
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
 
+from PyQt5.QtCore import (
+    Qt, QAbstractProxyModel, QAbstractTableModel, QModelIndex, QVariant, pyqtSlot
+)
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from ...core.dataclasses import ExcelFileInfo, RowFilter, SheetChanges, SheetInfo
+from ...core.instrumentation import INSTRUMENTATION
 
-class DataTable(QTableWidget):
+if TYPE_CHECKING:
+    # Индекс строк использует NumPy; импортируется при первой сортировке
+    from ...modules.row_index import RowIndex
+
+
+class DataTableModel(QAbstractTableModel):
+    """Модель данных таблицы: ячейки форматируются только при отрисовке"""
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._current_file_info = None
+        self._headers: List[str] = []
+        self._rows: Sequence[Sequence[Any]] = []
+        # Чтение ячейки без сборки строки, если хранилище это умеет (RowsView)
+        self._cell = None
+
+    def set_data(self, headers: List[str], rows: Sequence[Sequence[Any]]):
+        """
+        Подменяет данные модели без копирования строк
+
+        Args:
+            headers: Заголовки столбцов
+            rows: Строки данных
+        """
+        self.beginResetModel()
+        self._headers = headers
+        self._set_rows(rows)
+        self.endResetModel()
+
+    def update_data(self, headers: List[str], rows: Sequence[Sequence[Any]],
+                    changed_rows: List[int]):
+        """
+        Подменяет данные, сообщая представлению только об изменениях
+
+        Дописанные или удаленные в конце строки передаются как вставка или
+        удаление, измененные строки - как dataChanged, без сброса модели.
+
+        Args:
+            headers: Заголовки столбцов
+            rows: Новые строки данных
+            changed_rows: Номера измененных строк среди прежних
+        """
+        if len(headers) != len(self._headers):
+            self.set_data(headers, rows)
+            return
+
+        old_count, new_count = len(self._rows), len(rows)
+        if new_count > old_count:
+            self.beginInsertRows(QModelIndex(), old_count, new_count - 1)
+            self._set_rows(rows)
+            self.endInsertRows()
+        elif new_count < old_count:
+            self.beginRemoveRows(QModelIndex(), new_count, old_count - 1)
+            self._set_rows(rows)
+            self.endRemoveRows()
+        else:
+            self._set_rows(rows)
+
+        if headers != self._headers:
+            self._headers = headers
+            self.headerDataChanged.emit(Qt.Horizontal, 0, len(headers) - 1)
+
+        last_column = max(len(headers) - 1, 0)
+        for first, last in _row_ranges(changed_rows, new_count):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, last_column))
+
+    def append_rows(self, rows: List[List[Any]]):
+        """
+        Дописывает строки в конец, не сбрасывая модель (постепенная загрузка)
+
+        Строки модели должны быть списком, заданным через set_data.
+
+        Args:
+            rows: Новые строки
+        """
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def _set_rows(self, rows: Sequence[Sequence[Any]]):
+        self._rows = rows
+        self._cell = getattr(rows, "cell", None)
+
+    def clear(self):
+        self.set_data([], [])
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._headers)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return QVariant()
+        column = index.column()
+        if self._cell is not None:
+            return self.format_value(self._cell(index.row(), column))
+        row = self._rows[index.row()]
+        if column >= len(row):
+            return ""
+        return self.format_value(row[column])
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            if section < len(self._headers):
+                return self._headers[section]
+            return QVariant()
+        return str(section + 1)
+
+    def flags(self, index: QModelIndex):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    @staticmethod
+    def format_value(value: Any) -> str:
+        """
+        Форматирует значение ячейки для отображения
+
+        Args:
+            value: Значение ячейки
+
+        Returns:
+            str: Текст ячейки
+        """
+        if value is None or value == "":
+            return ""
+        return str(value)
+
+
+class RowMapProxyModel(QAbstractProxyModel):
+    """
+    Показывает строки модели в порядке карты: строка представления -> строка модели
+
+    Карта (массив номеров строк) задается извне, например после сортировки
+    или фильтра; без карты строки показываются как есть, и изменения
+    модели передаются представлению без сброса.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = None
+        self._inverse = None
+
+    @property
+    def rows(self):
+        """Текущая карта строк или None"""
+        return self._rows
+
+    def setSourceModel(self, model: QAbstractTableModel):
+        super().setSourceModel(model)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self.endResetModel)
+        model.rowsAboutToBeInserted.connect(self._on_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self._on_rows_removed)
+        model.dataChanged.connect(self._on_data_changed)
+        model.headerDataChanged.connect(self.headerDataChanged)
+
+    def set_rows(self, rows):
+        """
+        Задает карту строк
+
+        Args:
+            rows: Номера строк модели в порядке показа или None
+        """
+        self.beginResetModel()
+        self._rows = rows
+        self._inverse = None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        if self._rows is None:
+            return self.sourceModel().rowCount()
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row: int, column: int, parent=QModelIndex()) -> QModelIndex:
+        if parent.isValid() or not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()) -> QModelIndex:
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row()
+        if self._rows is not None:
+            row = int(self._rows[row])
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            row = self._inverse_rows().get(row)
+            if row is None:
+                return QModelIndex()
+        return self.index(row, source_index.column())
+
+    def _inverse_rows(self):
+        # Нужна только для выделения и прокрутки к строке, строится по требованию
+        if self._inverse is None:
+            self._inverse = {int(row): i for i, row in enumerate(self._rows)}
+        return self._inverse
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Vertical and role == Qt.DisplayRole and self._rows is not None:
+            # Номер строки в листе, а не в отсортированном представлении
+            return str(int(self._rows[section]) + 1)
+        return self.sourceModel().headerData(section, orientation, role)
+
+    # Изменения модели передаются как есть только без карты строк: с картой
+    # владелец пересчитывает ее и задает заново (set_rows)
+
+    @pyqtSlot(QModelIndex, int, int)
+    def _on_rows_about_to_be_inserted(self, parent: QModelIndex, first: int, last: int):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    @pyqtSlot(QModelIndex, int, int)
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        if self._rows is None:
+            self.endInsertRows()
+
+    @pyqtSlot(QModelIndex, int, int)
+    def _on_rows_about_to_be_removed(self, parent: QModelIndex, first: int, last: int):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+
+    @pyqtSlot(QModelIndex, int, int)
+    def _on_rows_removed(self, parent: QModelIndex, first: int, last: int):
+        if self._rows is None:
+            self.endRemoveRows()
+
+    def _on_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles=()):
+        if self._rows is None:
+            self.dataChanged.emit(self.index(top_left.row(), top_left.column()),
+                                  self.index(bottom_right.row(), bottom_right.column()))
+
+
+class DataTable(QTableView):
+
+    # Сколько строк просматривается при подборе ширины столбцов
+    SIZE_SAMPLE_ROWS = 100
+    MAX_COLUMN_WIDTH = 400
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._current_file_info: Optional[ExcelFileInfo] = None
+        self._model = DataTableModel(self)
+        self._proxy = RowMapProxyModel(self)
+        self._proxy.setSourceModel(self._model)
+        self.setModel(self._proxy)
+        # Сортировка и фильтры показываемых строк
+        self._row_index: Optional["RowIndex"] = None
+        self._sort_column: Optional[int] = None
+        self._descending = False
+        self._filters: List[RowFilter] = []
+        # Показываются строки, которые загрузчик еще дочитывает (start_preview)
+        self._previewing = False
         self._setup_ui()
 
     def _setup_ui(self):
         self.setAlternatingRowColors(True)
-        self.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.verticalHeader().setVisible(False)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self._on_header_clicked)
+        vertical_header = self.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(self.fontMetrics().height() + 6)
+
+    def start_preview(self, sheet_info: SheetInfo):
+        """
+        Показывает заголовки листа, пока он загружается
+
+        Строки дописываются append_preview; load_data по окончании загрузки
+        подменяет их полным листом без сброса прокрутки. Сортировка до
+        этого отключена.
+
+        Args:
+            sheet_info: Метаданные листа (headers пусты, если заголовков нет)
+        """
+        self.clear()
+        self._previewing = True
+        headers = column_headers(sheet_info.headers, sheet_info.count_column)
+        self.horizontalHeader().setSectionsClickable(False)
+        self._model.set_data(headers, [])
+
+    def append_preview(self, rows: List[List[Any]]):
+        """
+        Дописывает прочитанные строки во время загрузки
+
+        Args:
+            rows: Очередные строки данных
+        """
+        if not self._previewing:
+            return
+        first_rows = not self._model.rowCount()
+        with INSTRUMENTATION.span("table.preview", rows=len(rows)):
+            self._model.append_rows(rows)
+            if first_rows:
+                self._resize_columns_from_sample(self.headers, rows)
 
     def load_data(self, file_info: ExcelFileInfo, has_headers: bool = True):
+        data_rows = file_info.data
+        headers = self._headers(file_info, has_headers)
+        column_count = len(headers)
+
+        if (self._previewing and headers == self.headers
+                and len(data_rows) >= self._model.rowCount()):
+            # Загруженный лист продолжает показанные строки: дочитанные
+            # дописываются, прокрутка и ширина столбцов сохраняются
+            self._previewing = False
+            self.horizontalHeader().setSectionsClickable(True)
+            self._current_file_info = file_info
+            with INSTRUMENTATION.span("table.load", rows=len(data_rows), columns=column_count):
+                self._model.update_data(headers, data_rows, [])
+            return self._model.rowCount(), self._model.columnCount()
+
         self.clear()
         self._current_file_info = file_info
 
-        if has_headers:
-            data_rows = file_info.data
-            headers = file_info.headers
+        with INSTRUMENTATION.span("table.load", rows=len(data_rows), columns=column_count):
+            self._model.set_data(headers, data_rows)
+            self._resize_columns_from_sample(headers, data_rows)
+
+        return self._model.rowCount(), self._model.columnCount()
+
+    def update_data(self, file_info: ExcelFileInfo, changes: SheetChanges):
+        """
+        Показывает новое чтение того же листа, обновляя только изменившиеся строки
+
+        Args:
+            file_info: Новое чтение листа
+            changes: Отличия от показанного чтения
+        """
+        self._current_file_info = file_info
+        offset = file_info.data_offset
+        headers = self._headers(file_info, file_info.has_headers)
+        changed_rows = [row - offset for row in changes.changed_rows if row >= offset]
+
+        with INSTRUMENTATION.span("table.update", rows=len(changed_rows) + changes.appended):
+            self._model.update_data(headers, file_info.data, changed_rows)
+            if self._row_index is not None:
+                self._row_index = self._row_index.updated(file_info, changes)
+            if self._proxy.rows is not None:
+                self._apply_view()
+
+        return self._model.rowCount(), self._model.columnCount()
+
+    @property
+    def headers(self) -> List[str]:
+        """Заголовки показанных столбцов"""
+        return [self._model.headerData(i, Qt.Horizontal)
+                for i in range(self._model.columnCount())]
+
+    @property
+    def visible_row_count(self) -> int:
+        """Строк после фильтра"""
+        return self._proxy.rowCount()
+
+    @property
+    def shown_rows(self):
+        """Номера показанных строк в порядке показа или None, если показаны все"""
+        return self._proxy.rows
+
+    @property
+    def row_index(self) -> Optional["RowIndex"]:
+        """
+        Колоночные данные показанного листа (строятся при первом обращении)
+
+        Общие для сортировки, фильтра и сводной таблицы; None, если лист не загружен.
+        """
+        if self._row_index is None and self._current_file_info is not None:
+            from ...modules.row_index import RowIndex
+            self._row_index = RowIndex(self._current_file_info)
+        return self._row_index
+
+    def select_cell(self, row: int, column: int) -> bool:
+        """
+        Выделяет ячейку и прокручивает к ней
+
+        Args:
+            row: Номер строки в данных листа
+            column: Номер столбца
+
+        Returns:
+            bool: Ячейка показана (строка не скрыта фильтром)
+        """
+        index = self._proxy.mapFromSource(self._model.index(row, column))
+        if not index.isValid():
+            return False
+        self.setCurrentIndex(index)
+        self.scrollTo(index, QAbstractItemView.PositionAtCenter)
+        return True
+
+    def sort_by(self, column: Optional[int], descending: bool = False):
+        """
+        Сортирует строки по столбцу
+
+        Перестановка строится по типизированным значениям столбца при
+        первой сортировке по нему и кэшируется.
+
+        Args:
+            column: Номер столбца или None для исходного порядка
+            descending: По убыванию
+        """
+        self._sort_column = column
+        self._descending = descending
+        header = self.horizontalHeader()
+        header.setSortIndicatorShown(column is not None)
+        if column is not None:
+            header.setSortIndicator(column, Qt.DescendingOrder if descending else Qt.AscendingOrder)
+        with INSTRUMENTATION.span("table.sort", rows=self._model.rowCount()):
+            self._apply_view()
+
+    def set_filter(self, text: str) -> int:
+        """
+        Оставляет строки, удовлетворяющие условиям фильтра
+
+        Args:
+            text: Условия вида «сумма > 1000; регион == Москва» (см. parse_filters)
+
+        Returns:
+            int: Строк после фильтра
+
+        Raises:
+            FilterError: Условие не разобрано или не подходит к столбцу
+        """
+        from ...modules.row_index import parse_filters
+
+        filters = parse_filters(text, self.headers)
+        previous = self._filters
+        self._filters = filters
+        try:
+            with INSTRUMENTATION.span("table.filter", rows=self._model.rowCount()):
+                self._apply_view()
+        except Exception:
+            self._filters = previous
+            raise
+        return self.visible_row_count
+
+    @pyqtSlot(int)
+    def _on_header_clicked(self, column: int):
+        # По возрастанию -> по убыванию -> исходный порядок
+        if column != self._sort_column:
+            self.sort_by(column)
+        elif not self._descending:
+            self.sort_by(column, descending=True)
         else:
-            data_rows = file_info.data
-            headers = []
-        self.setRowCount(len(data_rows))
-        self.setColumnCount(len(headers) if headers else
-                            (max(len(row) for row in data_rows) if data_rows else 0))
-        if headers:
-            self.setHorizontalHeaderLabels(headers)
+            self.sort_by(None)
+
+    def _apply_view(self):
+        """Пересчитывает карту строк по текущей сортировке и фильтрам"""
+        if self._current_file_info is None:
+            return
+        if self._sort_column is None and not self._filters:
+            rows = None
         else:
-            self.setHorizontalHeaderLabels(
-                [f"Col {i+1}" for i in range(self.columnCount())]
-            )
-        for row_idx, row_data in enumerate(data_rows):
-            for col_idx, cell_value in enumerate(row_data):
-                if col_idx < self.columnCount():
-                    item = QTableWidgetItem(str(cell_value) if cell_value else "")
-                    item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                    self.setItem(row_idx, col_idx, item)
-        self.resizeColumnsToContents()
-
-        return self.rowCount(), self.columnCount()
+            rows = self.row_index.view_rows(self._sort_column, self._descending, self._filters)
+        self._proxy.set_rows(rows)
+
+    def _reset_view(self):
+        """Сбрасывает сортировку, фильтры и индекс строк"""
+        self._row_index = None
+        self._sort_column = None
+        self._descending = False
+        self._filters = []
+        self.horizontalHeader().setSortIndicatorShown(False)
+        if self._proxy.rows is not None:
+            self._proxy.set_rows(None)
+
+    def _headers(self, file_info: ExcelFileInfo, has_headers: bool) -> List[str]:
+        """Заголовки столбцов таблицы; недостающие - Col N"""
+        data_rows = file_info.data
+        headers = list(file_info.headers) if has_headers else []
+        column_count = len(headers) if headers else file_info.count_column
+        if not column_count and data_rows:
+            column_count = max(len(row) for row in data_rows[:self.SIZE_SAMPLE_ROWS])
+        return column_headers(headers, column_count)
+
+    def _resize_columns_from_sample(self, headers: List[str], rows: Sequence[Sequence[Any]]):
+        """
+        Подбирает ширину столбцов по заголовкам и первым строкам
+
+        Args:
+            headers: Заголовки столбцов
+            rows: Строки данных
+        """
+        metrics = self.fontMetrics()
+        padding = 2 * metrics.horizontalAdvance("M")
+        sample = rows[:self.SIZE_SAMPLE_ROWS]
+        header = self.horizontalHeader()
+
+        for col_idx, title in enumerate(headers):
+            width = metrics.horizontalAdvance(title)
+            for row in sample:
+                if col_idx < len(row):
+                    text = DataTableModel.format_value(row[col_idx])
+                    width = max(width, metrics.horizontalAdvance(text))
+            header.resizeSection(col_idx, min(width + padding, self.MAX_COLUMN_WIDTH))
 
     def clear(self):
         """Очистка таблицы"""
-        self.setRowCount(0)
-        self.setColumnCount(0)
-        self._current_file_info = None
\ No newline at end of file
+        self._previewing = False
+        self.horizontalHeader().setSectionsClickable(True)
+        self._reset_view()
+        self._model.clear()
+        self._current_file_info = None
+
+
+def column_headers(headers: List[Any], column_count: int) -> List[str]:
+    """Заголовки column_count столбцов; недостающие - Col N"""
+    headers = list(headers)
+    if len(headers) < column_count:
+        headers.extend(f"Col {i+1}" for i in range(len(headers), column_count))
+    return [str(header) for header in headers[:column_count]]
+
+
+def _row_ranges(rows: List[int], row_count: int) -> List[Tuple[int, int]]:
+    """Сводит отсортированные номера строк в непрерывные диапазоны"""
+    ranges: List[Tuple[int, int]] = []
+    for row in rows:
+        if row >= row_count:
+            break
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
@@ -1,7 +1,9 @@
+from typing import List
+
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import (
     QWidget, QHBoxLayout, QPushButton,
-    QCheckBox, QFileDialog
+    QCheckBox, QFileDialog, QComboBox, QLabel
 )
 
 from ...core.constants import CONFIG
@@ -11,6 +13,7 @@ class FileSelector(QWidget):
 
     file_selected = pyqtSignal(str, bool)
     headers_changed = pyqtSignal(bool)
+    sheet_changed = pyqtSignal(str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -25,7 +28,13 @@ class FileSelector(QWidget):
         self.select_btn.setFixedWidth(140)
         self.headers_checkbox = QCheckBox("Заголовки в первой строке")
         self.headers_checkbox.setChecked(CONFIG.has_headers)
+        self.sheet_label = QLabel("Лист:")
+        self.sheet_combo = QComboBox()
+        self.sheet_combo.setMinimumWidth(160)
+        self.sheet_combo.setEnabled(False)
         layout.addWidget(self.select_btn)
+        layout.addWidget(self.sheet_label)
+        layout.addWidget(self.sheet_combo)
         layout.addStretch(1)
         layout.addWidget(self.headers_checkbox)
         self.setLayout(layout)
@@ -33,22 +42,34 @@ class FileSelector(QWidget):
     def _connect_signals(self):
         self.select_btn.clicked.connect(self._select_file)
         self.headers_checkbox.toggled.connect(self.headers_changed)
+        self.sheet_combo.activated[str].connect(self.sheet_changed)
 
     def _select_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Выберите Excel файл",
             "",
-            "Excel файлы (*.xlsx *.xls)"
+            f"Таблицы ({' '.join(CONFIG.excel_ext)});;Все файлы (*)"
         )
 
         if file_path:
+            self._current_file = file_path
             self.file_selected.emit(file_path,
                                     self.headers_checkbox.isChecked())
 
+    def set_sheets(self, sheet_names: List[str], current: str):
+        """Заполняет список листов без отправки sheet_changed"""
+        self.sheet_combo.blockSignals(True)
+        self.sheet_combo.clear()
+        self.sheet_combo.addItems(sheet_names)
+        self.sheet_combo.setCurrentText(current)
+        self.sheet_combo.blockSignals(False)
+        self.sheet_combo.setEnabled(len(sheet_names) > 1)
+
     def set_enabled(self, enabled: bool):
         self.select_btn.setEnabled(enabled)
         self.headers_checkbox.setEnabled(enabled)
+        self.sheet_combo.setEnabled(enabled and self.sheet_combo.count() > 1)
 
     def get_current_file(self):
         return self._current_file
\ No newline at end of file
@@ -0,0 +1,198 @@
+from typing import Any, List, Optional
+
+from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
+    QListWidget, QListWidgetItem, QTableView, QAbstractItemView
+)
+
+from .data_table import DataTableModel
+from ...core.dataclasses import PivotAggregate, PivotKey, PivotResult
+
+# Повторяют AGGREGATES и PERIODS из modules/pivot.py: модуль с NumPy
+# не импортируется до первого построения
+FUNCTIONS = [
+    ("sum", "Сумма"),
+    ("count", "Количество"),
+    ("mean", "Среднее"),
+    ("min", "Минимум"),
+    ("max", "Максимум"),
+    ("distinct", "Уникальных"),
+]
+PERIODS = [
+    (None, "как есть"),
+    ("day", "по дням"),
+    ("month", "по месяцам"),
+    ("quarter", "по кварталам"),
+    ("year", "по годам"),
+]
+
+HINT = "Отметьте столбцы группировки и добавьте агрегаты"
+
+
+class PivotModel(DataTableModel):
+    """Строки сводной таблицы: пустой ключ подписан, дробные округлены"""
+
+    @staticmethod
+    def format_value(value: Any) -> str:
+        if value is None:
+            return "(пусто)"
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        return DataTableModel.format_value(value)
+
+
+class PivotPanel(QWidget):
+    """
+    Сводная таблица: группировка по столбцам и агрегаты
+
+    Панель только собирает параметры и показывает результат; строит
+    сводную главное окно (build_requested -> show_result).
+    """
+
+    # Ключи группировки (List[PivotKey]) и агрегаты (List[PivotAggregate])
+    build_requested = pyqtSignal(list, list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._headers: List[str] = []
+        self._setup_ui()
+        self.clear()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setSpacing(5)
+        layout.setContentsMargins(2, 2, 2, 2)
+
+        layout.addWidget(QLabel("Группировать по:"))
+        self.keys_list = QListWidget()
+        self.keys_list.setMaximumHeight(110)
+        layout.addWidget(self.keys_list)
+        period_row = QHBoxLayout()
+        period_row.addWidget(QLabel("Даты:"))
+        self.period_combo = QComboBox()
+        for period, title in PERIODS:
+            self.period_combo.addItem(title, period)
+        period_row.addWidget(self.period_combo, 1)
+        layout.addLayout(period_row)
+
+        aggregate_row = QHBoxLayout()
+        self.function_combo = QComboBox()
+        for function, title in FUNCTIONS:
+            self.function_combo.addItem(title, function)
+        self.column_combo = QComboBox()
+        self.add_btn = QPushButton("+")
+        self.add_btn.setFixedWidth(30)
+        self.add_btn.setToolTip("Добавить агрегат")
+        aggregate_row.addWidget(self.function_combo)
+        aggregate_row.addWidget(self.column_combo, 1)
+        aggregate_row.addWidget(self.add_btn)
+        layout.addLayout(aggregate_row)
+        self.aggregates_list = QListWidget()
+        self.aggregates_list.setMaximumHeight(80)
+        self.aggregates_list.setToolTip("Двойной щелчок - убрать агрегат")
+        layout.addWidget(self.aggregates_list)
+
+        self.build_btn = QPushButton("Построить")
+        layout.addWidget(self.build_btn)
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self._model = PivotModel(self)
+        self.result_table = QTableView()
+        self.result_table.setModel(self._model)
+        self.result_table.setAlternatingRowColors(True)
+        self.result_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.result_table.verticalHeader().setVisible(False)
+        self.result_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.result_table, 1)
+        self.setLayout(layout)
+
+        self.add_btn.clicked.connect(self._on_add_clicked)
+        self.aggregates_list.itemDoubleClicked.connect(self._on_aggregate_double_clicked)
+        self.build_btn.clicked.connect(self._on_build_clicked)
+
+    def set_columns(self, headers: List[str]):
+        """
+        Столбцы листа для выбора; прежний результат убирается, а выбор
+        сохраняется, если столбцы те же
+
+        Args:
+            headers: Заголовки столбцов таблицы
+        """
+        if headers == self._headers:
+            self._model.clear()
+            self.summary_label.setText(HINT)
+            return
+        self.clear()
+        self._headers = list(headers)
+        for i, header in enumerate(self._headers):
+            item = QListWidgetItem(header)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            item.setData(Qt.UserRole, i)
+            self.keys_list.addItem(item)
+            self.column_combo.addItem(header, i)
+        self.setEnabled(bool(self._headers))
+
+    @property
+    def has_result(self) -> bool:
+        return self._model.rowCount() > 0
+
+    def keys(self) -> List[PivotKey]:
+        """Отмеченные столбцы группировки в порядке столбцов листа"""
+        period = self.period_combo.currentData()
+        keys = []
+        for row in range(self.keys_list.count()):
+            item = self.keys_list.item(row)
+            if item.checkState() == Qt.Checked:
+                keys.append(PivotKey(item.data(Qt.UserRole), item.text(), period))
+        return keys
+
+    def aggregates(self) -> List[PivotAggregate]:
+        return [self.aggregates_list.item(row).data(Qt.UserRole)
+                for row in range(self.aggregates_list.count())]
+
+    def show_result(self, result: PivotResult, seconds: Optional[float] = None):
+        """
+        Показывает сводную таблицу
+
+        Args:
+            result: Результат построения
+            seconds: Время построения для подписи
+        """
+        self._model.set_data(result.headers, result.rows)
+        self.result_table.resizeColumnsToContents()
+        summary = f"Групп: {len(result.rows)}, строк листа: {result.source_rows}"
+        if seconds is not None:
+            summary += f", {seconds * 1000:.0f} мс"
+        self.summary_label.setText(summary)
+
+    def clear(self):
+        self._headers = []
+        self.keys_list.clear()
+        self.column_combo.clear()
+        self.aggregates_list.clear()
+        self._model.clear()
+        self.summary_label.setText(HINT)
+        self.setEnabled(False)
+
+    @pyqtSlot()
+    def _on_add_clicked(self):
+        column = self.column_combo.currentData()
+        if column is None:
+            return
+        aggregate = PivotAggregate(self.function_combo.currentData(), column,
+                                   self.column_combo.currentText())
+        item = QListWidgetItem(f"{self.function_combo.currentText()}: {aggregate.column_name}")
+        item.setData(Qt.UserRole, aggregate)
+        self.aggregates_list.addItem(item)
+
+    @pyqtSlot(QListWidgetItem)
+    def _on_aggregate_double_clicked(self, item: QListWidgetItem):
+        self.aggregates_list.takeItem(self.aggregates_list.row(item))
+
+    @pyqtSlot()
+    def _on_build_clicked(self):
+        self.build_requested.emit(self.keys(), self.aggregates())
@@ -0,0 +1,56 @@
+import threading
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from ...core.exceptions import ExportError, LoadCancelledError
+
+
+class ExportWorker(QObject):
+    """Пишет строки загруженного листа в файл вне потока интерфейса"""
+
+    # Записано строк
+    progress = pyqtSignal(int)
+    # Путь к файлу и число записанных строк
+    finished = pyqtSignal(str, int)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, path: str, headers: Optional[List[str]], rows: Sequence[List[Any]],
+                 order: Optional[Sequence[int]] = None):
+        super().__init__()
+        self._path = path
+        self._headers = headers
+        self._rows = rows
+        self._order = order
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Запрашивает остановку; безопасно вызывать из любого потока"""
+        self._cancel_event.set()
+
+    def _on_progress(self, rows_written: int):
+        if self._cancel_event.is_set():
+            raise LoadCancelledError("Экспорт отменен")
+        self.progress.emit(rows_written)
+
+    @pyqtSlot()
+    def run(self):
+        from ...modules.exporter import export_rows, iter_batches, sheet_column_kinds
+
+        try:
+            column_kinds = None
+            if Path(self._path).suffix.lower() == ".parquet":
+                column_kinds = sheet_column_kinds(self._rows, len(self._headers or ()))
+            written = export_rows(self._path, self._headers,
+                                  iter_batches(self._rows, self._order),
+                                  column_kinds, self._on_progress)
+        except LoadCancelledError:
+            self.cancelled.emit()
+        except ExportError as e:
+            self.failed.emit(str(e))
+        except Exception as e:
+            self.failed.emit(f"Ошибка: {str(e)}")
+        else:
+            self.finished.emit(self._path, written)
@@ -0,0 +1,110 @@
+import threading
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, List, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from ...core.constants import CONFIG
+from ...core.dataclasses import ExcelFileInfo, SheetInfo
+from ...core.instrumentation import INSTRUMENTATION
+from ...core.exceptions import (
+    FileLoadError, FileFormatError,
+    FileError, EmptyFileError, AnalysisError, LoadCancelledError
+)
+
+if TYPE_CHECKING:
+    # Загрузчик и анализатор тянут openpyxl и NumPy; окну при запуске они не нужны
+    from ...modules.accumulators import ColumnAccumulator
+    from ...modules.data_analyzer import DataAnalyzer
+    from ...modules.excel_loader import ExcelLoader
+
+
+class FileLoadWorker(QObject):
+    """
+    Загружает и анализирует файл вне потока интерфейса
+
+    В постепенном режиме (loader.progressive) строки отдаются сигналом
+    rows_read по мере чтения, а по первым analysis.provisional_rows
+    строкам считается предварительная статистика (provisional).
+    """
+
+    progress = pyqtSignal(int)
+    # Метаданные листа и очередные строки данных
+    rows_read = pyqtSignal(object, list)
+    # Статистика по прочитанным строкам (AnalysisResult.provisional)
+    provisional = pyqtSignal(object)
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    # Отдавать строки и предварительную статистику по мере чтения
+    # (при включенном loader.progressive)
+    PROGRESSIVE = True
+
+    def __init__(self, loader: "ExcelLoader", analyzer: "DataAnalyzer",
+                 file_path: str, has_headers: bool, sheet_name: Optional[str] = None):
+        super().__init__()
+        self._loader = loader
+        self._analyzer = analyzer
+        self._file_path = file_path
+        self._has_headers = has_headers
+        self._sheet_name = sheet_name
+        self._cancel_event = threading.Event()
+        self._accumulators: Optional[List["ColumnAccumulator"]] = None
+
+    def cancel(self):
+        """Запрашивает остановку; безопасно вызывать из любого потока"""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def _on_progress(self, rows_read: int):
+        if self._cancel_event.is_set():
+            raise LoadCancelledError("Загрузка отменена")
+        self.progress.emit(rows_read)
+
+    def _on_rows(self, sheet_info: SheetInfo, rows: List[List[Any]]):
+        if self._cancel_event.is_set():
+            raise LoadCancelledError("Загрузка отменена")
+        self.rows_read.emit(sheet_info, rows)
+
+        analyzed = self._accumulators[0].count if self._accumulators else 0
+        rows = rows[:max(0, CONFIG.provisional_rows - analyzed)]
+        if rows:
+            with INSTRUMENTATION.span("analysis.provisional", rows=len(rows)):
+                self._accumulators = self._analyzer.accumulate(
+                    [rows], sheet_info.count_column, self._accumulators
+                )
+                result = self._analyzer.stream_result(sheet_info, self._accumulators,
+                                                      self._has_headers)
+            self.provisional.emit(replace(result, provisional=True))
+
+    @pyqtSlot()
+    def run(self):
+        with INSTRUMENTATION.profile(CONFIG.profile_file):
+            self._run()
+
+    def _run(self):
+        try:
+            file_info = self._loader.load_file(
+                self._file_path, self._has_headers, self._on_progress, self._sheet_name,
+                self._on_rows if self.PROGRESSIVE and CONFIG.progressive else None
+            )
+            self._on_progress(file_info.count_row)
+            self._analyze(file_info)
+
+        except LoadCancelledError:
+            self.cancelled.emit()
+        except (FileFormatError, EmptyFileError, FileError,
+                FileLoadError, AnalysisError) as e:
+            self.failed.emit(str(e))
+        except Exception as e:
+            self.failed.emit(f"Ошибка: {str(e)}")
+
+    def _analyze(self, file_info: ExcelFileInfo):
+        """Анализирует загруженный лист и отправляет результат"""
+        analysis_result = self._analyzer.analyze(file_info, self._has_headers)
+        if self._cancel_event.is_set():
+            raise LoadCancelledError("Загрузка отменена")
+        self.finished.emit(file_info, analysis_result)
@@ -0,0 +1,48 @@
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import pyqtSignal
+
+from .file_load_worker import FileLoadWorker
+from ...core.dataclasses import AnalysisResult, ExcelFileInfo
+from ...core.exceptions import LoadCancelledError
+from ...core.instrumentation import INSTRUMENTATION
+from ...modules.sheet_diff import diff_sheets
+
+if TYPE_CHECKING:
+    from ...modules.data_analyzer import DataAnalyzer
+    from ...modules.excel_loader import ExcelLoader
+
+
+class FileRefreshWorker(FileLoadWorker):
+    """
+    Перечитывает измененный на диске лист вне потока интерфейса
+
+    Новое чтение сравнивается с предыдущим по хэшам блоков строк,
+    анализ пересчитывается только для затронутых столбцов.
+    """
+
+    # Новое чтение, анализ и отличия от предыдущего чтения (SheetChanges)
+    refreshed = pyqtSignal(object, object, object)
+
+    # Прежний лист остается на экране до конца чтения: строки по мере
+    # чтения и предварительная статистика не нужны
+    PROGRESSIVE = False
+
+    def __init__(self, loader: "ExcelLoader", analyzer: "DataAnalyzer",
+                 file_info: ExcelFileInfo, analysis_result: AnalysisResult):
+        super().__init__(loader, analyzer, file_info.file_path,
+                         file_info.has_headers, file_info.sheet_name)
+        self._previous_file = file_info
+        self._previous_analysis = analysis_result
+
+    def _analyze(self, file_info: ExcelFileInfo):
+        with INSTRUMENTATION.span("refresh.diff", rows=len(file_info.raw_rows)) as span:
+            changes = diff_sheets(self._previous_file, file_info)
+            span.count(changed_rows=len(changes.changed_cells), appended=changes.appended)
+
+        analysis_result = self._analyzer.update_analysis(
+            file_info, self._previous_analysis, changes
+        )
+        if self._cancel_event.is_set():
+            raise LoadCancelledError("Загрузка отменена")
+        self.refreshed.emit(file_info, analysis_result, changes)
@@ -0,0 +1,61 @@
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from ...core.dataclasses import ExcelFileInfo
+from ...core.exceptions import LoadCancelledError
+from ...core.instrumentation import INSTRUMENTATION
+
+
+class SearchIndexWorker(QObject):
+    """Строит индекс поиска по загруженному листу вне потока интерфейса"""
+
+    # Лист и индекс (SearchIndex) по его строкам
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_info: ExcelFileInfo, column_count: int):
+        super().__init__()
+        self._file_info = file_info
+        self._column_count = column_count
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Запрашивает остановку; безопасно вызывать из любого потока"""
+        self._cancel_event.set()
+
+    def _on_progress(self, _columns_done: int):
+        if self._cancel_event.is_set():
+            raise LoadCancelledError("Построение индекса отменено")
+
+    @pyqtSlot()
+    def run(self):
+        # Индекс и NumPy нужны только после загрузки файла
+        from ...modules.search_index import SearchIndex
+
+        file_info = self._file_info
+        column_count = self._column_count
+        # Индекс строится по всем строкам листа, включая первую: смена
+        # режима заголовков его не перестраивает. Столбцы, построенные
+        # анализатором, используются как есть, строки перед ними
+        # (заголовки) разбираются отдельно
+        table = file_info.columns
+        columns = None
+        columns_offset = 0
+        if table is not None and len(table.columns) >= column_count:
+            columns = table.columns[:column_count]
+            columns_offset = table.offset
+
+        try:
+            with INSTRUMENTATION.span("search.build", rows=len(file_info.raw_rows)) as span:
+                index = SearchIndex.build(file_info.raw_rows, column_count,
+                                          columns, self._on_progress,
+                                          columns_offset, file_info.data_offset)
+                span.count(tokens=len(index.tokens))
+        except LoadCancelledError:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(f"Ошибка: {str(e)}")
+        else:
+            self.finished.emit(file_info, index)
@@ -0,0 +1,296 @@
+"""
+Бенчмарки загрузки, анализа и заполнения таблицы
+
+Каждый сценарий выполняется в отдельном процессе, чтобы пик RSS
+относился только к нему. Главная метрика - время до первых строк
+(first_rows): от начала загрузки до передачи первых loader.first_rows
+строк для показа, как в постепенном режиме окна. Этапы замеряются
+отдельно: загрузка листа (ExcelLoader.load_file, без дискового кэша),
+анализ (DataAnalyzer.analyze), сводная таблица (PivotEngine по первому и
+третьему столбцам) и заполнение таблицы (DataTable.load_data и отрисовка
+первого экрана, Qt в режиме offscreen). Затем этапы повторяются под
+tracemalloc; для загрузки дополнительно сохраняется память, которую
+занимает прочитанный лист, в байтах на ячейку (retained_bytes_per_cell).
+
+    cd scr
+    python -m benchmarks.run -o results.json
+    python -m benchmarks.run --case large_numeric --scale 0.1
+    python -m benchmarks.run -o new.json --baseline results.json --threshold 0.2
+    python -m benchmarks.run --case categorical --no-compact
+
+Синтетические файлы создаются один раз в каталоге --data-dir. Для .xls
+сценария нужен пакет xlwt (requirements-dev.txt); без него сценарий
+пропускается с сообщением.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .workbooks import CASES, generate
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent / "data"
+
+# Этапы сценария в порядке выполнения; first_rows - часть загрузки
+STAGES = ["first_rows", "load", "analysis", "pivot", "table"]
+
+# Сколько строк первого экрана таблицы запрашивать у модели
+FIRST_SCREEN_ROWS = 50
+
+
+def run_case(file_path: str, repeat: int, with_table: bool,
+             with_tracemalloc: bool, compact: bool = True) -> Dict[str, Any]:
+    """
+    Выполняет сценарий в текущем процессе
+
+    Args:
+        file_path: Путь к файлу сценария
+        repeat: Число повторов; в отчет идет лучшее время
+        with_table: Замерять заполнение таблицы (нужен PyQt5)
+        with_tracemalloc: Повторить этапы под tracemalloc
+        compact: Хранить прочитанный лист по столбцам (CONFIG.compact_storage)
+
+    Returns:
+        Dict[str, Any]: Размеры листа, этапы и пик RSS
+    """
+    from app.core.constants import CONFIG
+
+    # Замеряется разбор файла, а не чтение из кэша
+    CONFIG.cache_enabled = False
+    CONFIG.compact_storage = compact
+
+    stages = _stages(file_path, with_table)
+    timings: Dict[str, List[float]] = {"first_rows": []}
+    timings.update((name, []) for name, _ in stages)
+    sizes: Tuple[int, int] = (0, 0)
+
+    for _ in range(repeat):
+        state: Dict[str, Any] = {}
+        for name, stage in stages:
+            started = time.perf_counter()
+            stage(state)
+            timings[name].append(time.perf_counter() - started)
+        # Лист короче first_rows строк показывается сразу целиком
+        timings["first_rows"].append(state.get("first_rows", timings["load"][-1]))
+        sizes = (state["file_info"].count_row, state["file_info"].count_column)
+
+    report = {
+        name: {"seconds": min(values), "tracemalloc_peak_bytes": None}
+        for name, values in timings.items()
+    }
+
+    if with_tracemalloc:
+        state = {}
+        tracemalloc.start()
+        try:
+            for name, stage in stages:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                stage(state)
+                current, peak = tracemalloc.get_traced_memory()
+                report[name]["tracemalloc_peak_bytes"] = peak
+                if name == "load":
+                    cells = max(1, sizes[0] * sizes[1])
+                    report[name]["retained_bytes_per_cell"] = (current - before) / cells
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "rows": sizes[0],
+        "columns": sizes[1],
+        "file_size_bytes": os.path.getsize(file_path),
+        "stages": report,
+        # На Linux ru_maxrss - в килобайтах
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def _stages(file_path: str, with_table: bool) -> List[Tuple[str, Callable[[dict], None]]]:
+    from app.modules.data_analyzer import DataAnalyzer
+    from app.core.dataclasses import PivotAggregate, PivotKey
+    from app.modules.excel_loader import ExcelLoader
+    from app.modules.pivot import PivotEngine
+    from app.modules.row_index import RowIndex
+
+    def load(state: dict):
+        started = time.perf_counter()
+
+        def on_rows(_sheet_info, _rows):
+            state.setdefault("first_rows", time.perf_counter() - started)
+
+        state["file_info"] = ExcelLoader().load_file(file_path, True, rows_callback=on_rows)
+
+    def analysis(state: dict):
+        state["result"] = DataAnalyzer().analyze(state["file_info"], True)
+
+    def pivot(state: dict):
+        # Столбцы берутся из анализа, как в окне после загрузки
+        file_info = state["file_info"]
+        names = state["result"].column_name
+        last = len(names) - 1
+        keys = [PivotKey(i, names[i]) for i in (0, 2) if i <= last]
+        aggregates = [PivotAggregate("count")]
+        aggregates += [PivotAggregate(function, last, names[last])
+                       for function in ("sum", "mean", "max")]
+        if last >= 1:
+            aggregates.append(PivotAggregate("distinct", 1, names[1]))
+        state["pivot"] = PivotEngine(RowIndex(file_info)).run(keys, aggregates)
+
+    stages = [("load", load), ("analysis", analysis), ("pivot", pivot)]
+    if not with_table:
+        return stages
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication
+    from app.ui.widgets.data_table import DataTable
+
+    app = QApplication.instance() or QApplication([])
+
+    def table(state: dict):
+        widget = DataTable()
+        widget.load_data(state["file_info"], True)
+        model = widget.model()
+        for row in range(min(FIRST_SCREEN_ROWS, model.rowCount())):
+            for column in range(model.columnCount()):
+                model.data(model.index(row, column), Qt.DisplayRole)
+        app.processEvents()
+        widget.deleteLater()
+
+    stages.append(("table", table))
+    return stages
+
+
+def has_qt() -> bool:
+    try:
+        import PyQt5.QtWidgets  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float) -> List[str]:
+    """
+    Сравнивает время этапов с сохраненным базовым отчетом
+
+    Args:
+        results: Текущий отчет
+        baseline: Базовый отчет
+        threshold: Допустимое замедление (0.2 - на 20%)
+
+    Returns:
+        List[str]: Описания регрессий
+    """
+    regressions = []
+    print(f"\n{'сценарий':<18} {'этап':<10} {'база, с':>10} {'сейчас, с':>10} {'изм.':>8}")
+
+    for name, case in results["cases"].items():
+        base_case = baseline.get("cases", {}).get(name)
+        if not base_case or "stages" not in case or "stages" not in base_case:
+            continue
+        for stage, measured in case["stages"].items():
+            base = base_case["stages"].get(stage)
+            if not base or not base["seconds"]:
+                continue
+            ratio = measured["seconds"] / base["seconds"]
+            mark = ""
+            if ratio > 1 + threshold:
+                mark = " !"
+                regressions.append(f"{name}/{stage}: x{ratio:.2f}")
+            print(f"{name:<18} {stage:<10} {base['seconds']:>10.3f} "
+                  f"{measured['seconds']:>10.3f} {ratio - 1:>+7.0%}{mark}")
+
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Бенчмарки python-excel")
+    parser.add_argument("--case", action="append", dest="cases", choices=sorted(CASES),
+                        help="Сценарий, можно несколько раз (по умолчанию все)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Множитель числа строк в сценариях")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Число повторов, берется лучшее время")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help="Каталог для синтетических файлов")
+    parser.add_argument("--output", "-o", type=Path, help="Файл отчета JSON")
+    parser.add_argument("--baseline", type=Path, help="Базовый отчет для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Допустимое замедление относительно базы")
+    parser.add_argument("--no-table", action="store_true",
+                        help="Не замерять заполнение таблицы")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Не замерять пики памяти tracemalloc")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="Хранить прочитанный лист строками, как до CompactRows")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    with_table = not args.no_table and has_qt()
+    context = multiprocessing.get_context("spawn")
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "compact_storage": not args.no_compact,
+        },
+        "cases": {},
+    }
+
+    for name in args.cases or list(CASES):
+        case = CASES[name]
+        missing = case.missing_writer()
+        try:
+            if missing is not None:
+                raise RuntimeError(f"нет пакета {missing}: pip install -r requirements-dev.txt")
+            file_path = generate(case, args.data_dir, args.scale)
+        except RuntimeError as e:
+            print(f"{name}: пропущен ({e})", file=sys.stderr)
+            results["cases"][name] = {"skipped": str(e)}
+            continue
+
+        with context.Pool(1) as pool:
+            report = pool.apply(run_case, (str(file_path), args.repeat, with_table,
+                                           not args.no_tracemalloc, not args.no_compact))
+        results["cases"][name] = report
+
+        timings = ", ".join(f"{stage} {values['seconds']:.3f} с"
+                            for stage, values in report["stages"].items())
+        per_cell = report["stages"]["load"].get("retained_bytes_per_cell")
+        memory = f", лист {per_cell:.1f} Б/ячейку" if per_cell is not None else ""
+        print(f"{name}: {report['rows']}x{report['columns']}, {timings}, "
+              f"RSS {report['peak_rss_bytes'] / 2 ** 20:.0f} МБ{memory}", file=sys.stderr)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2),
+                               encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nРегрессии: " + "; ".join(regressions), file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Генератор синтетических книг для бенчмарков
+
+Файлы детерминированы: одинаковые параметры дают одинаковое содержимое,
+поэтому результаты разных запусков и веток сравнимы.
+"""
+import importlib.util
+import random
+import shutil
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+SEED = 20240101
+
+REGIONS = ["North", "South", "East", "West", "Center"]
+STATUSES = ["new", "paid", "shipped", "returned"]
+MANAGERS = [f"Manager {i}" for i in range(40)]
+PRICES = [9.99, 19.99, 49.0, 99.0, 149.5, 249.0]
+EPOCH = datetime(2020, 1, 1)
+XLS_MAX_ROWS = 65536
+# Необязательные пакеты для записи файлов (requirements-dev.txt)
+WRITERS = {".xls": "xlwt"}
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """Описание синтетического листа"""
+    name: str
+    file_ext: str
+    rows: int
+    columns: int
+    # Строка данных по номеру строки, номеру столбца и генератору случайных чисел
+    cell: Callable[[int, int, random.Random], Any]
+    # Доля пустых ячеек
+    empty_ratio: float = 0.0
+    # Записать в <dimension> заведомо завышенный диапазон
+    bogus_dimension: bool = False
+
+    def file_name(self, scale: float) -> str:
+        return f"{self.name}_x{scale:g}{self.file_ext}"
+
+    def scaled_rows(self, scale: float) -> int:
+        return max(1, int(self.rows * scale))
+
+    def missing_writer(self) -> Optional[str]:
+        """Пакет для записи файла сценария, если он не установлен"""
+        package = WRITERS.get(self.file_ext)
+        if package is None or importlib.util.find_spec(package) is not None:
+            return None
+        return package
+
+
+def numeric_cell(row: int, column: int, rnd: random.Random) -> Any:
+    if column % 2:
+        return rnd.randint(-100000, 100000)
+    return rnd.random() * 1000
+
+
+def string_cell(row: int, column: int, rnd: random.Random) -> Any:
+    if column % 3 == 0:
+        return rnd.choice(REGIONS)
+    if column % 3 == 1:
+        return f"item-{rnd.randint(0, 5000)}"
+    return f"note {row}-{column} {rnd.random():.6f}"
+
+
+def mixed_cell(row: int, column: int, rnd: random.Random) -> Any:
+    kind = column % 5
+    if kind == 0:
+        return row
+    if kind == 1:
+        return rnd.random() * 100
+    if kind == 2:
+        return rnd.choice(REGIONS)
+    if kind == 3:
+        return EPOCH + timedelta(days=rnd.randint(0, 2000))
+    return str(rnd.randint(0, 999))
+
+
+def categorical_cell(row: int, column: int, rnd: random.Random) -> Any:
+    """Выгрузка продаж: повторяющиеся справочные значения, даты, цены из прайса"""
+    kind = column % 8
+    if kind == 0:
+        return rnd.choice(REGIONS)
+    if kind == 1:
+        return rnd.choice(STATUSES)
+    if kind == 2:
+        return f"SKU-{rnd.randint(0, 499):04d}"
+    if kind == 3:
+        return rnd.choice(MANAGERS)
+    if kind == 4:
+        return EPOCH + timedelta(days=rnd.randint(0, 729))
+    if kind == 5:
+        return rnd.randint(1, 20)
+    if kind == 6:
+        return rnd.choice(PRICES)
+    return round(rnd.random() * 5000, 2)
+
+
+CASES: Dict[str, BenchmarkCase] = {case.name: case for case in [
+    BenchmarkCase("small_mixed", ".xlsx", 1000, 10, mixed_cell),
+    BenchmarkCase("large_mixed", ".xlsx", 100000, 10, mixed_cell),
+    BenchmarkCase("large_numeric", ".xlsx", 100000, 20, numeric_cell),
+    BenchmarkCase("wide_numeric", ".xlsx", 2000, 300, numeric_cell),
+    BenchmarkCase("strings", ".xlsx", 50000, 8, string_cell),
+    BenchmarkCase("categorical", ".xlsx", 100000, 8, categorical_cell),
+    BenchmarkCase("sparse", ".xlsx", 20000, 40, mixed_cell, empty_ratio=0.9),
+    BenchmarkCase("bogus_dimension", ".xlsx", 5000, 6, mixed_cell, bogus_dimension=True),
+    BenchmarkCase("xls_mixed", ".xls", 30000, 10, mixed_cell),
+]}
+
+
+def generate(case: BenchmarkCase, directory: Path, scale: float = 1.0) -> Path:
+    """
+    Создает файл для сценария, если его еще нет
+
+    Args:
+        case: Сценарий
+        directory: Каталог для файлов
+        scale: Множитель числа строк
+
+    Returns:
+        Path: Путь к файлу
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / case.file_name(scale)
+    if path.exists():
+        return path
+
+    tmp_path = path.with_name(f".{path.name}.tmp{case.file_ext}")
+    if case.file_ext == ".xls":
+        _write_xls(case, tmp_path, scale)
+    else:
+        _write_xlsx(case, tmp_path, scale)
+    shutil.move(str(tmp_path), path)
+    return path
+
+
+def iter_rows(case: BenchmarkCase, scale: float) -> Iterator[List[Any]]:
+    """Строки сценария: заголовки, затем данные"""
+    rnd = random.Random(f"{SEED}-{case.name}")
+    yield [f"col_{i + 1}" for i in range(case.columns)]
+
+    for row in range(case.scaled_rows(scale)):
+        values = []
+        for column in range(case.columns):
+            if case.empty_ratio and rnd.random() < case.empty_ratio:
+                values.append(None)
+            else:
+                values.append(case.cell(row, column, rnd))
+        yield values
+
+
+def _write_xlsx(case: BenchmarkCase, path: Path, scale: float):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    for row in iter_rows(case, scale):
+        sheet.append(row)
+    workbook.save(path)
+
+    # В режиме write_only openpyxl не пишет <dimension>, а Excel пишет
+    if case.bogus_dimension:
+        ref = "A1:XFD1048576"
+    else:
+        ref = f"A1:{get_column_letter(case.columns)}{case.scaled_rows(scale) + 1}"
+    _insert_dimension(path, ref)
+
+
+def _insert_dimension(path: Path, ref: str):
+    patched = path.with_name(path.name + ".dim")
+    with zipfile.ZipFile(path) as source, \
+            zipfile.ZipFile(patched, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename.startswith("xl/worksheets/sheet"):
+                data = data.replace(b"<sheetViews>",
+                                    f'<dimension ref="{ref}" /><sheetViews>'.encode(), 1)
+            target.writestr(item, data)
+    shutil.move(str(patched), path)
+
+
+def _write_xls(case: BenchmarkCase, path: Path, scale: float):
+    try:
+        import xlwt
+    except ImportError:
+        raise RuntimeError("для .xls сценариев нужен пакет xlwt (requirements-dev.txt)")
+    if case.scaled_rows(scale) + 1 > XLS_MAX_ROWS:
+        raise RuntimeError(f"в .xls не больше {XLS_MAX_ROWS} строк")
+
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Data")
+    date_style = xlwt.easyxf(num_format_str="YYYY-MM-DD")
+    for i, row in enumerate(iter_rows(case, scale)):
+        for j, value in enumerate(row):
+            if value is None:
+                continue
+            if isinstance(value, datetime):
+                sheet.write(i, j, value, date_style)
+            else:
+                sheet.write(i, j, value)
+    workbook.save(str(path))
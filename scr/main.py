@@ -9,14 +9,31 @@ if current_dir not in sys.path:
 from app.ui.main_window import MainWindow
 
 
-def main():
-    app = QApplication(sys.argv)
+def create_window(argv):
+    """
+    Создает приложение и показывает главное окно
+
+    Модули загрузки и анализа импортируются в фоне после первой
+    отрисовки окна (см. MainWindow.first_painted).
+
+    Args:
+        argv: Аргументы командной строки
+
+    Returns:
+        Приложение и главное окно
+    """
+    app = QApplication(argv)
     app.setApplicationName("python_excel")
     window = MainWindow()
     window.show()
+    return app, window
+
+
+def main():
+    app, window = create_window(sys.argv)
 
     sys.exit(app.exec_())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,50 @@
+"""Чтение CSV/TSV: десятичный разделитель определяется по началу файла"""
+from contextlib import closing
+
+import pytest
+
+from app.modules.csv_loader import open_csv
+
+
+def read_rows(path):
+    sheet = open_csv(str(path))
+    with closing(sheet.rows):
+        return list(sheet.rows)
+
+
+@pytest.mark.parametrize("name, text, expected", [
+    ("dot.tsv", "a\tb\n1.5\t2\n-0.25\t3\n", [1.5, -0.25]),
+    ("comma.tsv", "a\tb\n1,5\t2\n-0,25\t3\n", [1.5, -0.25]),
+    ("dot.csv", "a;b\n1.5;2\n-0.25;3\n", [1.5, -0.25]),
+    ("comma.csv", "a;b\n1,5;2\n-0,25;3\n", [1.5, -0.25]),
+    ("plain.csv", "a,b\n1.5,2\n-0.25,3\n", [1.5, -0.25]),
+])
+def test_decimal_separator_from_sample(tmp_path, name, text, expected):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+
+    rows = read_rows(path)
+    assert [row[0] for row in rows[1:]] == expected
+    assert [row[1] for row in rows[1:]] == [2, 3]
+
+
+def test_other_separator_stays_text(tmp_path):
+    path = tmp_path / "mixed.tsv"
+    path.write_text("a\n1.5\n2.5\n3,5\n", encoding="utf-8")
+
+    assert [row[0] for row in read_rows(path)[1:]] == [1.5, 2.5, "3,5"]
+
+
+def test_integers_only_sample_accepts_both(tmp_path):
+    path = tmp_path / "ints.tsv"
+    path.write_text("a\n" + "1\n" * 40000 + "1.5\n2,5\n", encoding="utf-8")
+
+    rows = read_rows(path)
+    assert rows[-2:] == [[1.5], [2.5]]
+
+
+def test_quoted_comma_in_comma_csv_is_text(tmp_path):
+    path = tmp_path / "thousands.csv"
+    path.write_text('a,b\n"1,500",2\n', encoding="utf-8")
+
+    assert read_rows(path)[1] == ["1,500", 2]
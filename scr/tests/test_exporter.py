@@ -0,0 +1,67 @@
+"""Экспорт строк: схема Parquet при потоковой записи пачками"""
+from datetime import date, datetime
+
+import pytest
+
+from app.cli import main
+from app.core.exceptions import ExportError
+from app.modules.exporter import export_rows
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_float_after_int_batches_is_rejected(tmp_path):
+    target = tmp_path / "out.parquet"
+    batches = [[[i] for i in range(1000)], [[1001], [2.5]]]
+
+    with pytest.raises(ExportError, match="строка 1002"):
+        export_rows(str(target), ["a"], iter(batches))
+    assert not target.exists()
+
+
+@pytest.mark.parametrize("kind_values, later", [
+    ([True, False], 1),
+    ([1.5, 2.0], "x"),
+    ([datetime(2024, 1, 1)], 5),
+])
+def test_foreign_value_in_later_batch_is_rejected(tmp_path, kind_values, later):
+    batches = [[[value] for value in kind_values], [[later]]]
+    with pytest.raises(ExportError):
+        export_rows(str(tmp_path / "out.parquet"), ["a"], iter(batches))
+
+
+def test_compatible_later_batches_are_written(tmp_path):
+    target = tmp_path / "out.parquet"
+    batches = [
+        [[1, 1.5, datetime(2024, 1, 1), "a"], [2, 2.5, date(2024, 1, 2), "b"]],
+        [[True, 3, datetime(2024, 1, 3), 7], ["", None, "", ""]],
+    ]
+
+    assert export_rows(str(target), ["i", "f", "d", "s"], iter(batches)) == 4
+    table = pq.read_table(target)
+    assert [str(field.type) for field in table.schema] == ["int64", "double",
+                                                           "timestamp[us]", "string"]
+    assert table.column("i").to_pylist() == [1, 2, 1, None]
+    assert table.column("f").to_pylist() == [1.5, 2.5, 3.0, None]
+    assert table.column("s").to_pylist() == ["a", "b", "7", None]
+
+
+def test_cli_export_fails_instead_of_truncating(tmp_path, capsys):
+    source = tmp_path / "numbers.csv"
+    source.write_text("a\n" + "".join(f"{i}\n" for i in range(30000)) + "2.5\n",
+                      encoding="utf-8")
+    target = tmp_path / "numbers.parquet"
+
+    assert main(["export", str(source), str(target)]) == 1
+    assert "2.5" in capsys.readouterr().err
+    assert not target.exists()
+
+
+def test_cli_export_of_uniform_column(tmp_path):
+    source = tmp_path / "numbers.csv"
+    source.write_text("a\n" + "".join(f"{i}.5\n" for i in range(30000)), encoding="utf-8")
+    target = tmp_path / "numbers.parquet"
+
+    assert main(["export", str(source), str(target)]) == 0
+    column = pq.read_table(target).column("a").to_pylist()
+    assert len(column) == 30000 and column[-1] == 29999.5
@@ -0,0 +1,61 @@
+"""Дисковый кэш разобранных листов: ключ и временные файлы"""
+import errno
+import os
+import pickle
+import time
+
+import pytest
+
+from app.core.constants import CONFIG
+from app.modules.parse_cache import ParseCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a\n1\n", encoding="utf-8")
+    return str(path)
+
+
+def sheet():
+    return "data", ["data"], 2, 1, [["a"], [1]]
+
+
+def test_failed_write_leaves_no_tmp_file(tmp_path, source, monkeypatch):
+    cache = ParseCache(str(tmp_path / "cache"), 1 << 20)
+
+    def no_space(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(pickle, "dump", no_space)
+    cache.put(source, sheet())
+    assert list((tmp_path / "cache").iterdir()) == []
+    assert cache.get(source) is None
+
+
+def test_stale_tmp_files_are_removed(tmp_path, source):
+    cache = ParseCache(str(tmp_path / "cache"), 1 << 20)
+    cache.directory.mkdir()
+    stale = cache.directory / f"orphan.1.2{ParseCache.TMP_SUFFIX}"
+    fresh = cache.directory / f"writing.1.3{ParseCache.TMP_SUFFIX}"
+    stale.write_bytes(b"x" * 100)
+    fresh.write_bytes(b"x" * 100)
+    old = time.time() - ParseCache.STALE_TMP_SECONDS - 60
+    os.utime(stale, (old, old))
+
+    cache.put(source, sheet())
+    assert not stale.exists() and fresh.exists()
+    assert list(cache.get(source)[4]) == [["a"], [1]]
+
+    cache.clear()
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_fallback_encoding_is_part_of_key(tmp_path, source, monkeypatch):
+    cache = ParseCache(str(tmp_path / "cache"), 1 << 20)
+    monkeypatch.setattr(CONFIG, "csv_fallback_encoding", "cp1251")
+    cache.put(source, sheet())
+    assert cache.get(source) is not None
+
+    monkeypatch.setattr(CONFIG, "csv_fallback_encoding", "koi8-r")
+    assert cache.get(source) is None
@@ -0,0 +1,50 @@
+"""Сводная таблица не зависит от того, как хранятся строки листа"""
+from datetime import datetime
+
+import pytest
+
+from app.core.dataclasses import ExcelFileInfo, PivotAggregate, PivotKey, RowsView
+from app.modules.compact_rows import CompactRows, compact_rows
+from app.modules.pivot import PivotEngine
+from app.modules.row_index import RowIndex
+
+HEADERS = ["key", "amount", "date", "note"]
+
+
+def sheet_rows():
+    rows = [HEADERS]
+    for i in range(40):
+        key = [1, 1.0, True, "x", ""][i % 5]
+        date = datetime(2024, 1 + i % 3, 1) if i % 4 else ""
+        rows.append([key, i, date, ["a", 1, 1.0][i % 3]])
+    return rows
+
+
+def run_pivot(raw_rows, keys, aggregates):
+    info = ExcelFileInfo("book.xlsx", "book.xlsx", "Sheet", HEADERS, raw_rows[1:],
+                         len(raw_rows) - 1, len(HEADERS), raw_rows=raw_rows)
+    info.data = RowsView(raw_rows, 1)
+    return PivotEngine(RowIndex(info)).run(keys, aggregates).rows
+
+
+@pytest.mark.parametrize("keys, aggregates", [
+    ([PivotKey(0, "key")], [PivotAggregate("count"), PivotAggregate("sum", 1, "amount"),
+                            PivotAggregate("distinct", 3, "note")]),
+    ([PivotKey(2, "date")], [PivotAggregate("distinct", 0, "key")]),
+    ([PivotKey(2, "date", "month"), PivotKey(3, "note")], [PivotAggregate("mean", 1, "amount")]),
+])
+def test_compact_storage_gives_same_pivot(keys, aggregates):
+    rows = sheet_rows()
+    compact = compact_rows(rows, len(HEADERS))
+    assert isinstance(compact, CompactRows)
+    assert compact.column_codes(0) is not None and compact.column_codes(3) is not None
+
+    assert run_pivot(compact, keys, aggregates) == run_pivot(rows, keys, aggregates)
+
+
+def test_equal_numbers_form_one_group():
+    rows = [HEADERS] + [[key, 10, "", ""] for key in [1, 1.0, "x"] * 10]
+
+    for raw_rows in (rows, compact_rows(rows, len(HEADERS))):
+        result = run_pivot(raw_rows, [PivotKey(0, "key")], [PivotAggregate("sum", 1, "amount")])
+        assert result == [[1, 200], ["x", 100]]
@@ -0,0 +1,267 @@
+"""
+Сверка собственного разбора .xlsx (FastXlsxReader) с openpyxl
+
+Книги-образцы генерируются openpyxl во временном каталоге; общие строки,
+завышенный <dimension> и пропуски строк, которых openpyxl не пишет сам,
+вносятся правкой XML листа. Запуск из scr: python -m pytest tests
+"""
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+from app.modules.excel_loader import ExcelLoader
+from app.modules.xlsx_reader import FastXlsxReader
+from tools.xlsx_parity import read_sheet
+
+SHARED_STRINGS_TYPE = ("http://schemas.openxmlformats.org/officeDocument/2006/"
+                       "relationships/sharedStrings")
+SHARED_STRINGS_CONTENT = ("application/vnd.openxmlformats-officedocument."
+                          "spreadsheetml.sharedStrings+xml")
+_INLINE_CELL = re.compile(rb'<c r="([A-Z]+\d+)"([^>]*) t="inlineStr"><is>(<t[^>]*>.*?</t>)</is></c>',
+                          re.S)
+
+
+def patch_sheets(path: Path, patch: Callable[[bytes], bytes],
+                 extra: Dict[str, bytes] = None):
+    """Правит XML листов книги; extra - части, которые нужно дописать или заменить"""
+    extra = dict(extra or {})
+    parts = {}
+    with zipfile.ZipFile(path) as source:
+        for name in source.namelist():
+            data = source.read(name)
+            if name.startswith("xl/worksheets/sheet"):
+                data = patch(data)
+            parts[name] = extra.pop(name, data)
+    parts.update(extra)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for name, data in parts.items():
+            target.writestr(name, data)
+
+
+def use_shared_strings(path: Path, rich: bool = False):
+    """
+    Переводит строковые ячейки из inlineStr в общие строки (как пишет Excel)
+
+    Args:
+        path: Книга, записанная openpyxl
+        rich: Хранить строки с форматированием (<r>) и фонетикой (<rPh>)
+    """
+    # Элементы <t> строк (с атрибутом xml:space, если он был)
+    strings: List[bytes] = []
+    index: Dict[bytes, int] = {}
+
+    def to_shared(match) -> bytes:
+        text = match.group(3)
+        if text not in index:
+            index[text] = len(strings)
+            strings.append(text)
+        return b'<c r="%s"%s t="s"><v>%d</v></c>' % (match.group(1), match.group(2),
+                                                      index[text])
+
+    with zipfile.ZipFile(path) as source:
+        rels = source.read("xl/_rels/workbook.xml.rels")
+        content_types = source.read("[Content_Types].xml")
+        sheets = {name: source.read(name) for name in source.namelist()
+                  if name.startswith("xl/worksheets/sheet")}
+    # Номера общих строк нужны до записи: листы переводятся заранее
+    sheets = {name: _INLINE_CELL.sub(to_shared, data) for name, data in sheets.items()}
+
+    items = []
+    for text in strings:
+        if rich:
+            # Тот же текст одним фрагментом с форматированием и фонетикой
+            items.append(b"<si><r><rPr><b/></rPr>%s</r><r><t></t></r>"
+                         b"<rPh sb=\"0\" eb=\"1\"><t>PHONETIC</t></rPh></si>" % text)
+        else:
+            items.append(b"<si>%s</si>" % text)
+    sst = (b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+           b'count="%d" uniqueCount="%d">%s</sst>' % (len(items), len(items), b"".join(items)))
+    rels = rels.replace(b"</Relationships>",
+                        f'<Relationship Type="{SHARED_STRINGS_TYPE}" '
+                        f'Target="sharedStrings.xml" Id="rIdSst" /></Relationships>'.encode())
+    content_types = content_types.replace(
+        b"</Types>",
+        f'<Override PartName="/xl/sharedStrings.xml" '
+        f'ContentType="{SHARED_STRINGS_CONTENT}" /></Types>'.encode())
+
+    extra = dict(sheets)
+    extra.update({"xl/sharedStrings.xml": sst,
+                  "xl/_rels/workbook.xml.rels": rels,
+                  "[Content_Types].xml": content_types})
+    patch_sheets(path, lambda data: data, extra)
+
+
+def save(workbook: Workbook, path: Path) -> Path:
+    workbook.save(path)
+    return path
+
+
+def assert_same(path: Path):
+    """Все листы книги читаются обоими движками одинаково, ячейка в ячейку"""
+    reader = FastXlsxReader(str(path))
+    sheet_names = reader.sheet_names
+    reader.close()
+
+    loader = ExcelLoader(cache=None)
+    for sheet_name in sheet_names:
+        expected, exp_rows, exp_cols, _ = read_sheet(loader, str(path), sheet_name, False)
+        actual, act_rows, act_cols, _ = read_sheet(loader, str(path), sheet_name, True)
+
+        assert (act_rows, act_cols) == (exp_rows, exp_cols), sheet_name
+        assert len(actual) == len(expected), sheet_name
+        for i, (left, right) in enumerate(zip(expected, actual), start=1):
+            assert right == left, f"{sheet_name}, строка {i}"
+            assert [type(value) for value in right] == [type(value) for value in left], \
+                f"{sheet_name}, строка {i}"
+
+
+def mixed_rows() -> List[List[Any]]:
+    return [
+        ["Текст", "Число", "Дробное", "Дата", "Флаг", "Ошибка"],
+        ["Москва", 1, 1.5, datetime(2024, 1, 15, 10, 30), True, "#N/A"],
+        ["  ", -7, -0.25, date(1999, 12, 31), False, "#DIV/0!"],
+        ["x < y & z", 10 ** 12, 1e-9, datetime(1900, 3, 1), None, "#VALUE!"],
+        ["007", 0, 3.0, None, True, None],
+        ["Москва", 2 ** 40, 1.23e15, datetime(2030, 6, 30, 23, 59, 59), False, "#REF!"],
+    ]
+
+
+@pytest.fixture
+def mixed_book(tmp_path) -> Path:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Mix"
+    for row in mixed_rows():
+        sheet.append(row)
+    for cell in sheet["D"][1:]:
+        cell.number_format = "yyyy-mm-dd hh:mm:ss"
+    second = workbook.create_sheet("Second")
+    second.append(["a", 1])
+    second.append(["b", 2.5])
+    return save(workbook, tmp_path / "mixed.xlsx")
+
+
+def test_inline_strings_and_types(mixed_book):
+    assert_same(mixed_book)
+
+
+def test_shared_strings(mixed_book):
+    use_shared_strings(mixed_book)
+    with zipfile.ZipFile(mixed_book) as book:
+        assert "xl/sharedStrings.xml" in book.namelist()
+        assert b't="inlineStr"' not in book.read("xl/worksheets/sheet1.xml")
+    assert_same(mixed_book)
+
+
+def test_rich_shared_strings(mixed_book):
+    use_shared_strings(mixed_book, rich=True)
+    assert_same(mixed_book)
+
+    reader = FastXlsxReader(str(mixed_book))
+    try:
+        first = next(reader.iter_rows("Mix"))
+    finally:
+        reader.close()
+    assert first[0] == "Текст"
+
+
+def test_dates_and_times(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    values = [
+        (datetime(2024, 2, 29, 12, 0), "yyyy-mm-dd hh:mm"),
+        (date(2024, 1, 1), "dd.mm.yyyy"),
+        (time(8, 15, 30), "hh:mm:ss"),
+        (timedelta(hours=30, minutes=5), "[h]:mm:ss"),
+        (45000, "mmm yy"),
+        (45000.75, "d/m/yy h:mm"),
+        (45000, "0.00"),
+    ]
+    for value, number_format in values:
+        sheet.append([value])
+        sheet.cell(row=sheet.max_row, column=1).number_format = number_format
+    assert_same(save(workbook, tmp_path / "dates.xlsx"))
+
+
+def test_dates_1904(tmp_path):
+    workbook = Workbook()
+    workbook.epoch = CALENDAR_MAC_1904
+    sheet = workbook.active
+    sheet.append([datetime(2024, 5, 1, 6, 0), date(1904, 1, 2), 1.5])
+    for cell in sheet[1][:2]:
+        cell.number_format = "yyyy-mm-dd hh:mm"
+    assert_same(save(workbook, tmp_path / "dates1904.xlsx"))
+
+
+def test_booleans_and_errors(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append([True, False, "#N/A", "#NAME?", "#NUM!", "#NULL!"])
+    sheet.append([False, None, "#DIV/0!", None, True])
+    path = save(workbook, tmp_path / "flags.xlsx")
+    with zipfile.ZipFile(path) as book:
+        xml = book.read("xl/worksheets/sheet1.xml")
+    assert b't="b"' in xml and b't="e"' in xml
+    assert_same(path)
+
+
+def test_sparse_rows(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet["B2"] = "первая"
+    sheet["E2"] = 5
+    sheet["A5"] = 1.25
+    sheet["Z9"] = "далеко"
+    sheet["C12"] = True
+    path = save(workbook, tmp_path / "sparse.xlsx")
+    use_shared_strings(path)
+    assert_same(path)
+
+    reader = FastXlsxReader(str(path))
+    try:
+        rows = list(reader.iter_rows(reader.active_sheet))
+    finally:
+        reader.close()
+    assert len(rows) == 12
+    assert rows[0] == [] and rows[1] == ["", "первая", "", "", 5]
+    assert rows[8][25] == "далеко"
+
+
+def test_rows_without_references(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    for i in range(5):
+        sheet.append([i, f"s{i}", None, i / 4])
+    path = save(workbook, tmp_path / "norefs.xlsx")
+    # Атрибуты r у строк и ячеек необязательны
+    patch_sheets(path, lambda data: re.sub(rb' r="[A-Z]*\d+"', b"", data))
+    assert_same(path)
+
+
+@pytest.mark.parametrize("ref", ["A1:XFD1048576", "A1:B2", "A1"])
+def test_bogus_dimension(tmp_path, ref):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    for i in range(20):
+        sheet.append([i, f"row {i}", None if i % 3 else i * 0.5])
+    path = save(workbook, tmp_path / "bogus.xlsx")
+    patch_sheets(path, lambda data: data.replace(
+        b"<sheetViews>", f'<dimension ref="{ref}" /><sheetViews>'.encode(), 1))
+    assert_same(path)
+
+
+def test_special_characters(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    texts = ["<тег>", "a & b", 'кавычки "x"', "перенос\nстроки", "emoji 😀", "_x005F_x000D_"]
+    sheet.append(texts)
+    path = save(workbook, tmp_path / "chars.xlsx")
+    assert_same(path)
+    use_shared_strings(path)
+    assert_same(path)
@@ -0,0 +1,178 @@
+"""
+Время запуска: до первой отрисовки главного окна и время импорта модулей
+
+Каждый замер - отдельный процесс. Время «процесс» считается от запуска
+интерпретатора до первой отрисовки окна (MainWindow.first_painted), время
+«импорт» - импорт main.py. Фоновая подгрузка модулей анализа в замер
+не входит. Если медиана больше бюджета, код возврата - 1.
+
+    cd scr
+    python -m tools.startup --repeat 5 --budget-ms 400
+    python -m tools.startup --importtime
+    python -m tools.startup --importtime --module app.cli
+
+Без дисплея добавьте --offscreen.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Бюджет времени до первого окна, мс (медиана по замерам)
+STARTUP_BUDGET_MS = 400
+
+# Сколько самых тяжелых модулей показывать в сводке импорта
+TOP_MODULES = 15
+
+
+def probe():
+    """Замер в текущем процессе: печатает JSON с временами и выходит"""
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    app, window = main.create_window([sys.argv[0]])
+    window.first_painted.disconnect(window.preload_backends)
+
+    def painted():
+        print(json.dumps({
+            "import_ms": (imported - started) * 1000,
+            "window_ms": (time.perf_counter() - started) * 1000,
+            "heavy_modules": [name for name in ("numpy", "openpyxl", "xlrd")
+                              if name in sys.modules],
+        }), flush=True)
+        app.quit()
+
+    window.first_painted.connect(painted)
+    app.exec_()
+
+
+def measure_startup(repeat: int, env: Dict[str, str]) -> List[Dict[str, float]]:
+    """
+    Запускает замер repeat раз в отдельных процессах
+
+    Args:
+        repeat: Число запусков
+        env: Окружение процессов
+
+    Returns:
+        List[Dict[str, float]]: Результаты probe и время процесса process_ms
+    """
+    results = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "-m", "tools.startup", "--probe"],
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   text=True, env=env)
+        line = process.stdout.readline()
+        process_ms = (time.perf_counter() - started) * 1000
+        process.wait(timeout=60)
+        if not line:
+            raise RuntimeError(f"замер завершился без результата (код {process.returncode})")
+
+        result = json.loads(line)
+        result["process_ms"] = process_ms
+        results.append(result)
+    return results
+
+
+def import_times(module: str, env: Dict[str, str]) -> List[Tuple[str, int, int, int]]:
+    """
+    Время импорта модулей по выводу python -X importtime
+
+    Args:
+        module: Импортируемый модуль
+        env: Окружение процесса
+
+    Returns:
+        List[Tuple[str, int, int, int]]: Имя, глубина вложенности,
+            собственное и накопленное время в микросекундах
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, env=env)
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    records = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append((name.strip(), depth, int(own), int(cumulative)))
+    return records
+
+
+def print_import_summary(module: str, records: List[Tuple[str, int, int, int]]):
+    total = sum(record[3] for record in records if record[1] == 0)
+    print(f"Импорт {module}: {total / 1000:.1f} мс, модулей: {len(records)}")
+
+    packages: Dict[str, int] = defaultdict(int)
+    for name, _, own, _ in records:
+        packages[name.split(".")[0]] += own
+    print("\nПо пакетам (собственное время):")
+    for package, own in sorted(packages.items(), key=lambda item: -item[1])[:TOP_MODULES]:
+        print(f"  {own / 1000:8.1f} мс  {package}")
+
+    print("\nСамые тяжелые модули (с вложенными):")
+    heaviest = sorted(records, key=lambda record: -record[3])[:TOP_MODULES]
+    for name, _, _, cumulative in heaviest:
+        print(f"  {cumulative / 1000:8.1f} мс  {name}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tools.startup",
+                                     description="Время запуска python-excel")
+    parser.add_argument("--repeat", type=int, default=5, help="Число замеров")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help="Бюджет времени до первого окна, мс")
+    parser.add_argument("--importtime", action="store_true",
+                        help="Сводка python -X importtime вместо замера окна")
+    parser.add_argument("--module", default="main",
+                        help="Модуль для --importtime (по умолчанию main)")
+    parser.add_argument("--offscreen", action="store_true",
+                        help="Qt без дисплея (QT_QPA_PLATFORM=offscreen)")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.probe:
+        probe()
+        return 0
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    if args.importtime:
+        print_import_summary(args.module, import_times(args.module, env))
+        return 0
+
+    results = measure_startup(args.repeat, env)
+    process_ms = statistics.median(result["process_ms"] for result in results)
+    window_ms = statistics.median(result["window_ms"] for result in results)
+    import_ms = statistics.median(result["import_ms"] for result in results)
+
+    print(f"До первого окна: {process_ms:.0f} мс (в процессе {window_ms:.0f} мс, "
+          f"импорт main {import_ms:.0f} мс), бюджет {args.budget_ms:.0f} мс")
+    heavy = results[-1]["heavy_modules"]
+    if heavy:
+        print(f"До первого окна загружены: {', '.join(heavy)}")
+
+    if process_ms > args.budget_ms:
+        print(f"Бюджет превышен на {process_ms - args.budget_ms:.0f} мс", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Сверка движков чтения .xlsx: openpyxl и собственного разбора XML
+
+Читает каждый лист обоими движками, сравнивает значения ячеек
+построчно и печатает скорость чтения, например на книгах бенчмарков
+(python -m benchmarks.run создает их в benchmarks/data):
+
+    cd scr
+    python -m tools.xlsx_parity benchmarks/data/*.xlsx
+
+Автоматическая сверка на книгах-образцах - tests/test_xlsx_parity.py.
+"""
+import argparse
+import sys
+import time
+from contextlib import closing
+from typing import Any, List, Optional, Tuple
+
+from app.modules.excel_loader import ExcelLoader
+from app.modules.xlsx_reader import FastXlsxReader
+
+
+def read_sheet(loader: ExcelLoader, file_path: str, sheet_name: str,
+               native: bool) -> Tuple[List[List[Any]], Optional[int], Optional[int], float]:
+    """
+    Читает лист выбранным движком
+
+    Returns:
+        Tuple: Строки, число строк и столбцов из метаданных, время чтения
+    """
+    started = time.perf_counter()
+    if native:
+        sheet = loader._open_xlsx_native(file_path, sheet_name)
+    else:
+        sheet = loader._open_xlsx(file_path, sheet_name)
+    with closing(sheet.rows):
+        rows = list(sheet.rows)
+    return rows, sheet.count_row, sheet.count_column, time.perf_counter() - started
+
+
+def compare_sheet(loader: ExcelLoader, file_path: str, sheet_name: str) -> int:
+    """
+    Сравнивает лист, прочитанный обоими движками
+
+    Returns:
+        int: Число расхождений
+    """
+    expected, exp_rows, exp_cols, exp_time = read_sheet(loader, file_path, sheet_name, False)
+    actual, act_rows, act_cols, act_time = read_sheet(loader, file_path, sheet_name, True)
+
+    mismatches = 0
+    if (exp_rows, exp_cols) != (act_rows, act_cols):
+        mismatches += 1
+        print(f"  размеры: openpyxl {exp_rows}x{exp_cols}, native {act_rows}x{act_cols}")
+    if len(expected) != len(actual):
+        mismatches += 1
+        print(f"  строк: openpyxl {len(expected)}, native {len(actual)}")
+
+    for i, (left, right) in enumerate(zip(expected, actual), start=1):
+        if left != right or [type(v) for v in left] != [type(v) for v in right]:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  строка {i}: openpyxl {left!r}")
+                print(f"  {' ' * len(str(i))}        native   {right!r}")
+
+    cells = sum(len(row) for row in expected)
+    print(f"  openpyxl: {exp_time:.2f} с, {cells / exp_time if exp_time else 0:.0f} яч/с; "
+          f"native: {act_time:.2f} с, {cells / act_time if act_time else 0:.0f} яч/с; "
+          f"ускорение x{exp_time / act_time if act_time else 0:.1f}")
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tools.xlsx_parity",
+                                     description="Сверка движков чтения .xlsx")
+    parser.add_argument("files", nargs="+", help="Пути к .xlsx файлам")
+    args = parser.parse_args(argv)
+
+    loader = ExcelLoader()
+    failed = 0
+    for file_path in args.files:
+        reader = FastXlsxReader(file_path)
+        sheet_names = reader.sheet_names
+        reader.close()
+
+        for sheet_name in sheet_names:
+            print(f"{file_path} [{sheet_name}]")
+            mismatches = compare_sheet(loader, file_path, sheet_name)
+            print("  OK" if not mismatches else f"  расхождений: {mismatches}")
+            failed += bool(mismatches)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())